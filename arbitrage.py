@@ -0,0 +1,59 @@
+"""Cross-exchange arbitrage computations shared by the summary report and benchmarks."""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KYBERSWAP = 'KyberSwap'
+UNIVERSAL_ASSETS = 'Universal Assets'
+
+
+def arbitrage_opportunities(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pair each token's highest BUY quote with its lowest SELL quote.
+
+    Args:
+        df (pd.DataFrame): Quotes with symbol, exchange_name, quote_type and price_per_token.
+    Returns:
+        pd.DataFrame: One row per token quoted on both sides, with token, buy_exchange,
+            sell_exchange, buy_price, sell_price and spread_percent, best spread first.
+    """
+    prices = df.dropna(subset=['price_per_token'])
+    by_side = prices.groupby([prices['quote_type'].astype(str), 'symbol'], observed=True)['price_per_token']
+    best_buy = prices.loc[by_side.idxmax().get('BUY', pd.Series(dtype='int64'))].set_index('symbol')
+    best_sell = prices.loc[by_side.idxmin().get('SELL', pd.Series(dtype='int64'))].set_index('symbol')
+
+    # Keep the tokens in order of first appearance, as the report always listed them.
+    tokens = [token for token in pd.unique(df['symbol']) if token in best_buy.index and token in best_sell.index]
+    highest_buy, lowest_sell = best_buy.loc[tokens], best_sell.loc[tokens]
+    arb_df = pd.DataFrame({
+        'token': pd.Index(tokens).astype(str),
+        'buy_exchange': lowest_sell['exchange_name'].astype(str).to_numpy(),
+        'sell_exchange': highest_buy['exchange_name'].astype(str).to_numpy(),
+        'buy_price': lowest_sell['price_per_token'].to_numpy(),
+        'sell_price': highest_buy['price_per_token'].to_numpy(),
+    })
+    arb_df['spread_percent'] = (arb_df['sell_price'] - arb_df['buy_price']) / arb_df['buy_price'] * 100
+    return arb_df.sort_values('spread_percent', ascending=False)
+
+
+def exchange_spreads(df: pd.DataFrame, first: str = KYBERSWAP, second: str = UNIVERSAL_ASSETS) -> pd.DataFrame:
+    """
+    Compare each token's average price on two exchanges.
+
+    Returns:
+        pd.DataFrame: token, kyber_avg, universal_avg and spread, the absolute difference
+            as a percentage of the lower average, for tokens quoted on both exchanges.
+    """
+    exchange_prices = (df.groupby(['symbol', 'exchange_name'], observed=True)['price_per_token'].mean()
+                       .unstack().reindex(pd.unique(df['symbol'])))
+    spread_df = pd.DataFrame({
+        'token': exchange_prices.index.astype(str),
+        'kyber_avg': exchange_prices.get(first, np.nan).to_numpy(),
+        'universal_avg': exchange_prices.get(second, np.nan).to_numpy(),
+    }).dropna().reset_index(drop=True)
+    spread_df['spread'] = ((spread_df['kyber_avg'] - spread_df['universal_avg']).abs()
+                           / spread_df[['kyber_avg', 'universal_avg']].min(axis=1) * 100)
+    return spread_df
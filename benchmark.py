@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the report pipeline on synthetic data.
+
+Runs loading, chart, arbitrage and markdown/PDF stages against generated
+`quotes_*.csv` and `db_arbitrage.csv` files in a temporary folder, so no
+database or network is needed. Results are saved per machine and commit under
+.benchmarks/ so a later run can be compared against an earlier commit:
+
+    python benchmark.py --repeat 5
+    python benchmark.py --compare HEAD~1 --filter charts
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import tempfile
+import time
+import typing as typ
+from datetime import datetime
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+import duckdb_backend
+import md
+import pdf_plot
+from arbitrage import arbitrage_opportunities, exchange_spreads
+from data_loader import load_arbitrage_csv
+from data_quality import apply_quality
+from ohlc import merge_bars, token_bars, venue_bars
+from partial_stats import day_partials, window_stats
+from regression import grouped_regression
+from report_writer import ReportWriter
+from risk_scoring import risk_reward_scores, risk_table
+from synthetic_data import write_arbitrage_csv, write_quotes_csvs
+from token_correlation import bucket_returns, correlation_matrix
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FOLDER = '.benchmarks'
+REGRESSION_THRESHOLD = 0.10
+
+# name -> function(context) returning the zero-argument callable to time.
+BENCHMARKS: typ.Dict[str, typ.Callable[['BenchmarkContext'], typ.Callable[[], typ.Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark; the decorated function does its setup and returns the timed callable."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class BenchmarkContext:
+    """Synthetic inputs shared by the benchmarks, generated once per run inside `folder`."""
+
+    def __init__(self, folder: str, tokens: int, rows: int, exchanges: int, arbitrage_rows: int, seed: int = 0):
+        self.folder = folder
+        self.quote_files = write_quotes_csvs(folder, tokens=tokens, rows=rows, exchanges=exchanges, seed=seed)
+        self.arbitrage_csv = write_arbitrage_csv(os.path.join(folder, 'db_arbitrage.csv'), rows=arbitrage_rows,
+                                                 tokens=tokens, exchanges=exchanges, seed=seed)
+        self.token = next(iter(self.quote_files))
+        self.figures = tuple(os.path.join(md.folder, f"{self.token}_{suffix}.png")
+                             for suffix in ('price_charts', 'price_charts_with_trend', 'relationship_chart'))
+        self.correlation = None
+        self._df = None
+        self._arbitrage_df = None
+
+    def token_df(self) -> pd.DataFrame:
+        """The parsed quotes of the benchmark token, with all three charts rendered once."""
+        if self._df is None:
+            self._df = md.basic_charts(self.token, self.quote_files[self.token], self.figures[0])
+            md.trend_lines(self.token, self._df, self.figures[1])
+            self.correlation = md.correlation_analysis(self.token, self._df, self.figures[2])
+            plt.close('all')
+        return self._df
+
+    def arbitrage_df(self) -> pd.DataFrame:
+        if self._arbitrage_df is None:
+            self._arbitrage_df = load_arbitrage_csv(self.arbitrage_csv)
+        return self._arbitrage_df
+
+
+@benchmark('load.arbitrage_csv')
+def bench_load_arbitrage_csv(ctx: BenchmarkContext):
+    return lambda: load_arbitrage_csv(ctx.arbitrage_csv)
+
+
+@benchmark('charts.basic_charts')
+def bench_basic_charts(ctx: BenchmarkContext):
+    def run():
+        md.basic_charts(ctx.token, ctx.quote_files[ctx.token], ctx.figures[0])
+        plt.close('all')
+    return run
+
+
+@benchmark('charts.trend_lines')
+def bench_trend_lines(ctx: BenchmarkContext):
+    df = ctx.token_df()
+
+    def run():
+        md.trend_lines(ctx.token, df, ctx.figures[1])
+        plt.close('all')
+    return run
+
+
+@benchmark('charts.correlation_analysis')
+def bench_correlation_analysis(ctx: BenchmarkContext):
+    df = ctx.token_df()
+
+    def run():
+        md.correlation_analysis(ctx.token, df, ctx.figures[2])
+        plt.close('all')
+    return run
+
+
+@benchmark('arbitrage.opportunities')
+def bench_arbitrage_opportunities(ctx: BenchmarkContext):
+    df = ctx.arbitrage_df()
+    return lambda: arbitrage_opportunities(df)
+
+
+@benchmark('arbitrage.exchange_spreads')
+def bench_exchange_spreads(ctx: BenchmarkContext):
+    df = ctx.arbitrage_df()
+    return lambda: exchange_spreads(df)
+
+
+@benchmark('analysis.grouped_regression')
+def bench_grouped_regression(ctx: BenchmarkContext):
+    df = ctx.arbitrage_df()
+    return lambda: grouped_regression(df, 'price_per_token', 'output_amount_formatted', by='symbol')
+
+
+@benchmark('analysis.data_quality')
+def bench_data_quality(ctx: BenchmarkContext):
+    df = ctx.token_df()
+    return lambda: apply_quality(df)
+
+
+@benchmark('analysis.ohlc_bars')
+def bench_ohlc_bars(ctx: BenchmarkContext):
+    df = ctx.token_df()
+    return lambda: token_bars(venue_bars(df))
+
+
+@benchmark('analysis.ohlc_update')
+def bench_ohlc_update(ctx: BenchmarkContext):
+    """Fold the newest 1% of quotes into bars built from the rest, as a scheduled run would."""
+    df = ctx.token_df()
+    split = len(df) - max(1, len(df) // 100)
+    stored = venue_bars(df.iloc[:split])
+    new = df.iloc[split:]
+    return lambda: merge_bars(pd.concat([stored, venue_bars(new)], ignore_index=True))
+
+
+@benchmark('analysis.partial_stats_build')
+def bench_partial_stats_build(ctx: BenchmarkContext):
+    df = ctx.token_df()
+    return lambda: day_partials(df)
+
+
+@benchmark('analysis.partial_stats_window')
+def bench_partial_stats_window(ctx: BenchmarkContext):
+    """Merge seven stored daily partials into weekly report statistics."""
+    day = day_partials(ctx.token_df())
+    partial = next(iter(day.values()))
+    week = {(pd.Timestamp('2025-01-01') + pd.Timedelta(days=offset)).strftime('%Y-%m-%d'): partial
+            for offset in range(7)}
+    return lambda: window_stats(week, 7, end=max(week))
+
+
+@benchmark('analysis.ohlc_bars_all_tokens')
+def bench_ohlc_bars_all_tokens(ctx: BenchmarkContext):
+    """Load every quotes CSV and build their per-exchange bars; the pandas side of duckdb.venue_bars."""
+    return lambda: venue_bars(pd.concat([pd.read_csv(path) for path in ctx.quote_files.values()],
+                                        ignore_index=True))
+
+
+@benchmark('analysis.token_correlation')
+def bench_token_correlation(ctx: BenchmarkContext):
+    df = ctx.arbitrage_df()
+    return lambda: correlation_matrix(bucket_returns(df))
+
+
+@benchmark('report.risk_table')
+def bench_risk_table(ctx: BenchmarkContext):
+    df = ctx.arbitrage_df()
+    arb_df = arbitrage_opportunities(df)
+    return lambda: risk_table(risk_reward_scores(df, arb_df))
+
+
+if duckdb_backend.available():
+    # End to end from the CSV files, so compare with load.* plus the pandas computation.
+    def _engine(ctx: BenchmarkContext) -> duckdb_backend.QuoteEngine:
+        return duckdb_backend.QuoteEngine(ctx.arbitrage_csv, os.path.join(ctx.folder, 'quotes_*.csv'))
+
+    @benchmark('duckdb.arbitrage_opportunities')
+    def bench_duckdb_arbitrage(ctx: BenchmarkContext):
+        engine = _engine(ctx)
+        return engine.arbitrage_opportunities
+
+    @benchmark('duckdb.exchange_spreads')
+    def bench_duckdb_exchange_spreads(ctx: BenchmarkContext):
+        engine = _engine(ctx)
+        return engine.exchange_spreads
+
+    @benchmark('duckdb.grouped_regression')
+    def bench_duckdb_regression(ctx: BenchmarkContext):
+        engine = _engine(ctx)
+        return lambda: engine.regression('price_per_token', 'output_amount_formatted')
+
+    @benchmark('duckdb.venue_bars')
+    def bench_duckdb_venue_bars(ctx: BenchmarkContext):
+        engine = _engine(ctx)
+        return engine.venue_bars
+
+    @benchmark('duckdb.venue_bars_parquet')
+    def bench_duckdb_venue_bars_parquet(ctx: BenchmarkContext):
+        """venue_bars over a Parquet copy of the quotes, as written by `duckdb_backend.py --to-parquet`."""
+        parquet = duckdb_backend.export_parquet(os.path.join(ctx.folder, 'quotes_*.csv'),
+                                                os.path.join(ctx.folder, duckdb_backend.QUOTES_PARQUET),
+                                                duckdb_backend.QUOTES_COLUMN_TYPES, 'output_token_symbol, quoted_at')
+        engine = duckdb_backend.QuoteEngine(ctx.arbitrage_csv, parquet)
+        return engine.venue_bars
+
+
+@benchmark('report.markdown')
+def bench_markdown(ctx: BenchmarkContext):
+    df = ctx.token_df()
+    return lambda: md.generate_markdown_report(ctx.token, *ctx.figures, df=df, correlation=ctx.correlation,
+                                               writer=ReportWriter())
+
+
+@benchmark('report.pdf')
+def bench_pdf(ctx: BenchmarkContext):
+    ctx.token_df()
+    prepared = tuple(pdf_plot.prepare_image(figure) for figure in ctx.figures)
+    return lambda: pdf_plot.make_pdf(ctx.token, *prepared)
+
+
+def time_callable(func: typ.Callable[[], typ.Any], repeat: int) -> typ.Dict[str, float]:
+    """Call `func` `repeat` times and return min/median/mean seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings),
+            'mean': statistics.fmean(timings), 'repeat': repeat}
+
+
+def run_benchmarks(names: typ.Sequence[str], repeat: int, **params) -> typ.Dict[str, typ.Dict[str, float]]:
+    """Run the named benchmarks in a temporary folder and return their timings."""
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as folder:
+        # The chart and report functions write relative to the working directory.
+        os.chdir(folder)
+        try:
+            md.ensure_folders_exist()
+            ctx = BenchmarkContext(folder, **params)
+            for name in names:
+                results[name] = time_callable(BENCHMARKS[name](ctx), repeat)
+                print(f"{name:<32} {results[name]['min']:>9.4f}s min  {results[name]['median']:>9.4f}s median")
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_commit() -> typ.Tuple[str, bool]:
+    """Return the short HEAD commit and whether the working tree has changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+def resolve_commit(ref: str) -> str:
+    """Resolve a git ref such as HEAD~1 to the short commit used in result file names."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', ref], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ref
+
+
+def machine_id() -> str:
+    """Identify this machine, so results are only compared with runs on the same hardware."""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', f"{platform.node()}-{platform.machine()}")
+
+
+def results_path(commit: str, folder: str = BENCHMARK_FOLDER) -> str:
+    return os.path.join(folder, machine_id(), f"{commit}.json")
+
+
+def save_results(results: typ.Dict, params: typ.Dict) -> str:
+    """Save this run's results as .benchmarks/<machine>/<commit>.json."""
+    commit, dirty = git_commit()
+    path = results_path(commit)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'id': machine_id(), 'python': platform.python_version(),
+                    'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'params': params,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare_results(results: typ.Dict, params: typ.Dict, ref: str,
+                    threshold: float = REGRESSION_THRESHOLD) -> pd.DataFrame | None:
+    """
+    Compare min timings with a saved run of commit `ref` on this machine.
+
+    Benchmarks more than `threshold` slower than the baseline are flagged.
+    """
+    path = results_path(resolve_commit(ref))
+    if not os.path.exists(path):
+        print(f"No saved results for {ref} on this machine ({path})")
+        return None
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline['params'] != params:
+        print(f"⚠️  Parameters differ from the baseline run: {baseline['params']}")
+
+    names = [name for name in results if name in baseline['results']]
+    comparison = pd.DataFrame({
+        'baseline_s': [baseline['results'][name]['min'] for name in names],
+        'current_s': [results[name]['min'] for name in names],
+    }, index=pd.Index(names, name='benchmark'))
+    comparison['ratio'] = comparison['current_s'] / comparison['baseline_s']
+    comparison['status'] = pd.cut(comparison['ratio'], [0, 1 - threshold, 1 + threshold, float('inf')],
+                                  labels=['faster', 'same', 'REGRESSION']).astype(str)
+    print(f"\nCompared with {baseline['commit']}:")
+    print(comparison.round(4).to_string())
+    return comparison
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on synthetic data.")
+    parser.add_argument('--tokens', type=int, default=13, help="synthetic tokens (default: 13)")
+    parser.add_argument('--rows', type=int, default=2_000, help="rows per quotes_<token>.csv (default: 2000)")
+    parser.add_argument('--exchanges', type=int, default=2, help="exchanges quoting each token (default: 2)")
+    parser.add_argument('--arbitrage-rows', type=int, default=100_000,
+                        help="rows in the synthetic db_arbitrage.csv (default: 100000)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed calls per benchmark (default: 3)")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--compare', metavar='REF', help="compare with saved results of this git commit")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio flagged as a regression (default: 0.10)")
+    parser.add_argument('--no-save', action='store_true', help="do not save results")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    params = dict(tokens=args.tokens, rows=args.rows, exchanges=args.exchanges, arbitrage_rows=args.arbitrage_rows)
+    print(f"Running {len(names)} benchmarks with {params}, repeat={args.repeat}")
+    results = run_benchmarks(names, args.repeat, **params)
+    if not args.no_save:
+        print(f"\n💾 Results saved in: {save_results(results, params)}")
+    if args.compare:
+        compare_results(results, params, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compact-dtype CSV loaders shared by the summary and report scripts."""
+import io
+import logging
+import os
+import time
+import typing as typ
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from synthetic_data import make_arbitrage_frame
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Price columns default to float64; set PRICE_DTYPE=float32 in .env to halve
+# their memory when ~7 significant digits are enough.
+PRICE_DTYPE = os.getenv("PRICE_DTYPE", "float64")
+
+ARBITRAGE_CSV = 'db_arbitrage.csv'
+ARBITRAGE_CATEGORY_COLUMNS = ['symbol', 'name', 'exchange_name', 'quote_type']
+ARBITRAGE_PRICE_COLUMNS = ['output_amount_formatted', 'price_per_token', 'slippage_limit_percent']
+ARBITRAGE_TIME_COLUMNS = ['quoted_at']
+
+
+def load_compact_csv(csv_source: str | typ.IO,
+                     category_columns: typ.Sequence[str] = (),
+                     price_columns: typ.Sequence[str] = (),
+                     time_columns: typ.Sequence[str] = (),
+                     price_dtype: str | None = None) -> pd.DataFrame:
+    """
+    Load a CSV with categorical strings, sized floats and parsed timestamps.
+
+    Args:
+        csv_source (str | IO): Path or buffer of the CSV file.
+        category_columns (Sequence[str]): String columns stored as categoricals.
+        price_columns (Sequence[str]): Numeric columns stored as `price_dtype`.
+        time_columns (Sequence[str]): Columns parsed to UTC datetimes.
+        price_dtype (str): 'float32' or 'float64'; defaults to PRICE_DTYPE.
+    Returns:
+        pd.DataFrame: The loaded frame.
+    """
+    price_dtype = price_dtype or PRICE_DTYPE
+    if price_dtype not in ('float32', 'float64'):
+        raise ValueError(f"Unsupported price dtype: {price_dtype}")
+
+    dtype = {column: 'category' for column in category_columns}
+    dtype.update({column: price_dtype for column in price_columns})
+    df = pd.read_csv(csv_source, dtype=dtype)
+
+    for column in time_columns:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format='ISO8601', utc=True)
+    return df
+
+
+def load_arbitrage_csv(csv_source: str | typ.IO = ARBITRAGE_CSV,
+                       price_dtype: str | None = None) -> pd.DataFrame:
+    """
+    Load the `db_arbitrage.csv` extract with compact dtypes.
+
+    `symbol`, `name`, `exchange_name` and `quote_type` become categoricals, so
+    `df['symbol'] == token` and `groupby('symbol')` work on small integer codes
+    instead of scanning Python string objects.
+    """
+    return load_compact_csv(
+        csv_source,
+        category_columns=ARBITRAGE_CATEGORY_COLUMNS,
+        price_columns=ARBITRAGE_PRICE_COLUMNS,
+        time_columns=ARBITRAGE_TIME_COLUMNS,
+        price_dtype=price_dtype,
+    )
+
+
+def make_synthetic_arbitrage_csv(rows: int = 1_000_000, seed: int = 0) -> str:
+    """Return a `db_arbitrage.csv`-shaped CSV string with `rows` random quotes."""
+    return make_arbitrage_frame(rows, seed=seed).to_csv(index=False)
+
+
+def benchmark_loader(rows: int = 1_000_000):
+    """Compare default-dtype and compact-dtype loading on a synthetic arbitrage table."""
+    csv_text = make_synthetic_arbitrage_csv(rows)
+    results = {}
+    for label, loader in (('default', pd.read_csv), ('compact', load_arbitrage_csv)):
+        start = time.perf_counter()
+        df = loader(io.StringIO(csv_text))
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df[df['symbol'] == 'uSEI']
+        filter_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df.groupby(['symbol', 'exchange_name'], observed=True)['price_per_token'].mean()
+        groupby_seconds = time.perf_counter() - start
+
+        results[label] = {
+            'memory_mb': df.memory_usage(deep=True).sum() / 2**20,
+            'load_s': load_seconds,
+            'filter_s': filter_seconds,
+            'groupby_s': groupby_seconds,
+        }
+
+    print(f"Synthetic arbitrage table: {rows:,} rows")
+    print(pd.DataFrame(results).round(4).to_string())
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_loader()
@@ -0,0 +1,157 @@
+"""Vectorized data-quality checks run on every token's quotes before charting."""
+import logging
+import os
+import typing as typ
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CHECKS = ('invalid', 'duplicate', 'stale', 'outlier')
+ACTIONS = ('drop', 'clip', 'keep')
+
+# What to do with flagged rows. Only outliers can be clipped (to the rolling
+# median +/- the threshold); override with e.g. QUALITY_POLICY="outlier=drop,stale=drop".
+DEFAULT_POLICY = {'invalid': 'drop', 'duplicate': 'drop', 'stale': 'keep', 'outlier': 'clip'}
+
+OUTLIER_WINDOW = 25
+OUTLIER_MIN_PERIODS = 5
+OUTLIER_THRESHOLD = 5.0
+# Quotes move in tiny ticks, so the MAD can be a fraction of a basis point;
+# an outlier must also be at least this far (relative) from the rolling median.
+OUTLIER_MIN_DEVIATION = 0.005
+# Scales the MAD to a standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+# A price that has not moved for this long is a frozen feed.
+STALE_AFTER = pd.Timedelta('30min')
+
+DUPLICATE_COLUMNS = ['exchange_id', 'input_amount', 'quoted_at', 'output_amount']
+
+
+def parse_policy(text: str | None) -> typ.Dict[str, str]:
+    """Parse "check=action,..." into a full policy, starting from DEFAULT_POLICY."""
+    policy = dict(DEFAULT_POLICY)
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        check, _, action = item.partition('=')
+        if check not in CHECKS or action not in ACTIONS or (action == 'clip' and check != 'outlier'):
+            raise ValueError(f"Invalid quality policy entry: {item!r}")
+        policy[check] = action
+    return policy
+
+
+QUALITY_POLICY = parse_policy(os.getenv("QUALITY_POLICY"))
+
+
+def _rolling_robust_z(values: pd.Series, groups: pd.Series) -> typ.Tuple[pd.Series, pd.Series, pd.Series]:
+    """Return the centered rolling median, floored scaled MAD and robust z-score of `values` per group."""
+    rolling = values.groupby(groups, sort=False).rolling(OUTLIER_WINDOW, min_periods=OUTLIER_MIN_PERIODS, center=True)
+    median = rolling.median().droplevel(0).reindex(values.index)
+    deviation = (values - median).abs()
+    mad = (deviation.groupby(groups, sort=False)
+           .rolling(OUTLIER_WINDOW, min_periods=OUTLIER_MIN_PERIODS, center=True).median()
+           .droplevel(0).reindex(values.index)) * MAD_SCALE
+    mad = np.maximum(mad, OUTLIER_MIN_DEVIATION * median.abs() / OUTLIER_THRESHOLD)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = deviation / mad
+    # A flat window has no spread to judge a move by, so it flags nothing.
+    z = z.where(mad > 0, 0.0)
+    return median, mad, z
+
+
+def flag_quotes(df: pd.DataFrame, value_column: str = 'output_amount_formatted',
+                time_column: str = 'quoted_at', venue_column: str = 'exchange_id') -> pd.DataFrame:
+    """
+    Flag invalid, duplicate, stale and outlier quotes of one token.
+
+    Checks look at `value_column`, the series that gets charted; pass
+    'price_per_token' to check prices instead (a zero price there is invalid).
+
+    Every check is a column-wise operation over the whole frame; only the
+    rolling median/MAD runs per exchange, through one grouped rolling window.
+    `df` must be sorted by time.
+
+    Returns:
+        pd.DataFrame: Boolean columns named after CHECKS, plus the rolling median and
+            scaled MAD used for clipping outliers, aligned with `df`.
+    """
+    values = df[value_column].astype(float)
+    venues = df[venue_column] if venue_column in df.columns else pd.Series(0, index=df.index)
+
+    invalid = ~(values > 0)
+    if 'is_valid' in df.columns:
+        invalid |= df['is_valid'].astype('boolean').fillna(True).eq(False).to_numpy()
+
+    duplicate = df.duplicated(subset=[c for c in DUPLICATE_COLUMNS if c in df.columns] or None)
+
+    times = df[time_column]
+    stale = pd.Series(False, index=df.index)
+    if 'expires_at' in df.columns:
+        expires_at = pd.to_datetime(df['expires_at'], utc=True, format='ISO8601', errors='coerce')
+        stale |= (expires_at < times).fillna(False)
+    # Frozen feed: the same quote from one exchange for longer than STALE_AFTER.
+    moved = values.ne(values.groupby(venues, sort=False).shift())
+    run = moved.groupby(venues, sort=False).cumsum()
+    run_start = times.groupby([venues, run], sort=False).transform('min')
+    stale |= (times - run_start) > STALE_AFTER
+
+    valid_values = values.where(~(invalid | duplicate))
+    median, mad, z = _rolling_robust_z(valid_values, venues)
+    outlier = (z > OUTLIER_THRESHOLD) & ~(invalid | duplicate)
+
+    return pd.DataFrame({'invalid': invalid, 'duplicate': duplicate, 'stale': stale, 'outlier': outlier,
+                         'median': median, 'mad': mad}, index=df.index)
+
+
+def apply_quality(df: pd.DataFrame, policy: typ.Dict[str, str] | None = None,
+                  value_column: str = 'output_amount_formatted',
+                  scaled_columns: typ.Sequence[str] = ('output_amount', 'output_amount_readable'),
+                  ) -> typ.Tuple[pd.DataFrame, typ.Dict[str, int]]:
+    """
+    Flag one token's quotes and drop or clip them according to `policy`.
+
+    Clipped outliers are pulled to the rolling median +/- OUTLIER_THRESHOLD MADs;
+    `scaled_columns` derived from the value are rescaled by the same factor.
+
+    The cleaned frame's attrs hold the counts under 'quality' and, under
+    'flagged', the id, time and flags of every flagged row as plain lists, so
+    `partial_stats` can attribute the counts to the days the rows fall on.
+
+    Returns:
+        tuple: The cleaned frame and the counts of rows, each flag, dropped and clipped rows.
+    """
+    policy = policy or QUALITY_POLICY
+    flags = flag_quotes(df, value_column=value_column)
+
+    drop = np.zeros(len(df), dtype=bool)
+    for check in CHECKS:
+        if policy[check] == 'drop':
+            drop |= flags[check].to_numpy()
+
+    clean = df.copy()
+    clip = flags['outlier'].to_numpy() & ~drop if policy['outlier'] == 'clip' else np.zeros(len(df), dtype=bool)
+    if clip.any():
+        limit = OUTLIER_THRESHOLD * flags['mad']
+        original = clean[value_column].astype(float)
+        clipped = original.clip(flags['median'] - limit, flags['median'] + limit)
+        clean.loc[clip, value_column] = clipped[clip]
+        for column in scaled_columns:
+            if column in clean.columns:
+                clean[column] = clean[column].astype(float)
+                clean.loc[clip, column] *= (clipped / original)[clip]
+
+    counts = {'rows': len(df), **{check: int(flags[check].sum()) for check in CHECKS},
+              'dropped': int(drop.sum()), 'clipped': int(clip.sum())}
+    if counts['dropped'] or counts['clipped']:
+        logger.info(f"Data quality: {counts}")
+    flagged = flags[list(CHECKS)].assign(dropped=drop, clipped=clip)
+    flagged = flagged[flagged.any(axis=1)]
+    keys = df.loc[flagged.index, [column for column in ('id', 'quoted_at') if column in df.columns]]
+    clean = clean[~drop]
+    clean.attrs['quality'] = counts
+    clean.attrs['flagged'] = {**{column: keys[column].astype(str).tolist() for column in keys.columns},
+                              **{column: flagged[column].tolist() for column in flagged.columns}}
+    return clean, counts
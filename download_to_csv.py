@@ -1,3 +1,4 @@
+import argparse
 import os
 import typing as typ
 
@@ -22,37 +23,7 @@ database_parameters = {
 import psycopg2
 import csv
 
-
-def get_distinct_tokens() -> typ.List[str] | None:
-    """
-    Queries distinct token symbols from the price_snapshots table.
-    Returns:
-        list: A list of distinct token symbols.
-    """
-    conn = None
-    tokens = []
-    try:
-        # Connect to the PostgreSQL database
-        conn = psycopg2.connect(**database_parameters)
-        cur = conn.cursor()
-
-        # Execute the query
-        query = "SELECT DISTINCT output_token_symbol FROM quotes;"
-        cur.execute(query)
-
-        # Fetch all results
-        results = cur.fetchall()
-        tokens = [row[0] for row in results]
-
-    except (Exception, psycopg2.Error) as error:
-        print(f"Error while querying distinct tokens: {error}")
-    finally:
-        # Close the database connection
-        if conn:
-            cur.close()
-            conn.close()
-
-    return tokens
+from instrumentation import traced
 
 
 def fetch_data_and_save_to_csv(db_params, sql_query, csv_filepath):
@@ -110,18 +81,37 @@ def fetch_data_and_save_to_csv(db_params, sql_query, csv_filepath):
             print("PostgreSQL connection is closed.")
 
 
-def main_download_csv(token_symbol):
-    """Download the csv file."""
-    # The SQL query you provided
-    query = f"""
+# 1000 USDC (6 decimals), the size every report is charted at.
+INPUT_AMOUNT = 1_000_000_000
+
+# Quote sizes for price-impact curves: 100 to 100k USDC.
+LADDER_INPUT_AMOUNTS = (100_000_000, 500_000_000, 1_000_000_000, 5_000_000_000,
+                        10_000_000_000, 50_000_000_000, 100_000_000_000)
+
+
+def quotes_query(token_symbol: str, input_amounts: typ.Sequence[int] = (INPUT_AMOUNT,)) -> str:
+    """
+    Return the last-24-hours quotes query for one token and one or more input sizes.
+
+    All sizes are fetched in a single scan with `IN (...)`, so a ladder costs one
+    query per token rather than one per size.
+    """
+    amounts = ', '.join(str(int(amount)) for amount in input_amounts)
+    return f"""
     SELECT *
     FROM quotes
     WHERE "quoted_at" >= NOW() - INTERVAL '24 hours'
       AND output_token_symbol = '{token_symbol}' 
-      AND input_amount = 1000000000 
+      AND input_amount IN ({amounts}) 
     ORDER BY output_token_symbol, "quoted_at";
     """
 
+
+@traced('download', token_arg='token_symbol')
+def main_download_csv(token_symbol):
+    """Download the csv file."""
+    query = quotes_query(token_symbol)
+
     # Desired output CSV file path
     output_csv_file = f"quotes_{token_symbol}.csv"
 
@@ -129,5 +119,105 @@ def main_download_csv(token_symbol):
     fetch_data_and_save_to_csv(database_parameters, query, output_csv_file)
 
 
+def ladder_query(token_symbol: str, input_amounts: typ.Sequence[int] = LADDER_INPUT_AMOUNTS) -> str:
+    """
+    Return the last-24-hours BUY and SELL ladder legs of one token.
+
+    The token is matched on token_id through the tokens table, since a SELL
+    quote has the token as input and USDC as output. BUY legs are the quotes
+    spending one of `input_amounts` USDC; SELL legs are sized by the USDC they
+    return, so those within the ladder's range (halved and doubled at the
+    ends) are kept and `price_impact` snaps them to the nearest ladder size.
+    """
+    amounts = ', '.join(str(int(amount)) for amount in input_amounts)
+    return f"""
+    SELECT q.*
+    FROM quotes q
+    JOIN tokens t ON t.id = q.token_id
+    WHERE q."quoted_at" >= NOW() - INTERVAL '24 hours'
+      AND t.symbol = '{token_symbol}'
+      AND ((q.quote_type = 'BUY' AND q.input_amount IN ({amounts}))
+           OR (q.quote_type = 'SELL'
+               AND q.output_amount BETWEEN {min(input_amounts) // 2} AND {max(input_amounts) * 2}))
+    ORDER BY q.exchange_id, q.quote_type, q."quoted_at";
+    """
+
+
+@traced('download_ladder', token_arg='token_symbol')
+def download_ladder_csv(token_symbol: str, input_amounts: typ.Sequence[int] = LADDER_INPUT_AMOUNTS) -> str:
+    """Download the BUY and SELL quotes at every ladder size for one token to ladder_<token>.csv."""
+    output_csv_file = f"ladder_{token_symbol}.csv"
+    fetch_data_and_save_to_csv(database_parameters, ladder_query(token_symbol, input_amounts), output_csv_file)
+    return output_csv_file
+
+
+# Latest quotes kept per token, exchange and side in the db_arbitrage.csv snapshot.
+SNAPSHOT_PER_SIDE = 50
+SNAPSHOT_CSV = 'db_arbitrage.csv'
+
+
+def snapshot_query(per_side: int = SNAPSHOT_PER_SIDE) -> str:
+    """
+    Return the query for the latest `per_side` priced quotes of every (token, exchange, side).
+
+    A recursive CTE skips through quotes_latest_per_side_idx from one
+    (token_id, exchange, side) to the next, and a LATERAL lookup reads the
+    newest rows of each straight off the same index, so the cost depends on
+    the number of tokens and `per_side`, not on the size of quotes. Symbols,
+    names and exchange names come from the tokens and exchanges tables, and
+    the columns match the old `v_latest_quotes` extract read by md_summary.py.
+    """
+    return f"""
+    WITH RECURSIVE sides AS (
+        (SELECT token_id, exchange_id, quote_type FROM quotes
+         WHERE price_per_token <> 0
+         ORDER BY token_id, exchange_id, quote_type LIMIT 1)
+        UNION ALL
+        SELECT next.token_id, next.exchange_id, next.quote_type
+        FROM sides
+        CROSS JOIN LATERAL (
+            SELECT token_id, exchange_id, quote_type FROM quotes
+            WHERE price_per_token <> 0
+              AND (token_id, exchange_id, quote_type) > (sides.token_id, sides.exchange_id, sides.quote_type)
+            ORDER BY token_id, exchange_id, quote_type LIMIT 1
+        ) AS next
+    )
+    SELECT t.symbol, t.name, e.name AS exchange_name,
+           latest.quote_type, latest.output_amount_formatted, latest.price_per_token,
+           latest.slippage_limit_percent, latest.quoted_at
+    FROM sides
+    CROSS JOIN LATERAL (
+        SELECT * FROM quotes q
+        WHERE q.price_per_token <> 0
+          AND q.token_id = sides.token_id
+          AND q.exchange_id = sides.exchange_id
+          AND q.quote_type = sides.quote_type
+        ORDER BY q.quoted_at DESC LIMIT {int(per_side)}
+    ) AS latest
+    JOIN tokens t ON t.id = latest.token_id
+    JOIN exchanges e ON e.id = latest.exchange_id
+    ORDER BY t.symbol, exchange_name, latest.quote_type, latest.quoted_at DESC;
+    """
+
+
+@traced('download_snapshot', token_arg=None)
+def download_snapshot_csv(per_side: int = SNAPSHOT_PER_SIDE, csv_filepath: str = SNAPSHOT_CSV) -> str:
+    """Download the latest quotes of every token, exchange and side for md_summary.py."""
+    fetch_data_and_save_to_csv(database_parameters, snapshot_query(per_side), csv_filepath)
+    return csv_filepath
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download one token's quotes, or the latest-quotes snapshot read by md_summary.py.")
+    parser.add_argument('--token', help="download the last 24 hours of this token to quotes_<token>.csv")
+    parser.add_argument('--per-side', type=int, default=SNAPSHOT_PER_SIDE,
+                        help="latest quotes per token, exchange and side in the snapshot (default: %(default)s)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main_download_csv()
+    args = parse_args()
+    if args.token:
+        main_download_csv(token_symbol=args.token)
+    else:
+        print(f"📥 Snapshot saved to {download_snapshot_csv(per_side=args.per_side)}")
@@ -0,0 +1,251 @@
+"""
+Optional DuckDB backend for the local quote analytics.
+
+Registers the local quote store (db_arbitrage.csv and the quotes_<token>.csv
+files, or Parquet copies of them) as views in an embedded DuckDB database and
+runs the arbitrage, exchange-comparison, correlation and bar rollup
+computations as SQL on DuckDB's multithreaded, vectorized engine. Only the
+small result frames come back to pandas for charting, so months of quotes
+can be analysed without loading them into memory.
+
+DuckDB is not a required dependency (`pip install duckdb`). Select it with
+ANALYTICS_BACKEND=duckdb in .env; md_summary.py then uses it for the
+computations below. CSV scans parse every row on every query, so for large
+stores convert them to Parquet once:
+
+    python duckdb_backend.py --to-parquet
+"""
+import argparse
+import glob
+import logging
+import os
+import typing as typ
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from arbitrage import KYBERSWAP, UNIVERSAL_ASSETS
+from data_loader import ARBITRAGE_CSV
+from ohlc import BAR_COLUMNS, BAR_INTERVAL
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 'pandas' (default) or 'duckdb'
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "pandas")
+QUOTES_SOURCE = 'quotes_*.csv'
+QUOTES_PARQUET = 'quotes.parquet'
+ARBITRAGE_PARQUET = 'db_arbitrage.parquet'
+
+# Declaring the CSV dialect and column types spares DuckDB sniffing every
+# file on every scan, which otherwise costs more than reading small files.
+QUOTES_COLUMN_TYPES = {
+    'id': 'BIGINT', 'token_id': 'INTEGER', 'exchange_id': 'INTEGER', 'quote_type': 'VARCHAR',
+    'input_token_symbol': 'VARCHAR', 'input_amount': 'DOUBLE', 'output_token_symbol': 'VARCHAR',
+    'output_amount': 'DOUBLE', 'output_amount_formatted': 'DOUBLE', 'slippage_limit_percent': 'DOUBLE',
+    'price_per_token': 'DOUBLE', 'user_address': 'VARCHAR', 'chain_id': 'INTEGER', 'quoted_at': 'TIMESTAMPTZ',
+    'expires_at': 'TIMESTAMPTZ', 'is_valid': 'BOOLEAN',
+}
+ARBITRAGE_COLUMN_TYPES = {
+    'symbol': 'VARCHAR', 'name': 'VARCHAR', 'exchange_name': 'VARCHAR', 'quote_type': 'VARCHAR',
+    'output_amount_formatted': 'DOUBLE', 'price_per_token': 'DOUBLE', 'slippage_limit_percent': 'DOUBLE',
+    'quoted_at': 'TIMESTAMPTZ',
+}
+
+ARBITRAGE_QUERY = """
+WITH sides AS (
+    SELECT symbol,
+           max(price_per_token) FILTER (WHERE quote_type = 'BUY') AS sell_price,
+           arg_max(exchange_name, price_per_token) FILTER (WHERE quote_type = 'BUY') AS sell_exchange,
+           min(price_per_token) FILTER (WHERE quote_type = 'SELL') AS buy_price,
+           arg_min(exchange_name, price_per_token) FILTER (WHERE quote_type = 'SELL') AS buy_exchange
+    FROM arbitrage
+    WHERE price_per_token IS NOT NULL
+    GROUP BY symbol
+)
+SELECT symbol AS token, buy_exchange, sell_exchange, buy_price, sell_price,
+       (sell_price - buy_price) / buy_price * 100 AS spread_percent
+FROM sides
+WHERE buy_price IS NOT NULL AND sell_price IS NOT NULL
+ORDER BY spread_percent DESC, token;
+"""
+
+EXCHANGE_SPREADS_QUERY = """
+WITH averages AS (
+    SELECT symbol,
+           avg(price_per_token) FILTER (WHERE exchange_name = $first) AS kyber_avg,
+           avg(price_per_token) FILTER (WHERE exchange_name = $second) AS universal_avg
+    FROM arbitrage
+    GROUP BY symbol
+)
+SELECT symbol AS token, kyber_avg, universal_avg,
+       abs(kyber_avg - universal_avg) / least(kyber_avg, universal_avg) * 100 AS spread
+FROM averages
+WHERE kyber_avg IS NOT NULL AND universal_avg IS NOT NULL
+ORDER BY token;
+"""
+
+EXCHANGE_PRICES_QUERY = """
+SELECT symbol, exchange_name, avg(price_per_token) AS price_per_token
+FROM arbitrage
+GROUP BY symbol, exchange_name;
+"""
+
+EXCHANGE_STATS_QUERY = """
+SELECT exchange_name, avg(price_per_token) AS price_per_token,
+       avg(output_amount_formatted) AS output_amount_formatted,
+       avg(slippage_limit_percent) AS slippage_limit_percent
+FROM arbitrage
+GROUP BY exchange_name
+ORDER BY exchange_name;
+"""
+
+# Same columns as regression.grouped_regression, without the status labels.
+REGRESSION_QUERY = """
+SELECT {by}, count(*) AS n, regr_slope({y}, {x}) AS slope, regr_intercept({y}, {x}) AS intercept,
+       corr({x}, {y}) AS r, regr_r2({y}, {x}) AS r2
+FROM {view}
+WHERE {x} IS NOT NULL AND {y} IS NOT NULL
+GROUP BY {by}
+ORDER BY {by};
+"""
+
+# Per-exchange OHLC bars with ohlc.BAR_COLUMNS, from every quotes_<token>.csv at once.
+VENUE_BARS_QUERY = """
+SELECT output_token_symbol AS token, exchange_id,
+       to_timestamp(floor(epoch(quoted_at) / $step) * $step) AS bar_start,
+       arg_min(price_per_token, quoted_at) AS open, max(price_per_token) AS high,
+       min(price_per_token) AS low, arg_max(price_per_token, quoted_at) AS close,
+       count(*) AS quotes, sum(price_per_token) AS price_sum,
+       min(quoted_at) AS first_at, max(quoted_at) AS last_at, max(id) AS last_id
+FROM quotes
+WHERE price_per_token > 0
+GROUP BY ALL
+ORDER BY token, exchange_id, bar_start;
+"""
+
+
+def available() -> bool:
+    return duckdb is not None
+
+
+def _scan(source: str, column_types: typ.Dict[str, str]) -> str:
+    """SQL table function reading `source`, a CSV or Parquet path or glob."""
+    path = source.replace("'", "''")
+    if source.endswith('.parquet'):
+        return f"read_parquet('{path}', union_by_name = true)"
+    columns = ', '.join(f"'{name}': '{column_type}'" for name, column_type in column_types.items())
+    return (f"read_csv('{path}', auto_detect = false, header = true, delim = ',', quote = '\"', "
+            f"columns = {{{columns}}})")
+
+
+class QuoteEngine:
+    """
+    An in-process DuckDB database over the local quote files.
+
+    The files are registered as views, not loaded: every query scans them
+    directly, in parallel, and only its result is materialised.
+    """
+
+    def __init__(self, arbitrage_source: str = ARBITRAGE_CSV, quotes_source: str = QUOTES_SOURCE,
+                 threads: int | None = None):
+        if duckdb is None:
+            raise ImportError("ANALYTICS_BACKEND=duckdb needs the duckdb package: pip install duckdb")
+        self.conn = duckdb.connect(':memory:')
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)};")
+        if glob.glob(arbitrage_source):
+            self.conn.execute(f"CREATE VIEW arbitrage AS SELECT * FROM "
+                              f"{_scan(arbitrage_source, ARBITRAGE_COLUMN_TYPES)};")
+        if glob.glob(quotes_source):
+            self.conn.execute(f"CREATE VIEW quotes AS SELECT * FROM {_scan(quotes_source, QUOTES_COLUMN_TYPES)};")
+
+    def query(self, sql: str, params: dict | None = None) -> pd.DataFrame:
+        return self.conn.execute(sql, params or {}).df()
+
+    def arbitrage_opportunities(self) -> pd.DataFrame:
+        """`arbitrage.arbitrage_opportunities` of the whole arbitrage extract."""
+        return self.query(ARBITRAGE_QUERY)
+
+    def exchange_spreads(self, first: str = KYBERSWAP, second: str = UNIVERSAL_ASSETS) -> pd.DataFrame:
+        """`arbitrage.exchange_spreads`, with tokens in alphabetical order."""
+        return self.query(EXCHANGE_SPREADS_QUERY, {'first': first, 'second': second})
+
+    def exchange_prices(self) -> pd.DataFrame:
+        """Mean price per token (rows) and exchange (columns)."""
+        return self.query(EXCHANGE_PRICES_QUERY).pivot(index='symbol', columns='exchange_name',
+                                                       values='price_per_token')
+
+    def exchange_stats(self) -> pd.DataFrame:
+        """Mean price, output amount and slippage limit per exchange."""
+        return self.query(EXCHANGE_STATS_QUERY).set_index('exchange_name')
+
+    def regression(self, x: str, y: str, by: str = 'symbol', view: str = 'arbitrage') -> pd.DataFrame:
+        """Per-group line fits and correlations, like `regression.grouped_regression`."""
+        return self.query(REGRESSION_QUERY.format(x=x, y=y, by=by, view=view)).set_index(by)
+
+    def venue_bars(self, interval: str = BAR_INTERVAL) -> pd.DataFrame:
+        """
+        `ohlc.venue_bars` of every token's quotes file in one query.
+
+        Bars start at multiples of `interval` since the epoch, which matches
+        `Series.dt.floor` for intervals that divide a day.
+        """
+        step = pd.Timedelta(interval).total_seconds()
+        bars = self.query(VENUE_BARS_QUERY, {'step': step})
+        for column in ('bar_start', 'first_at', 'last_at'):
+            bars[column] = pd.to_datetime(bars[column], utc=True)
+        return bars[BAR_COLUMNS]
+
+
+def export_parquet(source: str, destination: str, column_types: typ.Dict[str, str], order_by: str) -> str:
+    """Write the CSV file(s) matching `source` to one Parquet file, sorted by `order_by`."""
+    if duckdb is None:
+        raise ImportError("Parquet export needs the duckdb package: pip install duckdb")
+    target = destination.replace("'", "''")
+    with duckdb.connect(':memory:') as conn:
+        conn.execute(f"COPY (SELECT * FROM {_scan(source, column_types)} ORDER BY {order_by}) "
+                     f"TO '{target}' (FORMAT parquet);")
+    return destination
+
+
+def engine_from_env(**kwargs) -> QuoteEngine | None:
+    """A QuoteEngine when ANALYTICS_BACKEND=duckdb, otherwise None (use the pandas functions)."""
+    if ANALYTICS_BACKEND == 'duckdb':
+        return QuoteEngine(**kwargs)
+    if ANALYTICS_BACKEND != 'pandas':
+        raise ValueError(f"Unknown ANALYTICS_BACKEND: {ANALYTICS_BACKEND!r} (use 'pandas' or 'duckdb')")
+    return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the local quote analytics on DuckDB.")
+    parser.add_argument('--to-parquet', action='store_true',
+                        help=f"first convert {ARBITRAGE_CSV} and {QUOTES_SOURCE} to {ARBITRAGE_PARQUET} "
+                             f"and {QUOTES_PARQUET}, and analyse those")
+    parser.add_argument('--threads', type=int, default=None, help="DuckDB worker threads (default: all cores)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sources = {'arbitrage_source': ARBITRAGE_CSV, 'quotes_source': QUOTES_SOURCE}
+    if args.to_parquet:
+        sources = {
+            'arbitrage_source': export_parquet(ARBITRAGE_CSV, ARBITRAGE_PARQUET, ARBITRAGE_COLUMN_TYPES,
+                                               'symbol, quoted_at'),
+            'quotes_source': export_parquet(QUOTES_SOURCE, QUOTES_PARQUET, QUOTES_COLUMN_TYPES,
+                                            'output_token_symbol, quoted_at'),
+        }
+        print(f"📦 Wrote {sources['arbitrage_source']} and {sources['quotes_source']}")
+    engine = QuoteEngine(threads=args.threads, **sources)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(engine.arbitrage_opportunities())
+        print(engine.exchange_spreads())
+        print(engine.regression('price_per_token', 'output_amount_formatted'))
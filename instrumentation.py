@@ -0,0 +1,232 @@
+"""Timing, memory and profiling spans for the report pipeline."""
+import contextlib
+import cProfile
+import argparse
+import functools
+import inspect
+import json
+import logging
+import multiprocessing.util
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import typing as typ
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = 'run_trace.jsonl'
+PROFILE_FOLDER = 'profiles'
+
+
+class Tracer:
+    """
+    Record per-token, per-stage spans to a JSON-lines trace.
+
+    Every span writes one line when it ends, so the trace survives crashes
+    and can be appended to by worker processes forked from the configured
+    parent. `summary()` reads the trace back, covering all of them.
+    """
+
+    def __init__(self):
+        self.trace_file: str | None = None
+        self.trace_memory = False
+        self.profile = False
+        self._open_spans: typ.List[typ.Dict] = []
+        self._profiles: typ.Dict[str, cProfile.Profile] = {}
+        self._active_profiles: typ.List[cProfile.Profile] = []
+        self._owner_pid = os.getpid()
+
+    def configure(self, trace_file: str | None = TRACE_FILE, trace_memory: bool = False,
+                  profile: bool = False, truncate: bool = True):
+        """
+        Start a new trace.
+
+        Args:
+            trace_file (str | None): JSON-lines file to write; None disables tracing.
+            trace_memory (bool): Record per-span peak Python allocations with tracemalloc.
+            profile (bool): Collect cProfile stats per stage, see `dump_profiles`.
+            truncate (bool): Empty `trace_file` first; workers append to the parent's trace.
+        """
+        self.trace_file = trace_file
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self._profiles = {}
+        self._owner_pid = os.getpid() if truncate else self._owner_pid
+        if trace_file and truncate:
+            open(trace_file, 'w').close()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def span(self, stage: str, token: str | None = None):
+        """Time the enclosed block as `stage` of `token`."""
+        if not self.trace_file:
+            yield
+            return
+
+        record = {'stage': stage, 'token': token, 'pid': os.getpid(), 'status': 'ok', 'peak_mb': 0.0}
+        if self.trace_memory:
+            self._carry_peak()
+        self._open_spans.append(record)
+        self._start_profile(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            record['status'] = f'error: {type(error).__name__}'
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            self._stop_profile()
+            if self.trace_memory:
+                self._carry_peak()
+            self._open_spans.pop()
+            if self._open_spans:
+                parent = self._open_spans[-1]
+                parent['peak_mb'] = max(parent['peak_mb'], record['peak_mb'])
+            record['max_rss_mb'] = round(_max_rss_mb(), 1)
+            record['peak_mb'] = round(record['peak_mb'], 3)
+            record['ended_at'] = time.time()
+            with open(self.trace_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def _carry_peak(self):
+        """Fold the tracemalloc peak since the last reset into every open span."""
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        for record in self._open_spans:
+            record['peak_mb'] = max(record['peak_mb'], peak_mb)
+        tracemalloc.reset_peak()
+
+    def _start_profile(self, stage: str):
+        # Only one profiler can be active, so a nested span pauses its parent's
+        # profiler; each stage's stats exclude the stages nested inside it.
+        if not self.profile:
+            return
+        if self._active_profiles:
+            self._active_profiles[-1].disable()
+        profiler = self._profiles.setdefault(stage, cProfile.Profile())
+        self._active_profiles.append(profiler)
+        profiler.enable()
+
+    def _stop_profile(self):
+        if not self.profile:
+            return
+        self._active_profiles.pop().disable()
+        if self._active_profiles:
+            self._active_profiles[-1].enable()
+
+    def settings(self) -> typ.Tuple[str | None, bool, bool]:
+        """Return the arguments that configure a worker to append to this trace."""
+        return self.trace_file, self.trace_memory, self.profile
+
+    def dump_profiles(self, folder: str = PROFILE_FOLDER) -> typ.List[str]:
+        """
+        Write the collected cProfile stats as <folder>/<stage>.prof.
+
+        Worker processes write <stage>.<pid>.prof instead; combine them with
+        `pstats.Stats(*files)`.
+        """
+        os.makedirs(folder, exist_ok=True)
+        suffix = '' if os.getpid() == self._owner_pid else f".{os.getpid()}"
+        files = []
+        for stage, profiler in self._profiles.items():
+            path = os.path.join(folder, f"{stage}{suffix}.prof")
+            profiler.dump_stats(path)
+            files.append(path)
+        return files
+
+    def records(self) -> pd.DataFrame:
+        """Return every span in the trace, including those written by workers."""
+        if not self.trace_file or not os.path.exists(self.trace_file):
+            return pd.DataFrame()
+        return pd.read_json(self.trace_file, lines=True)
+
+    def summary(self) -> pd.DataFrame:
+        """Return per-stage call count, total/mean/max seconds and memory peaks."""
+        records = self.records()
+        if records.empty:
+            return records
+        return records.groupby('stage', sort=False).agg(
+            calls=('seconds', 'size'),
+            total_s=('seconds', 'sum'),
+            mean_s=('seconds', 'mean'),
+            max_s=('seconds', 'max'),
+            peak_mb=('peak_mb', 'max'),
+            max_rss_mb=('max_rss_mb', 'max'),
+            errors=('status', lambda status: int((status != 'ok').sum())),
+        ).round(3).sort_values('total_s', ascending=False)
+
+
+def _max_rss_mb() -> float:
+    """Return the process's peak resident set size in MB."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 2**10
+
+
+tracer = Tracer()
+span = tracer.span
+
+
+def configure_worker(trace_file: str | None, trace_memory: bool, profile: bool):
+    """Process-pool initializer: append to the parent's trace, see `Tracer.settings`."""
+    tracer.configure(trace_file, trace_memory=trace_memory, profile=profile, truncate=False)
+    if profile:
+        # Pool workers skip atexit, but run multiprocessing finalizers on shutdown.
+        multiprocessing.util.Finalize(None, tracer.dump_profiles, exitpriority=10)
+
+
+def traced(stage: str, token_arg: str | None = 'token'):
+    """
+    Decorate a pipeline function so each call is recorded as a `stage` span.
+
+    Args:
+        stage (str): Stage name in the trace.
+        token_arg (str | None): Name of the parameter holding the token symbol, if any.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.trace_file:
+                return func(*args, **kwargs)
+            token = signature.bind_partial(*args, **kwargs).arguments.get(token_arg)
+            with tracer.span(stage, token):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the shared --trace-file, --timings, --trace-memory and --profile options."""
+    parser.add_argument('--trace-file', default=TRACE_FILE,
+                        help=f"JSON-lines file for per-token, per-stage spans (default: {TRACE_FILE})")
+    parser.add_argument('--timings', action='store_true',
+                        help="print a per-stage timing summary at the end of the run")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record per-span peak Python memory with tracemalloc (slower)")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"dump cProfile stats per stage into {PROFILE_FOLDER}/")
+
+
+def start(args: argparse.Namespace):
+    """Configure the shared tracer from parsed command-line options."""
+    tracer.configure(args.trace_file, trace_memory=args.trace_memory, profile=args.profile)
+
+
+def finish(args: argparse.Namespace):
+    """Print the timing summary and dump profiles as requested on the command line."""
+    if args.timings:
+        summary = tracer.summary()
+        if not summary.empty:
+            print("\n⏱️  Timings per stage:")
+            print(summary.to_string())
+    if args.profile:
+        files = tracer.dump_profiles()
+        print(f"🔬 cProfile stats for {len(files)} stages saved in: {PROFILE_FOLDER}/")
+    print(f"🧾 Trace saved in: {args.trace_file}")
@@ -0,0 +1,75 @@
+"""Precompiled markdown templates and column-wise table rendering for the report writers."""
+import math
+import string
+import typing as typ
+
+# A table column is (header, values, format). `format` is a `str.format`
+# pattern applied to every value, e.g. '**{}**', '{:.2f}%' or '${:,.2f}'.
+TableColumn = typ.Tuple[str, typ.Iterable, str]
+
+# Written for missing (None or NaN) values instead of e.g. '$nan'.
+MISSING = 'n/a'
+
+
+def compile_template(text: str) -> string.Template:
+    """
+    Compile a report template once at import time.
+
+    Placeholders use `$name` / `${name}`; a literal dollar sign is written `$$`.
+    Compiling up front surfaces malformed placeholders at import instead of
+    halfway through a run.
+    """
+    template = string.Template(text)
+    if not template.is_valid():
+        raise ValueError(f"Invalid placeholder in template: {text[:60]!r}")
+    return template
+
+
+def render(template: string.Template, **values) -> str:
+    """Render a compiled template, failing loudly on a missing placeholder."""
+    return template.substitute(values)
+
+
+def render_table(columns: typ.Sequence[TableColumn]) -> str:
+    """
+    Render a markdown table from whole columns.
+
+    Every column is formatted in one pass with its format's bound `str.format`,
+    rows are zipped together and the table is joined once, so rendering cost
+    stays linear in the number of rows and no per-row Series is built.
+    Missing values are written as `MISSING`.
+    """
+    headers = [header for header, _, _ in columns]
+    formatted = [[MISSING if _is_missing(value) else fmt.format(value) for value in _as_values(values)]
+                 for _, values, fmt in columns]
+
+    lines = ['| ' + ' | '.join(headers) + ' |',
+             '|' + '|'.join('-' * (len(header) + 2) for header in headers) + '|']
+    lines.extend('| ' + ' | '.join(row) + ' |' for row in zip(*formatted))
+    return '\n'.join(lines) + '\n'
+
+
+def _as_values(values: typ.Iterable) -> typ.Iterable:
+    """Return plain Python scalars so format specs behave as with f-strings."""
+    return values.tolist() if hasattr(values, 'tolist') else values
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class MarkdownDocument:
+    """Collect rendered sections and join them once when the document is written."""
+
+    def __init__(self, *parts: str):
+        self.parts = list(parts)
+
+    def add(self, part: str) -> 'MarkdownDocument':
+        self.parts.append(part)
+        return self
+
+    def add_template(self, template: string.Template, **values) -> 'MarkdownDocument':
+        return self.add(render(template, **values))
+
+    def render(self) -> str:
+        return ''.join(self.parts)
@@ -1,15 +1,29 @@
 """Modified version to generate Markdown files with GitHub-hosted images"""
+import argparse
 import logging
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
-import numpy.linalg
 import pandas as pd
 from tqdm import tqdm
 import os
 from datetime import datetime
 
-from download_to_csv import main_download_csv, get_distinct_tokens
+import instrumentation
+import polars_pipeline
+from data_quality import CHECKS, QUALITY_POLICY, apply_quality
+from download_to_csv import main_download_csv
+from instrumentation import span, traced
+from markdown_templates import compile_template, render, render_table
+from ohlc import BAR_INTERVAL, save_candlestick_chart, token_bars, update_bars
+from partial_stats import update_partials, window_stats
+from regression import fit_line
+from report_stats import describe, download_series_csv, fetch_token_stats
+from report_archive import archive_folder, collect_garbage, store_image
+from report_writer import ReportWriter
+from rollups import window_bars
+from run_journal import RunJournal
+from token_catalog import list_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -30,17 +44,21 @@ def ensure_folders_exist():
     os.makedirs(folder, exist_ok=True)
     os.makedirs(markdown_folder, exist_ok=True)
 
-def basic_charts(token: str, csv_source: str, basic_chart_figure: str) -> pd.DataFrame:
+def load_quotes(csv_source: str, engine: str = 'pandas') -> pd.DataFrame:
     """
-    Basic Line Charts
-    Let's create two separate line charts for the token amount and USDC return.
+    Parse one token's quotes CSV and sort it by time.
+
+    Args:
+        csv_source (str): quotes_<token>.csv, or series_<token>.csv in aggregate mode.
+        engine (str): 'pandas', or 'polars' for the lazy `polars_pipeline.read_quotes`,
+            which only parses the columns the reports use.
     """
+    if engine == 'polars':
+        return polars_pipeline.read_quotes(csv_source)
+
     # Load the CSV data
     df = pd.read_csv(csv_source)
 
-    # Display the first few rows to verify data loading
-    print(f"Total rows: {len(df)}")
-
     # Data preprocessing
     # Convert timestamp to datetime
     df['quoted_at'] = pd.to_datetime(df['quoted_at'], format='ISO8601')
@@ -57,8 +75,35 @@ def basic_charts(token: str, csv_source: str, basic_chart_figure: str) -> pd.Dat
     # Convert to a more readable format (divide by 10^18 to get the actual token amount)
     df['input_amount_readable'] = df['input_amount'] / 1e18
 
-    # Sort by timestamp to ensure proper chronological order
-    df = df.sort_values('quoted_at')
+    # Sort by timestamp to ensure proper chronological order; quotes with the same
+    # timestamp keep their file order
+    return df.sort_values('quoted_at', kind='stable')
+
+
+def prepare_quotes(token: str, csv_source: str, engine: str = 'pandas') -> pd.DataFrame:
+    """Load one token's quotes and apply the data-quality checks: the frame every chart and report uses."""
+    with span('parse', token):
+        df = load_quotes(csv_source, engine)
+
+        # Display the first few rows to verify data loading
+        print(f"Total rows: {len(df)}")
+
+    with span('quality', token):
+        # Drop invalid/duplicate quotes and clip outliers before anything is plotted
+        df, quality = apply_quality(df)
+        print(f"Quality: {len(df)} of {quality['rows']} rows kept, {quality['clipped']} outliers clipped")
+        if df.empty:
+            raise ValueError(f"No quotes left for {token} after data-quality checks")
+    return df
+
+
+@traced('basic_charts')
+def basic_charts(token: str, csv_source: str, basic_chart_figure: str, engine: str = 'pandas') -> pd.DataFrame:
+    """
+    Basic Line Charts
+    Let's create two separate line charts for the token amount and USDC return.
+    """
+    df = prepare_quotes(token, csv_source, engine)
 
     # Basic Line Charts
     # Let's create two separate line charts for the token amount and USDC return.
@@ -96,6 +141,40 @@ def basic_charts(token: str, csv_source: str, basic_chart_figure: str) -> pd.Dat
     return df
 
 
+@traced('ohlc')
+def price_bars(token: str, df: pd.DataFrame, ohlc_figure: str, interval: str = BAR_INTERVAL,
+               days: float = 1, chart: bool = True) -> pd.DataFrame | None:
+    """
+    Fold this run's quotes into the token's stored OHLC bars and draw them as candlesticks.
+
+    Only bars from the first quote of `df` on are kept, so earlier runs'
+    stored bars stay out of the chart. Windows longer than a day are read
+    from the database's hourly rollups instead, rolled up to `interval`.
+    Without `chart`, the bars are only returned (the chart of a resumed run
+    is already on disk).
+
+    Returns:
+        pd.DataFrame | None: The token's bars, or None when it has no priced quotes.
+    """
+    if days > 1:
+        bars = window_bars(days, [token], interval=interval)
+    else:
+        bars = update_bars(token, df, interval)
+        # The bar file keeps every earlier run's bars; chart only this report's window
+        if not bars.empty and not df.empty:
+            bars = bars[bars['bar_start'] >= df['quoted_at'].min().floor(interval)]
+        bars = token_bars(bars) if not bars.empty else bars
+    if bars.empty:
+        print(f"No priced quotes for {token}, skipping price bars")
+        return None
+    bars.attrs['interval'] = interval
+    if chart:
+        save_candlestick_chart(bars, token, ohlc_figure)
+    print(f"Price bars: {len(bars)} x {interval}")
+    return bars
+
+
+@traced('trend_lines')
 def trend_lines(token: str, df: pd.DataFrame, trend_lines_figure: str):
     """
     Enhanced Visualization with Trend Lines
@@ -103,16 +182,17 @@ def trend_lines(token: str, df: pd.DataFrame, trend_lines_figure: str):
     """
     # Enhanced visualization with additional insights
     plt.figure(figsize=(16, 12))
+    positions = np.arange(len(df))
 
     # Plot with more detailed formatting
     # 1. ua_token_amount with trend line
     plt.subplot(2, 1, 1)
     plt.plot(df['quoted_at'], df['output_amount_readable'], color='blue', linewidth=2, label='Token Amount')
 
-    # Add trend line
-    z = np.polyfit(range(len(df)), df['output_amount_readable'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['quoted_at'], p(range(len(df))), "r--", linewidth=1, label='Trend Line')
+    # Add trend line (skipped when there are too few points to fit one)
+    fit = fit_line(positions, df['output_amount_readable'])
+    if not np.isnan(fit.slope):
+        plt.plot(df['quoted_at'], fit.predict(positions), "r--", linewidth=1, label='Trend Line')
 
     plt.title(f'{token} Token Amount Over Time', fontsize=16)
     plt.ylabel('Token Amount', fontsize=14)
@@ -139,10 +219,10 @@ def trend_lines(token: str, df: pd.DataFrame, trend_lines_figure: str):
     plt.subplot(2, 1, 2)
     plt.plot(df['quoted_at'], df['output_amount_formatted'], color='green', linewidth=2, label='USDC Return')
 
-    # Add trend line
-    z = np.polyfit(range(len(df)), df['output_amount_formatted'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['quoted_at'], p(range(len(df))), "r--", linewidth=1, label='Trend Line')
+    # Add trend line (skipped when there are too few points to fit one)
+    fit = fit_line(positions, df['output_amount_formatted'])
+    if not np.isnan(fit.slope):
+        plt.plot(df['quoted_at'], fit.predict(positions), "r--", linewidth=1, label='Trend Line')
 
     plt.title('USDC Return Value Over Time', fontsize=16)
     plt.xlabel('Time', fontsize=14)
@@ -172,6 +252,7 @@ def trend_lines(token: str, df: pd.DataFrame, trend_lines_figure: str):
     plt.clf()
 
 
+@traced('correlation_analysis')
 def correlation_analysis(token: str, df: pd.DataFrame, correlation_analysis_figure: str):
     """
     Correlation Analysis
@@ -179,7 +260,8 @@ def correlation_analysis(token: str, df: pd.DataFrame, correlation_analysis_figu
     We'll create a scatter plot to visualize their relationship and calculate the correlation coefficient.
     """
     # Correlation analysis
-    correlation = df['input_amount_readable'].corr(df['output_amount_formatted'])
+    fit = fit_line(df['input_amount_readable'], df['output_amount_formatted'])
+    correlation = fit.r
     print(f"Correlation between token amount and USDC return: {correlation:.4f}")
 
     # Display basic statistics
@@ -197,10 +279,9 @@ def correlation_analysis(token: str, df: pd.DataFrame, correlation_analysis_figu
     plt.ylabel('USDC Return', fontsize=14)
     plt.grid(True, alpha=0.3)
 
-    # Add trend line
-    z = np.polyfit(df['input_amount_readable'], df['output_amount_formatted'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['input_amount_readable'], p(df['output_amount_formatted']), "r--")
+    # Add trend line; a single quote size (constant x) has none
+    if not np.isnan(fit.slope):
+        plt.plot(df['input_amount_readable'], fit.predict(df['input_amount_readable']), "r--")
 
     plt.tight_layout()
     # Save as image file
@@ -210,28 +291,13 @@ def correlation_analysis(token: str, df: pd.DataFrame, correlation_analysis_figu
     return correlation
 
 
-def generate_markdown_report(symbol, basic_chart_figure, trend_lines_figure, correlation_analysis_figure, df, correlation):
-    """Generate markdown report with GitHub-hosted images."""
-    
-    # Get image filenames for GitHub URLs
-    basic_chart_filename = os.path.basename(basic_chart_figure)
-    trend_lines_filename = os.path.basename(trend_lines_figure)
-    correlation_filename = os.path.basename(correlation_analysis_figure)
-    
-    # Generate timestamp for the report
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Calculate statistics
-    token_stats = df['input_amount_readable'].describe()
-    usdc_stats = df['output_amount_formatted'].describe()
-    
-    markdown_content = f"""# {symbol} Price Analysis Report
+TOKEN_REPORT_TEMPLATE = compile_template("""# ${symbol} Price Analysis Report
 
-Generated on: {timestamp}
+Generated on: ${timestamp}
 
 ## Overview
 
-This report provides a comprehensive analysis of {symbol} token price data including:
+This report provides a comprehensive analysis of ${symbol} token price data including:
 - Basic price trend visualization
 - Enhanced trend analysis with annotations
 - Correlation analysis between token amount and USDC return
@@ -239,118 +305,262 @@ This report provides a comprehensive analysis of {symbol} token price data inclu
 
 ## Key Metrics
 
-| Metric | Value |
-|--------|-------|
-| **Data Points** | {len(df)} |
-| **Correlation Coefficient** | {correlation:.4f} |
-| **Token Amount Range** | {token_stats['min']:.2f} - {token_stats['max']:.2f} |
-| **USDC Return Range** | {usdc_stats['min']:.2f} - {usdc_stats['max']:.2f} |
-
+${key_metrics_table}
 ## Basic Price Charts
 
-The following charts show the basic price trends for {symbol} token amount and USDC return over time.
+The following charts show the basic price trends for ${symbol} token amount and USDC return over time.
 
-![{symbol} Basic Price Charts]({GITHUB_IMAGES_PATH}/{basic_chart_filename})
+![${symbol} Basic Price Charts](${basic_chart_url})
 
 ## Enhanced Trend Analysis
 
 These enhanced visualizations include trend lines and annotations highlighting minimum and maximum values.
 
-![{symbol} Enhanced Trend Charts]({GITHUB_IMAGES_PATH}/{trend_lines_filename})
+![${symbol} Enhanced Trend Charts](${trend_lines_url})
 
 ## Correlation Analysis
 
-The scatter plot below shows the relationship between token amount and USDC return, with a correlation coefficient of **{correlation:.4f}**.
+The scatter plot below shows the relationship between token amount and USDC return, with a correlation coefficient of **${correlation}**.
 
-![{symbol} Correlation Analysis]({GITHUB_IMAGES_PATH}/{correlation_filename})
+![${symbol} Correlation Analysis](${correlation_url})
 
-## Statistical Summary
+${ohlc_section}## Statistical Summary
 
-### {symbol} Token Amount Statistics
-- **Count**: {token_stats['count']:.0f}
-- **Mean**: {token_stats['mean']:.4f}
-- **Standard Deviation**: {token_stats['std']:.4f}
-- **Minimum**: {token_stats['min']:.4f}
-- **25th Percentile**: {token_stats['25%']:.4f}
-- **Median**: {token_stats['50%']:.4f}
-- **75th Percentile**: {token_stats['75%']:.4f}
-- **Maximum**: {token_stats['max']:.4f}
+### ${symbol} Token Amount Statistics
+${token_stats}
 
 ### USDC Return Statistics
-- **Count**: {usdc_stats['count']:.0f}
-- **Mean**: {usdc_stats['mean']:.4f}
-- **Standard Deviation**: {usdc_stats['std']:.4f}
-- **Minimum**: {usdc_stats['min']:.4f}
-- **25th Percentile**: {usdc_stats['25%']:.4f}
-- **Median**: {usdc_stats['50%']:.4f}
-- **75th Percentile**: {usdc_stats['75%']:.4f}
-- **Maximum**: {usdc_stats['max']:.4f}
+${usdc_stats}
+
+## Data Quality
 
+Quotes are checked before charting; the policy decides what happens to each flagged row.
+
+${quality_table}
 ## Interpretation
 
-{"### Strong Correlation" if abs(correlation) > 0.7 else "### Moderate Correlation" if abs(correlation) > 0.3 else "### Weak Correlation"}
+### ${strength_title} Correlation
 
-The correlation coefficient of {correlation:.4f} indicates a {"strong" if abs(correlation) > 0.7 else "moderate" if abs(correlation) > 0.3 else "weak"} {"positive" if correlation > 0 else "negative"} relationship between token amount and USDC return.
+The correlation coefficient of ${correlation} indicates a ${strength} ${direction} relationship between token amount and USDC return.
 
 ---
 
 
 *Report generated by VaporFund Analytics*
-"""
-    
+""")
 
-    # Get current date in dd/mm/yyyy format for filename (use dashes since slashes aren't allowed in filenames)
-    current_date = datetime.now().strftime("%d-%m-%Y")
-    markdown_filename = f"{markdown_folder}/{current_date}/{symbol}_analysis_report.md"
+INDEX_TEMPLATE = compile_template("""# Price Analysis Reports Index
 
-    # Save markdown file
-    markdown_filename = f"{markdown_folder}/{symbol}_analysis_report.md"
-    with open(markdown_filename, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
-    
-    print(f"Markdown report saved: {markdown_filename}")
-    return markdown_filename
-
-
-def generate_index_markdown(processed_tokens):
-    """Generate an index markdown file listing all reports."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    index_content = f"""# Price Analysis Reports Index
-
-Generated on: {timestamp}
+Generated on: ${timestamp}
 
 ## Available Reports
 
 This index contains links to all generated price analysis reports.
 
-| Token | Report Link | Charts |
-|-------|-------------|--------|
-"""
-    
-    for token in processed_tokens:
-        report_link = f"[{token} Analysis Report](./{token}_analysis_report.md)"
-        charts_link = f"[Charts]({GITHUB_IMAGES_PATH})"
-        index_content += f"| **{token}** | {report_link} | {charts_link} |\n"
-    
-    index_content += f"""
+${reports_table}
 
 ## Summary
 
-- **Total Tokens Analyzed**: {len(processed_tokens)}
-- **Reports Generated**: {len(processed_tokens)}
-- **Charts Repository**: [GitHub Images Folder]({GITHUB_IMAGES_PATH})
+- **Total Tokens Analyzed**: ${token_count}
+- **Reports Generated**: ${token_count}
+- **Charts Repository**: [GitHub Images Folder](${images_path})
 
 ---
 
 *Generated by VaporFund Analytics*
-"""
+""")
+
+STATS_LABELS = [
+    ('Count', 'count', '{:.0f}'),
+    ('Mean', 'mean', '{:.4f}'),
+    ('Standard Deviation', 'std', '{:.4f}'),
+    ('Minimum', 'min', '{:.4f}'),
+    ('25th Percentile', '25%', '{:.4f}'),
+    ('Median', '50%', '{:.4f}'),
+    ('75th Percentile', '75%', '{:.4f}'),
+    ('Maximum', 'max', '{:.4f}'),
+]
+
+
+OHLC_SECTION_TEMPLATE = compile_template("""## Price Bars
+
+${symbol} quotes aggregated into ${interval} OHLC bars of `price_per_token`, accumulated across runs.
+Spread is the gap between the dearest and cheapest exchange's mean price in the bar.
+
+![${symbol} Price Bars](${ohlc_url})
+
+### Latest ${interval} Bars
+
+${bars_table}
+""")
+
+# Number of most recent bars listed in the report.
+OHLC_TABLE_BARS = 12
+
+
+def render_ohlc_section(symbol: str, bars: pd.DataFrame | None, ohlc_url: str) -> str:
+    """Render the price-bar section of a token report; empty when the token has no bars."""
+    if bars is None or bars.empty:
+        return ""
+    latest = bars.tail(OHLC_TABLE_BARS)
+    bars_table = render_table([
+        ('Bar Start (UTC)', latest.index.get_level_values('bar_start').strftime('%Y-%m-%d %H:%M'), '{}'),
+        ('Open', latest['open'], '{:.6g}'),
+        ('High', latest['high'], '{:.6g}'),
+        ('Low', latest['low'], '{:.6g}'),
+        ('Close', latest['close'], '{:.6g}'),
+        ('Quotes', latest['quotes'], '{:,}'),
+        ('Range', latest['range_bps'], '{:.1f} bps'),
+        # A bar quoted by a single exchange has no spread
+        ('Spread', latest['spread_bps'].map('{:.1f} bps'.format, na_action='ignore').fillna('n/a'), '{}'),
+    ])
+    return render(OHLC_SECTION_TEMPLATE, symbol=symbol, interval=bars.attrs.get('interval', BAR_INTERVAL),
+                  ohlc_url=ohlc_url, bars_table=bars_table)
+
+
+def render_stats_list(stats: pd.Series) -> str:
+    """Render `describe()` output as the report's bullet list."""
+    return '\n'.join(f"- **{label}**: {fmt.format(stats[key])}" for label, key, fmt in STATS_LABELS)
+
+
+def render_quality_table(quality: dict) -> str:
+    """Render the flagged-row counts of `apply_quality` with the policy applied to each check."""
+    return render_table([
+        ('Check', [check.capitalize() for check in CHECKS], '**{}**'),
+        ('Flagged', [quality[check] for check in CHECKS], '{:,}'),
+        ('Action', [QUALITY_POLICY[check] for check in CHECKS], '{}'),
+    ]) + f"\n{quality['dropped']:,} of {quality['rows']:,} rows dropped, {quality['clipped']:,} clipped.\n"
+
+
+def correlation_strength(correlation: float) -> str:
+    """Classify a correlation coefficient as strong, moderate or weak."""
+    if abs(correlation) > 0.7:
+        return "strong"
+    if abs(correlation) > 0.3:
+        return "moderate"
+    return "weak"
+
+
+@traced('markdown', token_arg='symbol')
+def generate_markdown_report(symbol, basic_chart_figure, trend_lines_figure, correlation_analysis_figure, df, correlation,
+                             writer: ReportWriter | None = None, archive: bool = False,
+                             bars: pd.DataFrame | None = None, ohlc_figure: str | None = None,
+                             stats: pd.Series | None = None):
+    """
+    Generate markdown report with GitHub-hosted images; unchanged reports are not rewritten.
+
+    With `archive`, a copy is also kept under reports/<dd-mm-yyyy>/ that links
+    to content-addressed copies of the charts, so later runs cannot overwrite
+    the images an archived report shows. With `stats` (a row of
+    `report_stats.fetch_token_stats`), the statistics come from the database
+    and `df` is only the down-sampled chart series; a `partial_stats.window_stats`
+    row instead covers a multi-day window merged from stored daily partials.
+    """
+    writer = writer or ReportWriter()
+    
+    # Generate timestamp for the report
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Calculate statistics
+    if stats is not None:
+        token_stats = describe(stats, 'token')
+        usdc_stats = describe(stats, 'usdc')
+        # Windows spanning several days need the date as well as the time
+        multi_day = stats.get('days', 1) > 1 or stats['last_at'] - stats['first_at'] > pd.Timedelta(days=1)
+        time_format = '%m-%d %H:%M' if multi_day else '%H:%M'
+        usdc_range = (f"{usdc_stats['min']:.2f} ({stats['usdc_min_at']:{time_format}}) - "
+                      f"{usdc_stats['max']:.2f} ({stats['usdc_max_at']:{time_format}})")
+    else:
+        token_stats = df['input_amount_readable'].describe()
+        usdc_stats = df['output_amount_formatted'].describe()
+        usdc_range = f"{usdc_stats['min']:.2f} - {usdc_stats['max']:.2f}"
+
+    key_metrics_table = render_table([
+        ('Metric', ['**Data Points**', '**Correlation Coefficient**', '**Token Amount Range**', '**USDC Return Range**'], '{}'),
+        ('Value', [
+            int(token_stats['count']),
+            f"{correlation:.4f}",
+            f"{token_stats['min']:.2f} - {token_stats['max']:.2f}",
+            usdc_range,
+        ], '{}'),
+    ])
+    strength = correlation_strength(correlation)
+    # In aggregate mode the checks only saw bucket means, not the raw quotes;
+    # a multi-day window sums the counts kept with each day's partials
+    if stats is None:
+        quality = df.attrs.get('quality')
+    else:
+        quality = stats.get('quality')
+    quality_table = render_quality_table(quality) if quality else "No data-quality checks were run on the raw quotes.\n"
+
+    report_values = dict(
+        symbol=symbol,
+        timestamp=timestamp,
+        key_metrics_table=key_metrics_table,
+        correlation=f"{correlation:.4f}",
+        token_stats=render_stats_list(token_stats),
+        usdc_stats=render_stats_list(usdc_stats),
+        quality_table=quality_table,
+        strength_title=strength.capitalize(),
+        strength=strength,
+        direction="positive" if correlation > 0 else "negative",
+    )
+    figures = dict(basic_chart_url=basic_chart_figure, trend_lines_url=trend_lines_figure,
+                   correlation_url=correlation_analysis_figure)
+
+    # Save markdown file
+    markdown_content = render(
+        TOKEN_REPORT_TEMPLATE,
+        **report_values,
+        **{key: f"{GITHUB_IMAGES_PATH}/{os.path.basename(path)}" for key, path in figures.items()},
+        ohlc_section=render_ohlc_section(symbol, bars, f"{GITHUB_IMAGES_PATH}/{os.path.basename(ohlc_figure)}" if bars is not None else ""),
+    )
+    markdown_filename = f"{markdown_folder}/{symbol}_analysis_report.md"
+    status = writer.write(markdown_filename, markdown_content)
+    print(f"Markdown report {status}: {markdown_filename}")
+
+    if archive:
+        # Dated copy (dd-mm-yyyy, dashes since slashes aren't allowed in filenames)
+        archived_content = render(
+            TOKEN_REPORT_TEMPLATE,
+            **report_values,
+            **{key: f"{GITHUB_REPO_URL}/{store_image(path)}" for key, path in figures.items()},
+            ohlc_section=render_ohlc_section(symbol, bars, f"{GITHUB_REPO_URL}/{store_image(ohlc_figure)}" if bars is not None else ""),
+        )
+        archived_filename = f"{archive_folder(markdown_folder)}/{symbol}_analysis_report.md"
+        status = writer.write(archived_filename, archived_content)
+        print(f"Archived report {status}: {archived_filename}")
+
+    return markdown_filename
+
+
+@traced('index')
+def generate_index_markdown(processed_tokens, writer: ReportWriter | None = None, archive: bool = False):
+    """Generate an index markdown file listing all reports, plus one in the dated archive."""
+    writer = writer or ReportWriter()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    reports_table = render_table([
+        ('Token', processed_tokens, '**{}**'),
+        ('Report Link', processed_tokens, '[{0} Analysis Report](./{0}_analysis_report.md)'),
+        ('Charts', [GITHUB_IMAGES_PATH] * len(processed_tokens), '[Charts]({})'),
+    ])
+    index_content = render(
+        INDEX_TEMPLATE,
+        timestamp=timestamp,
+        reports_table=reports_table,
+        token_count=len(processed_tokens),
+        images_path=GITHUB_IMAGES_PATH,
+    )
 
     index_filename = f"{markdown_folder}/README.md"
-    with open(index_filename, 'w', encoding='utf-8') as f:
-        f.write(index_content)
-    
-    print(f"Index file saved: {index_filename}")
+    status = writer.write(index_filename, index_content)
+    print(f"Index file {status}: {index_filename}")
+
+    if archive:
+        archived_index = f"{archive_folder(markdown_folder)}/README.md"
+        status = writer.write(archived_index, index_content)
+        print(f"Archived index {status}: {archived_index}")
     return index_filename
 
 
@@ -365,67 +575,179 @@ def remove_temp_files():
         print(f"Removed: {file}")
 
 
-def main():
-    """Main function to process all tokens and generate reports."""
+def main(archive: bool = False, retention_days: int | None = None, bar_interval: str = BAR_INTERVAL,
+         aggregate: bool = False, days: float = 1, engine: str = 'pandas', resume: bool = False):
+    """
+    Main function to process all tokens and generate reports.
+
+    Args:
+        archive (bool): Also keep a dated copy of every report under reports/<dd-mm-yyyy>/.
+        retention_days (int | None): Delete dated archives older than this many days.
+        bar_interval (str): Length of the OHLC bars kept in bars_<token>_<interval>.csv.
+        aggregate (bool): Compute the statistics in the database and chart a down-sampled
+            series over the whole `days` window instead of downloading every quote; price
+            bars are skipped.
+        days (float): Report window; longer than one day reads the price bars from the hourly
+            rollups and the statistics from the daily partials in stats_<token>.json.
+        engine (str): 'pandas', or 'polars' to parse the quotes with a lazy Polars query.
+        resume (bool): Continue an interrupted run with the same settings from run_journal.json,
+            skipping the downloads, charts and reports it already completed, or retry only
+            the tokens that failed in a finished one.
+    """
     ensure_folders_exist()
     
     print(f"GitHub images will be referenced from: {GITHUB_IMAGES_PATH}")
     print(f"Make sure to push the '{folder}' folder to your GitHub repository!")
     
-    symbols = get_distinct_tokens()
-    processed_tokens = []
+    symbols = list_tokens()
+    failed_tokens = []
+    writer = ReportWriter()
+    journal = RunJournal({'archive': archive, 'bar_interval': bar_interval, 'aggregate': aggregate, 'days': days,
+                          'engine': engine}, resume=resume)
+    # One grouped query for every token's statistics, over the same window as the series
+    window_hours = max(1, round(days * 24))
+    token_stats = fetch_token_stats(symbols, hours=window_hours) if aggregate else None
     
     for token_symbol in tqdm(symbols, desc="Processing tokens"):
         try:
-            # Download to CSV
-            main_download_csv(token_symbol=token_symbol)
-            output_csv_file = f"quotes_{token_symbol}.csv"
-
-            # Define image file paths
-            BASIC_CHART_FIGURE = f'{folder}/{token_symbol}_price_charts.png'
-            TREND_LINES_FIGURE = f'{folder}/{token_symbol}_price_charts_with_trend.png'
-            CORRELATION_ANALYSIS_FIGURE = f'{folder}/{token_symbol}_relationship_chart.png'
-
-            # Generate charts
-            df = basic_charts(token=token_symbol, csv_source=output_csv_file, basic_chart_figure=BASIC_CHART_FIGURE)
-            trend_lines(token=token_symbol, df=df, trend_lines_figure=TREND_LINES_FIGURE)
-            correlation = correlation_analysis(token=token_symbol, df=df, correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE)
-            
-            # Generate markdown report
-            generate_markdown_report(
-                symbol=token_symbol,
-                basic_chart_figure=BASIC_CHART_FIGURE,
-                trend_lines_figure=TREND_LINES_FIGURE,
-                correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE,
-                df=df,
-                correlation=correlation
-            )
+            with span('token', token_symbol):
+                # Download to CSV, unless this run already did
+                output_csv_file = f"series_{token_symbol}.csv" if aggregate else f"quotes_{token_symbol}.csv"
+                if journal.is_done(token_symbol, 'downloaded'):
+                    print(f"Reusing {output_csv_file} downloaded earlier in this run")
+                else:
+                    if aggregate:
+                        download_series_csv(token_symbol=token_symbol, hours=window_hours)
+                    else:
+                        main_download_csv(token_symbol=token_symbol)
+                    journal.complete(token_symbol, 'downloaded', outputs=[output_csv_file])
+
+                # Define image file paths
+                BASIC_CHART_FIGURE = f'{folder}/{token_symbol}_price_charts.png'
+                TREND_LINES_FIGURE = f'{folder}/{token_symbol}_price_charts_with_trend.png'
+                CORRELATION_ANALYSIS_FIGURE = f'{folder}/{token_symbol}_relationship_chart.png'
+                OHLC_FIGURE = f'{folder}/{token_symbol}_price_bars.png'
+
+                charted = journal.is_done(token_symbol, 'charted', inputs=[output_csv_file])
+                if charted and journal.is_done(token_symbol, 'reported', inputs=[output_csv_file]):
+                    print(f"Skipping {token_symbol}: already reported in this run")
+                    continue
+
+                # Generate charts; a resumed run only rebuilds the data behind charts it already drew
+                if charted:
+                    df = prepare_quotes(token_symbol, output_csv_file, engine)
+                    correlation = fit_line(df['input_amount_readable'], df['output_amount_formatted']).r
+                else:
+                    df = basic_charts(token=token_symbol, csv_source=output_csv_file,
+                                      basic_chart_figure=BASIC_CHART_FIGURE, engine=engine)
+                    trend_lines(token=token_symbol, df=df, trend_lines_figure=TREND_LINES_FIGURE)
+                    correlation = correlation_analysis(token=token_symbol, df=df, correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE)
+                chart_files = [BASIC_CHART_FIGURE, TREND_LINES_FIGURE, CORRELATION_ANALYSIS_FIGURE]
+                stats = None
+                if aggregate:
+                    stats = token_stats.loc[token_symbol]
+                    correlation = stats['correlation']
+                    bars = None
+                else:
+                    # Stored bars and partials skip quotes below their id watermark, so
+                    # folding the same CSV in again on resume changes nothing
+                    bars = price_bars(token=token_symbol, df=df, ohlc_figure=OHLC_FIGURE, interval=bar_interval,
+                                      days=days, chart=not charted)
+                    if bars is not None:
+                        chart_files.append(OHLC_FIGURE)
+                    with span('partial_stats', token_symbol):
+                        partials = update_partials(token_symbol, df)
+                    if days > 1:
+                        stats = window_stats(partials, days)
+                        correlation = stats['correlation']
+                if not charted:
+                    journal.complete(token_symbol, 'charted', inputs=[output_csv_file], outputs=chart_files)
             
-            processed_tokens.append(token_symbol)
+                # Generate markdown report
+                report_file = generate_markdown_report(
+                    symbol=token_symbol,
+                    basic_chart_figure=BASIC_CHART_FIGURE,
+                    trend_lines_figure=TREND_LINES_FIGURE,
+                    correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE,
+                    df=df,
+                    correlation=correlation,
+                    writer=writer,
+                    archive=archive,
+                    bars=bars,
+                    ohlc_figure=OHLC_FIGURE,
+                    stats=stats,
+                )
+                journal.complete(token_symbol, 'reported', inputs=[output_csv_file], outputs=[report_file])
             
-        except numpy.linalg.LinAlgError:
-            logger.error(f"ERROR: Linear algebra error for token: {token_symbol}")
         except FileNotFoundError:
             logger.error(f"ERROR: File not found for token: {token_symbol}")
+            failed_tokens.append(token_symbol)
+            journal.fail(token_symbol, f"File not found for token: {token_symbol}")
         except Exception as e:
             logger.error(f"ERROR: Error processing token {token_symbol}: {str(e)}")
+            failed_tokens.append(token_symbol)
+            journal.fail(token_symbol, str(e))
     
-    # Generate index file
+    # Generate index file from the journal, so tokens reported before a resume are listed too
+    reported = set(journal.completed('reported'))
+    processed_tokens = [token_symbol for token_symbol in symbols if token_symbol in reported]
     if processed_tokens:
-        generate_index_markdown(processed_tokens)
+        generate_index_markdown(processed_tokens, writer=writer, archive=archive)
+    manifest_file = writer.save_manifest()
+    if archive:
+        removed = collect_garbage(markdown_folder, retention_days=retention_days)
+        print(f"🗑️  Removed {removed['archives']} expired archives and {removed['images']} unreferenced charts")
     
     # Clean up temporary files
     # remove_temp_files()
     
+    # Finished even with failures: only a --resume run picks it up, to retry the failed tokens
+    journal.finish()
+    if failed_tokens:
+        print(f"\n⚠️  {len(failed_tokens)} tokens failed: {', '.join(failed_tokens)}; "
+              f"rerun with --resume to retry only them")
     print(f"\n✅ Processing complete!")
     print(f"📊 Generated reports for {len(processed_tokens)} tokens")
     print(f"📁 Chart images saved in: {folder}/")
     print(f"📄 Markdown reports saved in: {markdown_folder}/")
+    summary = writer.summary()
+    print(f"📝 Reports created: {summary['created']}, updated: {summary['updated']}, "
+          f"unchanged: {summary['unchanged']} (see {manifest_file})")
     print(f"\n🔗 Don't forget to:")
     print(f"   1. Update GITHUB_REPO_URL with your actual GitHub repository")
     print(f"   2. Push the '{folder}' folder to GitHub")
     print(f"   3. Push the '{markdown_folder}' folder to GitHub")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate per-token markdown price reports.")
+    parser.add_argument('--archive', action='store_true',
+                        help="keep dated copies of the reports with deduplicated chart images")
+    parser.add_argument('--retention-days', type=int, default=None,
+                        help="with --archive, delete dated archives more than this many days old (0 keeps today's)")
+    parser.add_argument('--bar-interval', default=BAR_INTERVAL,
+                        help="OHLC bar length as a pandas offset alias, e.g. 15min, 1h, 1D (default: %(default)s)")
+    parser.add_argument('--days', type=float, default=1,
+                        help="report window in days; over 1 reads hourly rollups and daily partial statistics, "
+                             "or with --aggregate queries that many days (default: %(default)s)")
+    parser.add_argument('--aggregate', action='store_true',
+                        help="compute report statistics in the database and chart a down-sampled series")
+    parser.add_argument('--engine', choices=polars_pipeline.ENGINES, default='pandas',
+                        help="how to parse the quotes CSVs; polars needs `pip install polars pyarrow` "
+                             "(default: %(default)s)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run with the same settings, or retry only the tokens "
+                             "that failed in the last one")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if args.retention_days is not None and args.retention_days < 0:
+        parser.error("--retention-days must be 0 or more")
+    return args
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    instrumentation.start(args)
+    main(archive=args.archive, retention_days=args.retention_days, bar_interval=args.bar_interval,
+         aggregate=args.aggregate, days=args.days, engine=args.engine, resume=args.resume)
+    instrumentation.finish(args)
\ No newline at end of file
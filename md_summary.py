@@ -8,6 +8,17 @@ import seaborn as sns
 import os
 from datetime import datetime
 import warnings
+
+from arbitrage import arbitrage_opportunities, exchange_spreads
+from data_loader import load_arbitrage_csv
+from duckdb_backend import engine_from_env
+from markdown_templates import MarkdownDocument, compile_template, render_table
+from price_impact import IMPACT_REPORT, PriceImpactCurves, load_ladders
+from regression import grouped_regression
+from report_writer import ReportWriter
+from risk_scoring import HIGH_REWARD_PERCENT, MODERATE_RISK, risk_reward_scores, risk_table
+from token_correlation import bucket_returns, correlation_matrix
+
 warnings.filterwarnings('ignore')
 
 # Create directories
@@ -19,26 +30,57 @@ sns.set_palette("husl")
 plt.rcParams['figure.facecolor'] = 'white'
 plt.rcParams['axes.facecolor'] = 'white'
 
-# Read the CSV data
-df = pd.read_csv('db_arbitrage.csv')
+# Read the CSV data (the latest-quotes snapshot from `python download_to_csv.py`)
+df = load_arbitrage_csv()
+# ANALYTICS_BACKEND=duckdb runs the aggregations below in DuckDB over the same CSV
+engine = engine_from_env()
+# DuckDB returns tokens sorted by name; list them in file order, as the pandas path does.
+token_rank = {token: rank for rank, token in enumerate(pd.unique(df['symbol'].astype(str)))}
 
-# Initialize markdown content
-markdown_content = """# Arbitrage Opportunities Analysis Report from Base L2 Chain
+
+def by_token_rank(values):
+    return values.map(token_rank)
+
+
+# Describe the snapshot from the data itself rather than assuming its size
+tokens = df['symbol'].astype(str).unique().tolist()
+exchanges = df['exchange_name'].astype(str).unique().tolist()
+quotes_per_side = int(df.groupby(['symbol', 'exchange_name', 'quote_type'], observed=True).size().max())
+exchange_slippage = df.groupby('exchange_name', observed=True)['slippage_limit_percent'].agg(['min', 'max'])
+
+OVERVIEW_SECTION = compile_template("""# Arbitrage Opportunities Analysis Report from Base L2 Chain
 
 ## Executive Summary
 
-**Dataset Analyzed:** 500 records from query `v_latest_quotes where price_per_token != 0`
+**Dataset Analyzed:** ${record_count} records, the latest ${quotes_per_side} priced quotes of every token, exchange and side
 
 ### Data Structure Overview
-- **Number of Tokens:** 6 tokens (uSHIB, uDOGE, uSEI, uBTC, uAPT, uLINK)
-- **Number of Exchanges:** 2 exchanges (KyberSwap, Universal Assets)  
-- **Quote Types:** BUY and SELL orders
-- **Price Range:** $0.00001236 - $106,011.91
-- **Slippage Limits:** 0.2% (Universal Assets) and 0.5% (KyberSwap)
+- **Number of Tokens:** ${token_count} tokens (${token_list})
+- **Number of Exchanges:** ${exchange_count} exchanges (${exchange_list})
+- **Quote Types:** ${quote_types} orders
+- **Price Range:** ${price_range}
+- **Slippage Limits:** ${slippage_limits}
 
 ---
 
-"""
+""")
+
+# Initialize markdown content
+report = MarkdownDocument()
+report.add_template(
+    OVERVIEW_SECTION,
+    record_count=f"{len(df):,}",
+    quotes_per_side=quotes_per_side,
+    token_count=len(tokens),
+    token_list=', '.join(tokens),
+    exchange_count=len(exchanges),
+    exchange_list=', '.join(exchanges),
+    quote_types=' and '.join(df['quote_type'].astype(str).unique()),
+    price_range=f"${df['price_per_token'].min():,.8f} - ${df['price_per_token'].max():,.2f}",
+    slippage_limits=' and '.join(
+        f"{low:g}%" + (f"-{high:g}%" if high != low else '') + f" ({exchange})"
+        for exchange, low, high in exchange_slippage.itertuples()),
+)
 
 # ==============================================================================
 # 1. DATA OVERVIEW VISUALIZATION
@@ -100,934 +142,1040 @@ def save_data_overview():
                       f'{int(height)}', ha='center', va='bottom', fontweight='bold')
 
     plt.tight_layout()
-    plt.savefig('chart_images/07_risk_reward_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig('chart_images/01_data_overview.png', dpi=300, bbox_inches='tight')
     plt.close()
 
-# save_risk_reward_analysis()
-
-markdown_content += """## 🎯 Risk-Reward Analysis
-
-![Risk-Reward Analysis](chart_images/07_risk_reward_analysis.png)
-
-### Investment Quadrant Analysis
+save_data_overview()
 
-**High Reward, Low Risk (Top Left):**
-- **uSEI:** Exceptional 19.42% spread with moderate liquidity risk
-- **Best Opportunity:** Highest profit potential with manageable risk
+DATA_OVERVIEW_SECTION = compile_template("""## 📊 Data Overview
 
-**Moderate Reward, Low Risk (Bottom Left):**
-- **uAPT:** Solid 4.71% spread with good liquidity
-- **Balanced Choice:** Safe option with decent returns
+![Data Overview](chart_images/01_data_overview.png)
 
-**Low Reward, Low Risk (Bottom Left):**
-- **uLINK, uDOGE, uBTC:** Conservative opportunities with minimal risk
-- **Stable Options:** Lower profits but high execution probability
+The dataset shows the distribution of quotes across tokens, exchanges and sides. The price distribution reveals significant variety, from micro-priced tokens like ${cheapest_token} to high-value assets like ${priciest_token}.
 
 ---
 
-"""
+""")
+
+median_prices = df.groupby('symbol', observed=True)['price_per_token'].median()
+report.add_template(DATA_OVERVIEW_SECTION, cheapest_token=median_prices.idxmin(),
+                    priciest_token=median_prices.idxmax())
 
 # ==============================================================================
-# 8. SUMMARY STATISTICS AND INSIGHTS
+# 2. ARBITRAGE OPPORTUNITIES VISUALIZATION
 # ==============================================================================
 
-def create_summary_statistics():
-    # Generate comprehensive statistics
-    overall_stats = df[['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']].describe()
-    
-    # Token-wise statistics
-    token_stats = df.groupby('symbol')[['price_per_token', 'output_amount_formatted']].agg(['mean', 'std', 'min', 'max'])
-    
-    # Exchange-wise statistics
-    exchange_stats_detailed = df.groupby('exchange_name')[['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']].describe()
-    
-    return overall_stats, token_stats, exchange_stats_detailed
-
-overall_stats, token_stats, exchange_stats_detailed = create_summary_statistics()
-
-# Create detailed statistics tables
-overall_stats_md = overall_stats.round(6).to_markdown()
-token_stats_md = token_stats.round(6).to_markdown()
-
-markdown_content += f"""## 📋 Detailed Statistics
+def save_arbitrage_opportunities():
+    # Calculate arbitrage opportunities
+    arb_df = engine.arbitrage_opportunities() if engine else arbitrage_opportunities(df)
 
-### Overall Dataset Statistics
+    # Plot arbitrage opportunities
+    fig, axes = plt.subplots(1, 2, figsize=(16, 8))
+    fig.suptitle('Arbitrage Opportunities Analysis', fontsize=16, fontweight='bold')
 
-```
-{overall_stats_md}
-```
+    # 2.1 Spread Percentage by Token
+    colors = ['#e74c3c' if x > 10 else '#f39c12' if x > 2 else '#27ae60' 
+              for x in arb_df['spread_percent']]
+    bars = axes[0].bar(arb_df['token'], arb_df['spread_percent'], color=colors, alpha=0.8)
+    axes[0].set_title('Arbitrage Spread by Token', fontweight='bold', fontsize=14)
+    axes[0].set_ylabel('Spread Percentage (%)', fontsize=12)
+    axes[0].set_xlabel('Token', fontsize=12)
+    axes[0].grid(axis='y', alpha=0.3)
+    
+    for i, v in enumerate(arb_df['spread_percent']):
+        axes[0].text(i, v + 0.3, f'{v:.2f}%', ha='center', va='bottom', 
+                    fontweight='bold', fontsize=11)
 
-### Token-Wise Detailed Statistics
+    # 2.2 Buy vs Sell Prices Comparison
+    x = np.arange(len(arb_df))
+    width = 0.35
+    bars1 = axes[1].bar(x - width/2, arb_df['buy_price'], width, 
+                       label='Buy Price (Lower)', alpha=0.8, color='#3498db')
+    bars2 = axes[1].bar(x + width/2, arb_df['sell_price'], width, 
+                       label='Sell Price (Higher)', alpha=0.8, color='#e74c3c')
+    axes[1].set_title('Buy vs Sell Prices Comparison', fontweight='bold', fontsize=14)
+    axes[1].set_ylabel('Price ($)', fontsize=12)
+    axes[1].set_xlabel('Token', fontsize=12)
+    axes[1].set_xticks(x)
+    axes[1].set_xticklabels(arb_df['token'])
+    axes[1].legend()
+    axes[1].set_yscale('log')
+    axes[1].grid(axis='y', alpha=0.3)
 
-```
-{token_stats_md}
-```
+    plt.tight_layout()
+    plt.savefig('chart_images/02_arbitrage_opportunities.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    
+    return arb_df
 
-### Key Statistical Insights
+arb_df = save_arbitrage_opportunities()
+opportunity_count = int((arb_df['spread_percent'] > 0).sum())
 
-**Price Volatility:**
-- **Highest Volatility:** uBTC with prices around $105,000
-- **Lowest Volatility:** uSHIB with micro-pricing around $0.000012
-- **Most Consistent:** uDOGE and uSEI showing stable price ranges
+# The narrative below names tokens, spreads and exchanges from this snapshot
+positive_spreads = arb_df[arb_df['spread_percent'] > 0]
+top_opportunity = arb_df.iloc[0]
 
-**Liquidity Patterns:**
-- **Highest Liquidity:** uSHIB with massive output amounts (80M+ tokens)
-- **Balanced Liquidity:** Most other tokens show moderate output amounts
-- **Exchange Bias:** Universal Assets consistently shows higher liquidity
 
----
+def spread_items(rows: pd.DataFrame) -> list:
+    """'**token** (x.xx% spread)' for each row of `arb_df` or `risk_scores`."""
+    spreads = rows['spread_percent'] if 'spread_percent' in rows else rows['reward']
+    return [f"**{token}** ({spread:.2f}% spread)" for token, spread in zip(rows['token'], spreads)]
 
-"""
 
-# ==============================================================================
-# 9. STRATEGIC RECOMMENDATIONS
-# ==============================================================================
+def alert_threshold(spread: float) -> float:
+    """Spread worth an alert for a token: three quarters of its current spread, and at least 1%."""
+    return max(1.0, float(np.floor(spread * 0.75)))
 
-markdown_content += """## 🎯 Strategic Recommendations
 
-### 1. Immediate Action Items
+# Which sides each exchange quotes, e.g. KyberSwap=SELL
+exchange_sides = pd.crosstab(df['exchange_name'].astype(str), df['quote_type'].astype(str))
+market_roles = ', '.join(f"{exchange}={'/'.join(sides[sides > 0].index)}" for exchange, sides in exchange_sides.iterrows())
+segregated_market = bool((exchange_sides > 0).sum(axis=1).eq(1).all())
 
-**High Priority Opportunities:**
-- **uSEI (19.42% spread):** Execute immediately but monitor liquidity depth
-- **uAPT (4.71% spread):** Balanced risk-reward, suitable for larger volumes
+# Create arbitrage table for markdown
+arbitrage_table = render_table([
+    ('Rank', range(1, len(arb_df) + 1), '**{}**'),
+    ('Token', arb_df['token'], '**{}**'),
+    ('Spread', arb_df['spread_percent'], '**{:.2f}%**'),
+    ('Buy At', arb_df['buy_exchange'], '{}'),
+    ('Sell At', arb_df['sell_exchange'], '{}'),
+    ('Buy Price', arb_df['buy_price'], '${:.8f}'),
+    ('Sell Price', arb_df['sell_price'], '${:.8f}'),
+])
+
+ARBITRAGE_SECTION = compile_template("""## 🎯 Arbitrage Opportunities Identified
 
-**Medium Priority:**
-- **uLINK (1.21% spread):** Conservative opportunity with stable execution
-- **uDOGE (1.01% spread):** Low-risk option for consistent small profits
+![Arbitrage Opportunities](chart_images/02_arbitrage_opportunities.png)
 
-### 2. Risk Management Framework
+### Top 6 Best Opportunities
 
-**Liquidity Assessment:**
-- Monitor real-time liquidity depth before large transactions
-- Set maximum transaction sizes based on average output amounts
-- Implement gradual position sizing for high-spread opportunities
+${arbitrage_table}
 
-**Technical Considerations:**
-- **Gas Optimization:** Batch transactions on Base L2 for cost efficiency
-- **Slippage Management:** Account for 0.2-0.5% slippage differences
-- **Timing Strategy:** Monitor price update frequencies between exchanges
+### 🔥 Key Finding: ${top_token} Shows the Largest Arbitrage Opportunity at ${top_spread}%
 
-### 3. Algorithm Implementation
+**${top_token}** presents the most significant arbitrage opportunity, buying on ${top_buy_exchange} and selling on ${top_sell_exchange}. This could be attributed to:
+- Differences in liquidity pool depth
+- Price update latency between exchanges
+- Varying slippage tolerance configurations
 
-**Automated Monitoring System:**
-```python
-# Pseudo-code for arbitrage monitoring
-def monitor_arbitrage():
-    thresholds = {
-        'uSEI': 15.0,    # Alert above 15% spread
-        'uAPT': 3.0,     # Alert above 3% spread
-        'others': 1.0    # Alert above 1% spread
-    }
-    
-    while True:
-        current_spreads = calculate_spreads()
-        for token, spread in current_spreads.items():
-            if spread > thresholds.get(token, 1.0):
-                execute_arbitrage(token, spread)
-```
+---
 
-**Execution Strategy:**
-- **Real-time Monitoring:** 5-second update intervals
-- **Spread Thresholds:** Dynamic based on historical volatility
-- **Position Sizing:** Max 10% of available liquidity per trade
+""")
 
-### 4. Market Structure Insights
+report.add_template(ARBITRAGE_SECTION, arbitrage_table=arbitrage_table, top_token=top_opportunity['token'],
+                    top_spread=f"{top_opportunity['spread_percent']:.2f}",
+                    top_buy_exchange=top_opportunity['buy_exchange'],
+                    top_sell_exchange=top_opportunity['sell_exchange'])
 
-**Exchange Specialization Pattern:**
-- **KyberSwap:** Consistent sell-side (lower prices, higher slippage)
-- **Universal Assets:** Consistent buy-side (higher prices, lower slippage)
-- **Prediction:** This pattern likely to continue due to different user bases
+# ==============================================================================
+# 3. CORRELATION ANALYSIS VISUALIZATION
+# ==============================================================================
 
-**Arbitrage Sustainability:**
-- **High-spread tokens (uSEI, uAPT):** May see increased competition
-- **Low-spread tokens:** More sustainable long-term opportunities
-- **Market efficiency:** Expect spreads to compress over time
+def save_correlation_analysis():
+    # Calculate correlations for all tokens in one pass
+    if engine:
+        fits = engine.regression('price_per_token', 'output_amount_formatted', by='symbol').sort_index(key=by_token_rank)
+    else:
+        fits = grouped_regression(df, 'price_per_token', 'output_amount_formatted', by='symbol')
+    fits = fits[fits['n'] > 2]
+    corr_df = pd.DataFrame({'token': fits.index.astype(str), 'correlation': fits['r'].to_numpy()})
 
----
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Correlation Analysis', fontsize=16, fontweight='bold')
 
-"""
+    # 3.1 Price vs Amount Correlation by Token
+    colors = ['#e74c3c' if x < 0 else '#27ae60' for x in corr_df['correlation']]
+    bars = axes[0,0].bar(corr_df['token'], corr_df['correlation'], color=colors, alpha=0.8)
+    axes[0,0].set_title('Price vs Output Amount Correlation by Token', fontweight='bold')
+    axes[0,0].set_ylabel('Correlation Coefficient')
+    axes[0,0].axhline(y=0, color='black', linestyle='--', alpha=0.5)
+    axes[0,0].grid(axis='y', alpha=0.3)
+    axes[0,0].set_ylim(-1.1, 1.1)
+    
+    for i, v in enumerate(corr_df['correlation']):
+        axes[0,0].text(i, v + 0.05 if v > 0 else v - 0.05, f'{v:.3f}', 
+                      ha='center', va='bottom' if v > 0 else 'top', fontweight='bold')
 
-# ==============================================================================
-# 10. TECHNICAL APPENDIX
-# ==============================================================================
+    # 3.2 Price vs Amount Scatter Plot
+    scatter = axes[0,1].scatter(df['price_per_token'], df['output_amount_formatted'], 
+                               c=df['symbol'].astype('category').cat.codes, alpha=0.6, 
+                               cmap='tab10', s=50)
+    axes[0,1].set_title('Price vs Output Amount Scatter', fontweight='bold')
+    axes[0,1].set_xlabel('Price per Token ($)')
+    axes[0,1].set_ylabel('Output Amount')
+    axes[0,1].set_xscale('log')
+    axes[0,1].set_yscale('log')
+    axes[0,1].grid(True, alpha=0.3)
 
-markdown_content += """## 🔧 Technical Appendix
+    # 3.3 Exchange Price Comparison
+    if engine:
+        exchange_prices = engine.exchange_prices().sort_index(key=by_token_rank)
+    else:
+        exchange_prices = df.groupby(['symbol', 'exchange_name'], observed=True)['price_per_token'].mean().unstack()
+    exchange_prices.plot(kind='bar', ax=axes[1,0], color=['#3498db', '#e74c3c'], alpha=0.8)
+    axes[1,0].set_title('Average Price by Token and Exchange', fontweight='bold')
+    axes[1,0].set_ylabel('Average Price ($)')
+    axes[1,0].set_xlabel('Token')
+    axes[1,0].legend(title='Exchange', loc='upper left')
+    axes[1,0].set_yscale('log')
+    axes[1,0].tick_params(axis='x', rotation=45)
+    axes[1,0].grid(axis='y', alpha=0.3)
 
-### Data Quality Assessment
+    # 3.4 Slippage vs Price Analysis
+    slippage_price_corr = np.corrcoef(df['price_per_token'], df['slippage_limit_percent'])[0,1]
+    scatter2 = axes[1,1].scatter(df['price_per_token'], df['slippage_limit_percent'], 
+                                c=df['exchange_name'].astype('category').cat.codes, 
+                                alpha=0.6, s=50, cmap='viridis')
+    axes[1,1].set_title(f'Price vs Slippage (Correlation: {slippage_price_corr:.4f})', fontweight='bold')
+    axes[1,1].set_xlabel('Price per Token ($)')
+    axes[1,1].set_ylabel('Slippage Limit (%)')
+    axes[1,1].set_xscale('log')
+    axes[1,1].grid(True, alpha=0.3)
 
-**Completeness:** 100% - No missing values detected
-**Consistency:** High - All timestamps within 2-minute window
-**Accuracy:** Verified - Price ranges align with market expectations
+    plt.tight_layout()
+    plt.savefig('chart_images/03_correlation_analysis.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    
+    return corr_df
 
-### Methodology
+corr_df = save_correlation_analysis()
 
-**Arbitrage Calculation:**
-```
-Spread % = ((Highest Buy Price - Lowest Sell Price) / Lowest Sell Price) × 100
-```
+# Create correlation table for markdown
+interpretation = np.select(
+    [corr_df['correlation'] > 0.9, corr_df['correlation'] > 0.5, corr_df['correlation'] > 0,
+     corr_df['correlation'] > -0.5, corr_df['correlation'] > -0.9],
+    ["Very strong positive correlation", "Strong positive correlation", "Positive correlation",
+     "Negative correlation", "Strong negative correlation"],
+    default="Very strong negative correlation",
+)
+correlation_table = render_table([
+    ('Token', corr_df['token'], '**{}**'),
+    ('Correlation', corr_df['correlation'], '{:.4f}'),
+    ('Interpretation', interpretation, '{}'),
+])
+
+CORRELATION_SECTION = compile_template("""## 📊 Correlation Analysis
 
-**Correlation Analysis:**
-- Pearson correlation coefficient used for linear relationships
-- Log transformation applied for wide-range variables
-- Statistical significance tested at 95% confidence level
+![Correlation Analysis](chart_images/03_correlation_analysis.png)
 
-**Risk Proxy Calculation:**
-```
-Risk Proxy = 1 / log10(Average Liquidity + 1)
-```
-*Lower values indicate lower risk (higher liquidity)*
+### Primary Relationships
 
-### File Structure
+**1. Price vs Output Amount**
+- **Overall Correlation:** -0.1361 (weak negative correlation)
+- **Interpretation:** As prices increase, output amounts tend to decrease slightly
 
-```
-arbitrage_analysis/
-├── README.md                           # This report
-├── chart_images/                       # All visualization files
-│   ├── 01_data_overview.png
-│   ├── 02_arbitrage_opportunities.png
-│   ├── 03_correlation_analysis.png
-│   ├── 04_exchange_comparison.png
-│   ├── 05_volume_analysis.png
-│   ├── 06_correlation_heatmap.png
-│   └── 07_risk_reward_analysis.png
-├── db_arbitrage.csv                    # Source data
-└── generate_analysis.py                # Analysis script
-```
+**2. Token-Specific Correlations:**
 
-### Dependencies
+${correlation_table}
 
-```python
-pandas>=1.5.0
-numpy>=1.21.0
-matplotlib>=3.5.0
-seaborn>=0.11.0
-```
+**3. Price vs Slippage**
+- **Correlation:** -0.0015 (no correlation)
+- **Interpretation:** Price levels do not influence slippage limit settings
 
 ---
 
-"""
+""")
+
+report.add_template(CORRELATION_SECTION, correlation_table=correlation_table)
 
 # ==============================================================================
-# 11. CONCLUSIONS
+# 4. EXCHANGE COMPARISON ANALYSIS
 # ==============================================================================
 
-markdown_content += """## 🔍 Conclusions
-
-### Executive Summary
-
-The analysis of 500 arbitrage quotes from Base L2 chain reveals a **well-structured arbitrage ecosystem** with clear opportunities and defined risk profiles.
+def save_exchange_comparison():
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Exchange Comparison Analysis', fontsize=16, fontweight='bold')
 
-### Key Findings
+    # 4.1 Average Price by Exchange
+    if engine:
+        exchange_stats = engine.exchange_stats().round(2)
+    else:
+        exchange_stats = df.groupby('exchange_name', observed=True).agg({
+            'price_per_token': 'mean',
+            'output_amount_formatted': 'mean',
+            'slippage_limit_percent': 'mean'
+        }).round(2)
 
-**🎯 Primary Opportunity:** uSEI presents an exceptional 19.42% arbitrage spread, representing the highest profit potential in the dataset.
+    bars = axes[0,0].bar(exchange_stats.index, exchange_stats['price_per_token'], 
+                        color=['#3498db', '#e74c3c'], alpha=0.8)
+    axes[0,0].set_title('Average Price by Exchange', fontweight='bold')
+    axes[0,0].set_ylabel('Average Price ($)')
+    axes[0,0].set_yscale('log')
+    axes[0,0].grid(axis='y', alpha=0.3)
+    
+    for i, v in enumerate(exchange_stats['price_per_token']):
+        axes[0,0].text(i, v * 1.1, f'${v:,.2f}', ha='center', va='bottom', fontweight='bold')
 
-**📊 Market Structure:** Perfect segregation between exchanges with KyberSwap handling all SELL orders and Universal Assets managing all BUY orders.
+    # 4.2 Output Amount Comparison
+    bars = axes[0,1].bar(exchange_stats.index, exchange_stats['output_amount_formatted'], 
+                        color=['#e74c3c', '#27ae60'], alpha=0.8)
+    axes[0,1].set_title('Average Output Amount by Exchange', fontweight='bold')
+    axes[0,1].set_ylabel('Average Output Amount')
+    axes[0,1].set_yscale('log')
+    axes[0,1].grid(axis='y', alpha=0.3)
+    
+    for i, v in enumerate(exchange_stats['output_amount_formatted']):
+        axes[0,1].text(i, v * 1.1, f'{v:,.0f}', ha='center', va='bottom', fontweight='bold')
 
-**💡 Strategic Insight:** The consistent price differentials suggest sustainable arbitrage opportunities, particularly for automated trading systems.
+    # 4.3 Slippage Comparison
+    bars = axes[1,0].bar(exchange_stats.index, exchange_stats['slippage_limit_percent'], 
+                        color=['#f39c12', '#9b59b6'], alpha=0.8)
+    axes[1,0].set_title('Average Slippage by Exchange', fontweight='bold')
+    axes[1,0].set_ylabel('Slippage Limit (%)')
+    axes[1,0].grid(axis='y', alpha=0.3)
+    
+    for i, v in enumerate(exchange_stats['slippage_limit_percent']):
+        axes[1,0].text(i, v + 0.01, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
 
-### Bottom Line Up Front (BLUF)
+    # 4.4 Price Spread Between Exchanges
+    if engine:
+        spread_df = engine.exchange_spreads().sort_values('token', key=by_token_rank, ignore_index=True)
+    else:
+        spread_df = exchange_spreads(df)
+    colors = ['#e74c3c' if x > 10 else '#f39c12' if x > 2 else '#27ae60' 
+              for x in spread_df['spread']]
+    bars = axes[1,1].bar(spread_df['token'], spread_df['spread'], color=colors, alpha=0.8)
+    axes[1,1].set_title('Price Spread Between Exchanges', fontweight='bold')
+    axes[1,1].set_ylabel('Price Difference (%)')
+    axes[1,1].set_xlabel('Token')
+    axes[1,1].grid(axis='y', alpha=0.3)
+    
+    for i, v in enumerate(spread_df['spread']):
+        axes[1,1].text(i, v + 0.2, f'{v:.2f}%', ha='center', va='bottom', fontweight='bold')
 
-**Immediate Action:** Focus on uSEI and uAPT for highest returns
-**Risk Management:** Monitor liquidity depth and gas costs
-**Long-term Strategy:** Develop automated monitoring for sustainable profits
+    plt.tight_layout()
+    plt.savefig('chart_images/04_exchange_comparison.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    
+    return exchange_stats, spread_df
 
-### Future Considerations
+exchange_stats, spread_df = save_exchange_comparison()
 
-**Market Evolution:** 
-- Expected compression of spreads as market matures
-- Potential for new tokens to create additional opportunities
-- Possible changes in exchange dynamics
+# Create exchange comparison tables
+quote_counts = df['exchange_name'].value_counts()
+exchange_table = render_table([
+    ('Exchange', exchange_stats.index, '**{}**'),
+    ('Average Price ($)', exchange_stats['price_per_token'], '${:,.2f}'),
+    ('Average Output Amount', exchange_stats['output_amount_formatted'], '{:,.0f}'),
+    ('Average Slippage (%)', exchange_stats['slippage_limit_percent'], '{:.1f}%'),
+    ('Quote Count', quote_counts.reindex(exchange_stats.index), '{}'),
+])
+
+spread_table = render_table([
+    ('Token', spread_df['token'], '**{}**'),
+    ('KyberSwap (Avg)', spread_df['kyber_avg'], '${:.8f}'),
+    ('Universal Assets (Avg)', spread_df['universal_avg'], '${:.8f}'),
+    ('Price Difference', spread_df['spread'], '**{:.2f}%**'),
+])
+
+EXCHANGE_SECTION = compile_template("""## 🏢 Exchange Comparison
 
-**Technical Development:**
-- Real-time API integration for live monitoring
-- Machine learning models for spread prediction
-- Cross-chain arbitrage expansion
+![Exchange Comparison](chart_images/04_exchange_comparison.png)
 
-**Risk Monitoring:**
-- Regulatory changes affecting DeFi operations
-- Smart contract risks on Base L2
-- Liquidity provider behavior changes
+### Exchange Profile Comparison
 
----
+${exchange_table}
 
-*Analysis completed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC*
-*Dataset: 500 quotes from Base L2 chain v_latest_quotes*
-*Methodology: Statistical correlation analysis with visual data exploration*
+### Market Role Analysis
 
----
+**KyberSwap Profile**
+- **Total Quotes:** 250 (exclusively SELL orders)
+- **Market Role:** Sell-side exchange (lower prices)
+- **Characteristics:** Higher slippage tolerance (0.5%), lower liquidity
 
-## 📈 Quick Reference
+**Universal Assets Profile**  
+- **Total Quotes:** 250 (exclusively BUY orders)
+- **Market Role:** Buy-side exchange (higher prices)
+- **Characteristics:** Lower slippage tolerance (0.2%), higher liquidity
 
-| Metric | Value |
-|--------|-------|
-| **Best Opportunity** | uSEI (19.42% spread) |
-| **Safest Bet** | uAPT (4.71% spread) |
-| **Market Structure** | Segregated (KyberSwap=SELL, Universal=BUY) |
-| **Total Opportunities** | 6 tokens with positive spreads |
-| **Recommended Threshold** | >1% spread for execution |
-| **Risk Level** | Low to Moderate (established exchanges) |
+### Inter-Exchange Price Spreads
 
-"""
+${spread_table}
+
+---
+
+""")
+
+report.add_template(EXCHANGE_SECTION, exchange_table=exchange_table, spread_table=spread_table)
 
 # ==============================================================================
-# 12. SAVE MARKDOWN FILE
+# 5. VOLUME AND LIQUIDITY ANALYSIS
 # ==============================================================================
 
-# Save the main markdown file
-with open('README.md', 'w', encoding='utf-8') as f:
-    f.write(markdown_content)
+def save_volume_analysis():
+    fig, axes = plt.subplots(1, 2, figsize=(16, 8))
+    fig.suptitle('Volume and Liquidity Analysis', fontsize=16, fontweight='bold')
 
-# Create additional analysis files
-def create_quick_start_guide():
-    quick_start = """# Quick Start Guide - Base L2 Arbitrage
+    # 5.1 Output Amount Distribution by Token
+    tokens = df['symbol'].unique()
+    token_data = [df[df['symbol'] == token]['output_amount_formatted'].values for token in tokens]
+    
+    box_plot = axes[0].boxplot(token_data, tick_labels=tokens, patch_artist=True)
+    colors = plt.cm.Set3(np.linspace(0, 1, len(tokens)))
+    for patch, color in zip(box_plot['boxes'], colors):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.7)
+    
+    axes[0].set_title('Output Amount Distribution by Token', fontweight='bold')
+    axes[0].set_ylabel('Output Amount (Log Scale)')
+    axes[0].set_yscale('log')
+    axes[0].set_xlabel('Token')
+    axes[0].grid(axis='y', alpha=0.3)
+    axes[0].tick_params(axis='x', rotation=45)
 
-## 🚀 Immediate Actions
+    # 5.2 Quote Type Distribution by Exchange
+    quote_distribution = pd.crosstab(df['exchange_name'], df['quote_type'])
+    quote_distribution.plot(kind='bar', ax=axes[1], color=['#3498db', '#e74c3c'], alpha=0.8)
+    axes[1].set_title('Quote Type Distribution by Exchange', fontweight='bold')
+    axes[1].set_ylabel('Number of Quotes')
+    axes[1].set_xlabel('Exchange')
+    axes[1].legend(title='Quote Type')
+    axes[1].tick_params(axis='x', rotation=0)
+    axes[1].grid(axis='y', alpha=0.3)
+    
+    # Add value labels on bars
+    for container in axes[1].containers:
+        axes[1].bar_label(container, fontweight='bold')
 
-### Top 3 Opportunities (Execute Now)
-1. **uSEI**: 19.42% spread - Buy KyberSwap, Sell Universal Assets
-2. **uAPT**: 4.71% spread - Buy KyberSwap, Sell Universal Assets  
-3. **uLINK**: 1.21% spread - Buy KyberSwap, Sell Universal Assets
+    plt.tight_layout()
+    plt.savefig('chart_images/05_volume_analysis.png', dpi=300, bbox_inches='tight')
+    plt.close()
 
-### Pre-Execution Checklist
-- [ ] Check current gas prices on Base L2
-- [ ] Verify liquidity depth on both exchanges
-- [ ] Confirm wallet balances for execution
-- [ ] Set up slippage tolerance (0.2-0.5%)
-- [ ] Monitor price movement for 30 seconds before execution
+save_volume_analysis()
 
-### Risk Limits
-- **Maximum Position Size**: 10% of visible liquidity
-- **Stop Loss**: Close if spread drops below 0.5%
-- **Gas Budget**: Max 0.1% of trade value
+VOLUME_SECTION = compile_template("""## 📈 Volume and Liquidity Analysis
 
-## 📊 Monitoring Dashboard
+![Volume and Liquidity Analysis](chart_images/05_volume_analysis.png)
 
-### Key Metrics to Track
-- Real-time spread percentages
-- Liquidity depth on both exchanges
-- Gas price trends
-- Transaction success rates
+### Key Observations
 
-### Alert Thresholds
-- **uSEI**: Alert if spread > 15%
-- **uAPT**: Alert if spread > 3%
-- **Others**: Alert if spread > 1%
+**Liquidity Distribution:**
+- **High Liquidity Tokens:** ${high_liquidity_token} shows the largest output amounts
+- **Moderate Liquidity:** ${moderate_liquidity_tokens} show balanced liquidity
+- **Exchange Specialization:** ${specialization}
+
+**Market Structure:**
+${exchange_roles}
 
 ---
-*Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
-    
-    with open('QUICK_START.md', 'w', encoding='utf-8') as f:
-        f.write(quick_start)
 
-def create_technical_details():
-    technical = """# Technical Implementation Details
+""")
+
+token_liquidity = df.groupby('symbol', observed=True)['output_amount_formatted'].mean().sort_values(ascending=False)
+report.add_template(
+    VOLUME_SECTION,
+    high_liquidity_token=token_liquidity.index[0],
+    moderate_liquidity_tokens=', '.join(map(str, token_liquidity.index[1:4])) or 'no other tokens',
+    specialization=('Clear separation between buy-side and sell-side operations' if segregated_market
+                    else 'Some exchanges quote both sides'),
+    exchange_roles='\n'.join(
+        f"- **{exchange}:** " + ' and '.join(f"{count:,} {side}" for side, count in sides[sides > 0].items())
+        + (' quotes only' if (sides > 0).sum() == 1 else ' quotes')
+        for exchange, sides in exchange_sides.iterrows()),
+)
 
-## Data Processing Pipeline
+# ==============================================================================
+# 6. CORRELATION HEATMAP
+# ==============================================================================
 
-### 1. Data Ingestion
-```sql
-SELECT * FROM v_latest_quotes WHERE price_per_token != 0 LIMIT 500
-```
+def save_correlation_heatmap():
+    # Create correlation heatmap
+    numeric_cols = ['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']
+    correlation_matrix = df[numeric_cols].corr()
 
-### 2. Arbitrage Detection Algorithm
-```python
-def detect_arbitrage(token_data):
-    buy_orders = token_data[token_data['quote_type'] == 'BUY']
-    sell_orders = token_data[token_data['quote_type'] == 'SELL']
-    
-    if len(buy_orders) > 0 and len(sell_orders) > 0:
-        highest_buy = buy_orders['price_per_token'].max()
-        lowest_sell = sell_orders['price_per_token'].min()
-        
-        spread = (highest_buy - lowest_sell) / lowest_sell * 100
-        return spread
-    return 0
-```
+    plt.figure(figsize=(10, 8))
+    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
+    heatmap = sns.heatmap(correlation_matrix, annot=True, cmap='RdYlBu_r', center=0, 
+                         square=True, fmt='.3f', cbar_kws={'shrink': 0.8},
+                         linewidths=0.5, mask=mask)
+    plt.title('Correlation Heatmap - Numeric Variables', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig('chart_images/06_correlation_heatmap.png', dpi=300, bbox_inches='tight')
+    plt.close()
 
-### 3. Risk Assessment Framework
-```python
-def calculate_risk_score(token, liquidity, spread):
-    liquidity_risk = 1 / log10(liquidity + 1)
-    spread_reward = spread / 100
-    
-    risk_score = liquidity_risk / spread_reward
-    return risk_score
-```
+save_correlation_heatmap()
 
-## Exchange Integration
+report.add("""## 🔥 Correlation Heatmap
 
-### KyberSwap API Integration
-```python
-kyber_endpoint = "https://aggregator-api.kyberswap.com/base/api/v1/routes"
-```
+![Correlation Heatmap](chart_images/06_correlation_heatmap.png)
 
-### Universal Assets API Integration
-```python
-universal_endpoint = "https://api.universal.assets/v1/quotes"
-```
+### Correlation Insights
 
-## Execution Strategy
+**Strong Relationships:**
+- **Price vs Amount:** Weak negative correlation (-0.136)
+- **Price vs Slippage:** No correlation (-0.001)
+- **Amount vs Slippage:** Weak positive correlation (0.068)
 
-### Optimal Trade Size Calculation
-```python
-def calculate_optimal_size(available_liquidity, target_spread):
-    # Conservative approach: 5-10% of available liquidity
-    max_size = available_liquidity * 0.1
-    min_profitable_size = 100  # $100 minimum
-    
-    return max(min_profitable_size, min(max_size, 1000))
-```
+**Interpretation:**
+- Price levels are largely independent of slippage settings
+- Higher prices tend to slightly reduce output amounts
+- Slippage tolerance shows minimal relationship with other factors
 
 ---
-*Technical Documentation v1.0*
-"""
-    
-    with open('TECHNICAL_DETAILS.md', 'w', encoding='utf-8') as f:
-        f.write(technical)
 
-# Generate additional files
-create_quick_start_guide()
-create_technical_details()
+""")
 
-print("✅ ANALYSIS COMPLETE!")
-print("\n📁 Generated Files:")
-print("├── README.md (Main analysis report)")
-print("├── QUICK_START.md (Immediate action guide)")
-print("├── TECHNICAL_DETAILS.md (Implementation details)")
-print("└── chart_images/ (All visualization files)")
-print("    ├── 01_data_overview.png")
-print("    ├── 02_arbitrage_opportunities.png")
-print("    ├── 03_correlation_analysis.png")
-print("    ├── 04_exchange_comparison.png")
-print("    ├── 05_volume_analysis.png")
-print("    ├── 06_correlation_heatmap.png")
-print("    └── 07_risk_reward_analysis.png")
+def save_token_correlation_heatmap():
+    # Correlate 1-minute log returns of every token pair
+    token_returns = bucket_returns(df, freq=TOKEN_CORRELATION_BUCKET)
+    token_corr = correlation_matrix(token_returns)
 
-print("\n🚀 Next Steps:")
-print("1. Upload all files to GitHub repository")
-print("2. Review README.md for complete analysis")
-print("3. Use QUICK_START.md for immediate trading actions")
-print("4. Reference TECHNICAL_DETAILS.md for implementation")
+    size = max(8, 0.35 * len(token_corr))
+    plt.figure(figsize=(size + 2, size))
+    sns.heatmap(token_corr, annot=len(token_corr) <= 20, cmap='RdYlBu_r', center=0, vmin=-1, vmax=1,
+                square=True, fmt='.2f', cbar_kws={'shrink': 0.8}, linewidths=0.5 if len(token_corr) <= 40 else 0)
+    plt.title(f'Cross-Token Return Correlation ({TOKEN_CORRELATION_BUCKET} buckets)', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig('chart_images/06_token_correlation_heatmap.png', dpi=300, bbox_inches='tight')
+    plt.close()
 
-print(f"\n📊 Analysis Summary:")
-print(f"• Best Opportunity: uSEI ({arb_df.iloc[0]['spread_percent']:.2f}% spread)")
-print(f"• Total Opportunities: {len(arb_df)} tokens with positive spreads")
-print(f"• Market Structure: Segregated exchange roles")
-print(f"• Risk Level: Low to Moderate")
+    return token_returns, token_corr
 
-print("\n🎯 Key Insight: KyberSwap consistently offers lower prices (SELL market)")
-print("while Universal Assets provides higher prices (BUY market), creating")
-print("systematic arbitrage opportunities across all 6 tokens analyzed.").savefig('chart_images/01_data_overview.png', dpi=300, bbox_inches='tight')
+TOKEN_CORRELATION_BUCKET = '1min'
+token_returns, token_corr = save_token_correlation_heatmap()
 
-save_data_overview()
+# Strongest and weakest co-moving pairs, each pair once
+pair_corr = token_corr.where(np.triu(np.ones(token_corr.shape, dtype=bool), k=1)).stack().dropna().sort_values(ascending=False)
+shown_pairs = pair_corr if len(pair_corr) <= 6 else pd.concat([pair_corr.head(3), pair_corr.tail(3)])
+token_pairs_table = render_table([
+    ('Pair', [f"{a} / {b}" for a, b in shown_pairs.index], '**{}**'),
+    ('Return Correlation', shown_pairs, '{:.3f}'),
+])
 
-# Add to markdown
-markdown_content += """## 📊 Data Overview
+TOKEN_CORRELATION_SECTION = compile_template("""## 🔗 Cross-Token Correlation
 
-![Data Overview](chart_images/01_data_overview.png)
+![Cross-Token Correlation](chart_images/06_token_correlation_heatmap.png)
 
-The dataset shows a balanced distribution across 6 major tokens with equal representation between the two exchanges. The price distribution reveals significant variety, from micro-priced tokens like uSHIB to high-value assets like uBTC.
+Quotes of every token are resampled onto ${bucket} buckets (${bucket_count} buckets with returns), and
+log returns are correlated for each token pair over the buckets where both moved.
 
+**Most and least correlated pairs:**
+
+${token_pairs_table}
 ---
 
-"""
+""")
+
+report.add_template(TOKEN_CORRELATION_SECTION, bucket=TOKEN_CORRELATION_BUCKET,
+                    bucket_count=len(token_returns), token_pairs_table=token_pairs_table)
 
 # ==============================================================================
-# 2. ARBITRAGE OPPORTUNITIES VISUALIZATION
+# 7. RISK-REWARD ANALYSIS
 # ==============================================================================
 
-def save_arbitrage_opportunities():
-    # Calculate arbitrage opportunities
-    arbitrage_data = []
-    tokens = df['symbol'].unique()
+RISK_REWARD_LABELS = 15
 
-    for token in tokens:
-        token_data = df[df['symbol'] == token]
-        buy_orders = token_data[token_data['quote_type'] == 'BUY']
-        sell_orders = token_data[token_data['quote_type'] == 'SELL']
-        
-        if len(buy_orders) > 0 and len(sell_orders) > 0:
-            highest_buy = buy_orders.loc[buy_orders['price_per_token'].idxmax()]
-            lowest_sell = sell_orders.loc[sell_orders['price_per_token'].idxmin()]
-            
-            spread_percent = ((highest_buy['price_per_token'] - lowest_sell['price_per_token']) / 
-                             lowest_sell['price_per_token']) * 100
-            
-            arbitrage_data.append({
-                'token': token,
-                'buy_exchange': lowest_sell['exchange_name'],
-                'sell_exchange': highest_buy['exchange_name'],
-                'buy_price': lowest_sell['price_per_token'],
-                'sell_price': highest_buy['price_per_token'],
-                'spread_percent': spread_percent
-            })
-
-    arb_df = pd.DataFrame(arbitrage_data).sort_values('spread_percent', ascending=False)
+def save_risk_reward_analysis():
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
 
-    # Plot arbitrage opportunities
-    fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-    fig.suptitle('Arbitrage Opportunities Analysis', fontsize=16, fontweight='bold')
+    scores = risk_reward_scores(df, arb_df)
+    colors = plt.cm.viridis(np.linspace(0, 1, len(scores)))
 
-    # 2.1 Spread Percentage by Token
-    colors = ['#e74c3c' if x > 10 else '#f39c12' if x > 2 else '#27ae60' 
-              for x in arb_df['spread_percent']]
-    bars = axes[0].bar(arb_df['token'], arb_df['spread_percent'], color=colors, alpha=0.8)
-    axes[0].set_title('Arbitrage Spread by Token', fontweight='bold', fontsize=14)
-    axes[0].set_ylabel('Spread Percentage (%)', fontsize=12)
-    axes[0].set_xlabel('Token', fontsize=12)
-    axes[0].grid(axis='y', alpha=0.3)
+    # All opportunities in one scatter call
+    ax.scatter(scores['risk_proxy'], scores['reward'], s=200, alpha=0.7,
+               c=colors, edgecolors='black', linewidth=1)
+
+    # Label the highest-reward tokens only, so large token sets stay readable
+    for i in scores['reward'].nlargest(RISK_REWARD_LABELS).index:
+        ax.annotate(scores.at[i, 'token'], (scores.at[i, 'risk_proxy'], scores.at[i, 'reward']),
+                   xytext=(10, 10), textcoords='offset points', 
+                   fontsize=12, fontweight='bold',
+                   bbox=dict(boxstyle='round,pad=0.3', facecolor=colors[i], alpha=0.3))
+
+    # Style settings
+    ax.set_xlabel('Risk Proxy (Inverse Liquidity)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Arbitrage Spread (%)', fontsize=12, fontweight='bold')
+    ax.set_title('Risk-Reward Analysis: Arbitrage Opportunities', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
     
-    for i, v in enumerate(arb_df['spread_percent']):
-        axes[0].text(i, v + 0.3, f'{v:.2f}%', ha='center', va='bottom', 
-                    fontweight='bold', fontsize=11)
-
-    # 2.2 Buy vs Sell Prices Comparison
-    x = np.arange(len(arb_df))
-    width = 0.35
-    bars1 = axes[1].bar(x - width/2, arb_df['buy_price'], width, 
-                       label='Buy Price (Lower)', alpha=0.8, color='#3498db')
-    bars2 = axes[1].bar(x + width/2, arb_df['sell_price'], width, 
-                       label='Sell Price (Higher)', alpha=0.8, color='#e74c3c')
-    axes[1].set_title('Buy vs Sell Prices Comparison', fontweight='bold', fontsize=14)
-    axes[1].set_ylabel('Price ($)', fontsize=12)
-    axes[1].set_xlabel('Token', fontsize=12)
-    axes[1].set_xticks(x)
-    axes[1].set_xticklabels(arb_df['token'])
-    axes[1].legend()
-    axes[1].set_yscale('log')
-    axes[1].grid(axis='y', alpha=0.3)
+    # Add quadrant lines
+    ax.axhline(y=HIGH_REWARD_PERCENT, color='red', linestyle='--', alpha=0.5,
+               label=f'High Reward Threshold ({HIGH_REWARD_PERCENT:g}%)')
+    ax.axvline(x=MODERATE_RISK, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk Threshold')
+    ax.legend()
 
     plt.tight_layout()
-    plt.savefig('chart_images/02_arbitrage_opportunities.png', dpi=300, bbox_inches='tight')
+    plt.savefig('chart_images/07_risk_reward_analysis.png', dpi=300, bbox_inches='tight')
     plt.close()
+
+    return scores
+
+risk_scores = save_risk_reward_analysis()
+
+report.add("""## 🎯 Risk-Reward Analysis
+
+![Risk-Reward Analysis](chart_images/07_risk_reward_analysis.png)
+
+""")
+# Size positions from the price-impact curves as well, when quote ladders were
+# downloaded (`python price_impact.py`); otherwise only the liquidity heuristic is shown.
+try:
+    impact_optimal = PriceImpactCurves(load_ladders()).optimal_sizes()
+except FileNotFoundError:
+    impact_optimal = None
+report.add(risk_table(risk_scores, impact_optimal))
+if impact_optimal is not None:
+    report.add(f"""
+Position Size is 10% of the mean quoted amount, clamped to $100-$1000. Impact-Optimal Size maximizes
+expected profit on the token's price-impact curves (see [{IMPACT_REPORT}]({IMPACT_REPORT})).
+""")
+
+# Quadrant -> (position on the chart, what it means), in order of preference
+QUADRANTS = {
+    'High Reward, Low Risk': ('Top Left', 'Highest profit potential with manageable risk'),
+    'High Reward, High Risk': ('Top Right', 'Large spreads on thin liquidity; size positions carefully'),
+    'Low Reward, Low Risk': ('Bottom Left', 'Lower profits but high execution probability'),
+    'Low Reward, High Risk': ('Bottom Right', 'Small spreads on thin liquidity; lowest priority'),
+}
+QUADRANT_TOKENS = 6
+quadrant_lines = []
+for quadrant, (position, meaning) in QUADRANTS.items():
+    members = risk_scores[risk_scores['quadrant'] == quadrant].sort_values('reward', ascending=False)
+    if members.empty:
+        continue
+    items = spread_items(members.head(QUADRANT_TOKENS))
+    if len(members) > QUADRANT_TOKENS:
+        items.append(f"and {len(members) - QUADRANT_TOKENS} more")
+    quadrant_lines += [f"**{quadrant} ({position}):**", f"- {', '.join(items)}", f"- {meaning}", ""]
+
+report.add("\n### Investment Quadrant Analysis\n\n" + '\n'.join(quadrant_lines) + "\n---\n\n")
+
+# ==============================================================================
+# 8. SUMMARY STATISTICS AND INSIGHTS
+# ==============================================================================
+
+def create_summary_statistics():
+    # Generate comprehensive statistics
+    overall_stats = df[['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']].describe()
     
-    return arb_df
+    # Token-wise statistics
+    token_stats = df.groupby('symbol', observed=True)[['price_per_token', 'output_amount_formatted']].agg(['mean', 'std', 'min', 'max'])
+    
+    # Exchange-wise statistics
+    exchange_stats_detailed = df.groupby('exchange_name', observed=True)[['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']].describe()
+    
+    return overall_stats, token_stats, exchange_stats_detailed
 
-arb_df = save_arbitrage_opportunities()
+overall_stats, token_stats, exchange_stats_detailed = create_summary_statistics()
 
-# Create arbitrage table for markdown
-arbitrage_table = """| Rank | Token | Spread | Buy At | Sell At | Buy Price | Sell Price |
-|------|-------|--------|---------|---------|-----------|------------|
-"""
+# Create detailed statistics tables
+overall_stats_md = overall_stats.round(6).to_markdown()
+token_stats_md = token_stats.round(6).to_markdown()
 
-for i, (_, row) in enumerate(arb_df.iterrows(), 1):
-    arbitrage_table += f"| **{i}** | **{row['token']}** | **{row['spread_percent']:.2f}%** | {row['buy_exchange']} | {row['sell_exchange']} | ${row['buy_price']:.8f} | ${row['sell_price']:.8f} |\n"
+STATISTICS_SECTION = compile_template("""## 📋 Detailed Statistics
 
-markdown_content += f"""## 🎯 Arbitrage Opportunities Identified
+### Overall Dataset Statistics
 
-![Arbitrage Opportunities](chart_images/02_arbitrage_opportunities.png)
+```
+${overall_stats_md}
+```
 
-### Top 6 Best Opportunities
+### Token-Wise Detailed Statistics
+
+```
+${token_stats_md}
+```
 
-{arbitrage_table}
+### Key Statistical Insights
 
-### 🔥 Key Finding: uSEI Shows Exceptional Arbitrage Opportunity at {arb_df.iloc[0]['spread_percent']:.2f}%
+**Price Levels:**
+- **Highest Price:** ${priciest_token} with prices around $$${priciest_price}
+- **Lowest Price:** ${cheapest_token} with micro-pricing around $$${cheapest_price}
+- **Most Consistent:** ${consistent_tokens} showing the narrowest price ranges relative to price
 
-**uSEI** presents the most significant arbitrage opportunity with nearly 20% price spread between the two exchanges. This could be attributed to:
-- Differences in liquidity pool depth
-- Price update latency between exchanges
-- Varying slippage tolerance configurations
+**Liquidity Patterns:**
+- **Highest Liquidity:** ${liquid_token} with output amounts averaging ${liquid_amount} tokens
+- **Balanced Liquidity:** Most other tokens show moderate output amounts
+- **Exchange Bias:** ${liquid_exchange} shows the higher average output amounts
 
 ---
 
-"""
+""")
+
+price_means = token_stats[('price_per_token', 'mean')]
+# Standard deviation relative to the mean, so tokens at any price level compare
+price_dispersion = (token_stats[('price_per_token', 'std')] / price_means).dropna().sort_values()
+output_means = token_stats[('output_amount_formatted', 'mean')]
+report.add_template(
+    STATISTICS_SECTION, overall_stats_md=overall_stats_md, token_stats_md=token_stats_md,
+    priciest_token=price_means.idxmax(), priciest_price=f"{price_means.max():,.2f}",
+    cheapest_token=price_means.idxmin(), cheapest_price=f"{price_means.min():.8f}",
+    consistent_tokens=' and '.join(map(str, price_dispersion.index[:2])),
+    liquid_token=output_means.idxmax(), liquid_amount=f"{output_means.max():,.0f}",
+    liquid_exchange=df.groupby('exchange_name', observed=True)['output_amount_formatted'].mean().idxmax(),
+)
 
 # ==============================================================================
-# 3. CORRELATION ANALYSIS VISUALIZATION
+# 9. STRATEGIC RECOMMENDATIONS
 # ==============================================================================
 
-def save_correlation_analysis():
-    # Calculate correlations for each token
-    correlation_data = []
-    tokens = df['symbol'].unique()
-    
-    for token in tokens:
-        token_data = df[df['symbol'] == token]
-        if len(token_data) > 2:
-            corr = np.corrcoef(token_data['price_per_token'], token_data['output_amount_formatted'])[0,1]
-            correlation_data.append({'token': token, 'correlation': corr})
+RECOMMENDATIONS_SECTION = compile_template("""## 🎯 Strategic Recommendations
 
-    corr_df = pd.DataFrame(correlation_data)
+### 1. Immediate Action Items
 
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-    fig.suptitle('Correlation Analysis', fontsize=16, fontweight='bold')
+**High Priority Opportunities:**
+${high_priority}
 
-    # 3.1 Price vs Amount Correlation by Token
-    colors = ['#e74c3c' if x < 0 else '#27ae60' for x in corr_df['correlation']]
-    bars = axes[0,0].bar(corr_df['token'], corr_df['correlation'], color=colors, alpha=0.8)
-    axes[0,0].set_title('Price vs Output Amount Correlation by Token', fontweight='bold')
-    axes[0,0].set_ylabel('Correlation Coefficient')
-    axes[0,0].axhline(y=0, color='black', linestyle='--', alpha=0.5)
-    axes[0,0].grid(axis='y', alpha=0.3)
-    axes[0,0].set_ylim(-1.1, 1.1)
-    
-    for i, v in enumerate(corr_df['correlation']):
-        axes[0,0].text(i, v + 0.05 if v > 0 else v - 0.05, f'{v:.3f}', 
-                      ha='center', va='bottom' if v > 0 else 'top', fontweight='bold')
+**Medium Priority:**
+${medium_priority}
 
-    # 3.2 Price vs Amount Scatter Plot
-    scatter = axes[0,1].scatter(df['price_per_token'], df['output_amount_formatted'], 
-                               c=df['symbol'].astype('category').cat.codes, alpha=0.6, 
-                               cmap='tab10', s=50)
-    axes[0,1].set_title('Price vs Output Amount Scatter', fontweight='bold')
-    axes[0,1].set_xlabel('Price per Token ($)')
-    axes[0,1].set_ylabel('Output Amount')
-    axes[0,1].set_xscale('log')
-    axes[0,1].set_yscale('log')
-    axes[0,1].grid(True, alpha=0.3)
+### 2. Risk Management Framework
 
-    # 3.3 Exchange Price Comparison
-    exchange_prices = df.groupby(['symbol', 'exchange_name'])['price_per_token'].mean().unstack()
-    exchange_prices.plot(kind='bar', ax=axes[1,0], color=['#3498db', '#e74c3c'], alpha=0.8)
-    axes[1,0].set_title('Average Price by Token and Exchange', fontweight='bold')
-    axes[1,0].set_ylabel('Average Price ($)')
-    axes[1,0].set_xlabel('Token')
-    axes[1,0].legend(title='Exchange', loc='upper left')
-    axes[1,0].set_yscale('log')
-    axes[1,0].tick_params(axis='x', rotation=45)
-    axes[1,0].grid(axis='y', alpha=0.3)
+**Liquidity Assessment:**
+- Monitor real-time liquidity depth before large transactions
+- Set maximum transaction sizes based on average output amounts
+- Implement gradual position sizing for high-spread opportunities
 
-    # 3.4 Slippage vs Price Analysis
-    slippage_price_corr = np.corrcoef(df['price_per_token'], df['slippage_limit_percent'])[0,1]
-    scatter2 = axes[1,1].scatter(df['price_per_token'], df['slippage_limit_percent'], 
-                                c=df['exchange_name'].astype('category').cat.codes, 
-                                alpha=0.6, s=50, cmap='viridis')
-    axes[1,1].set_title(f'Price vs Slippage (Correlation: {slippage_price_corr:.4f})', fontweight='bold')
-    axes[1,1].set_xlabel('Price per Token ($)')
-    axes[1,1].set_ylabel('Slippage Limit (%)')
-    axes[1,1].set_xscale('log')
-    axes[1,1].grid(True, alpha=0.3)
+**Technical Considerations:**
+- **Gas Optimization:** Batch transactions on Base L2 for cost efficiency
+- **Slippage Management:** Account for 0.2-0.5% slippage differences
+- **Timing Strategy:** Monitor price update frequencies between exchanges
 
-    plt.tight_layout()
-    plt.savefig('chart_images/03_correlation_analysis.png', dpi=300, bbox_inches='tight')
-    plt.close()
+### 3. Algorithm Implementation
+
+**Automated Monitoring System:**
+```python
+# Pseudo-code for arbitrage monitoring
+def monitor_arbitrage():
+    thresholds = {
+${alert_thresholds}
+        'others': 1.0    # Alert above 1% spread
+    }
     
-    return corr_df
+    while True:
+        current_spreads = calculate_spreads()
+        for token, spread in current_spreads.items():
+            if spread > thresholds.get(token, 1.0):
+                execute_arbitrage(token, spread)
+```
 
-corr_df = save_correlation_analysis()
+**Execution Strategy:**
+- **Real-time Monitoring:** 5-second update intervals
+- **Spread Thresholds:** Dynamic based on historical volatility
+- **Position Sizing:** Max 10% of available liquidity per trade
 
-# Create correlation table for markdown
-correlation_table = """| Token | Correlation | Interpretation |
-|-------|-------------|----------------|
-"""
+### 4. Market Structure Insights
 
-for _, row in corr_df.iterrows():
-    if row['correlation'] > 0.9:
-        interpretation = "Very strong positive correlation"
-    elif row['correlation'] > 0.5:
-        interpretation = "Strong positive correlation"
-    elif row['correlation'] > 0:
-        interpretation = "Positive correlation"
-    elif row['correlation'] > -0.5:
-        interpretation = "Negative correlation"
-    elif row['correlation'] > -0.9:
-        interpretation = "Strong negative correlation"
-    else:
-        interpretation = "Very strong negative correlation"
-    
-    correlation_table += f"| **{row['token']}** | {row['correlation']:.4f} | {interpretation} |\n"
+**Exchange Specialization Pattern:**
+- **Sides Quoted:** ${market_roles}
+- **Prediction:** This pattern likely to continue due to different user bases
 
-markdown_content += f"""## 📊 Correlation Analysis
+**Arbitrage Sustainability:**
+- **High-spread tokens (${high_spread_tokens}):** May see increased competition
+- **Low-spread tokens:** More sustainable long-term opportunities
+- **Market efficiency:** Expect spreads to compress over time
 
-![Correlation Analysis](chart_images/03_correlation_analysis.png)
+---
 
-### Primary Relationships
+""")
+
+high_priority, medium_priority = positive_spreads.iloc[:2], positive_spreads.iloc[2:4]
+report.add_template(
+    RECOMMENDATIONS_SECTION,
+    high_priority='\n'.join(f"- {item}: Execute promptly but monitor liquidity depth"
+                            for item in spread_items(high_priority)) or "- No token has a positive spread",
+    medium_priority='\n'.join(f"- {item}: Smaller but steadier opportunity"
+                              for item in spread_items(medium_priority)) or "- None",
+    alert_thresholds='\n'.join(
+        f"        '{token}': {alert_threshold(spread)},    # Alert above {alert_threshold(spread):g}% spread"
+        for token, spread in zip(high_priority['token'], high_priority['spread_percent'])),
+    high_spread_tokens=', '.join(high_priority['token']) or 'none',
+    market_roles=market_roles,
+)
 
-**1. Price vs Output Amount**
-- **Overall Correlation:** -0.1361 (weak negative correlation)
-- **Interpretation:** As prices increase, output amounts tend to decrease slightly
+# ==============================================================================
+# 10. TECHNICAL APPENDIX
+# ==============================================================================
 
-**2. Token-Specific Correlations:**
+report.add("""## 🔧 Technical Appendix
 
-{correlation_table}
+### Data Quality Assessment
 
-**3. Price vs Slippage**
-- **Correlation:** -0.0015 (no correlation)
-- **Interpretation:** Price levels do not influence slippage limit settings
+**Completeness:** 100% - No missing values detected
+**Consistency:** High - All timestamps within 2-minute window
+**Accuracy:** Verified - Price ranges align with market expectations
 
----
+### Methodology
 
-"""
+**Arbitrage Calculation:**
+```
+Spread % = ((Highest Buy Price - Lowest Sell Price) / Lowest Sell Price) × 100
+```
 
-# ==============================================================================
-# 4. EXCHANGE COMPARISON ANALYSIS
-# ==============================================================================
+**Correlation Analysis:**
+- Pearson correlation coefficient used for linear relationships
+- Log transformation applied for wide-range variables
+- Statistical significance tested at 95% confidence level
 
-def save_exchange_comparison():
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-    fig.suptitle('Exchange Comparison Analysis', fontsize=16, fontweight='bold')
+**Risk Proxy Calculation:**
+```
+Risk Proxy = 1 / log10(Average Liquidity + 1)
+```
+*Lower values indicate lower risk (higher liquidity)*
 
-    # 4.1 Average Price by Exchange
-    exchange_stats = df.groupby('exchange_name').agg({
-        'price_per_token': 'mean',
-        'output_amount_formatted': 'mean',
-        'slippage_limit_percent': 'mean'
-    }).round(2)
+### File Structure
 
-    bars = axes[0,0].bar(exchange_stats.index, exchange_stats['price_per_token'], 
-                        color=['#3498db', '#e74c3c'], alpha=0.8)
-    axes[0,0].set_title('Average Price by Exchange', fontweight='bold')
-    axes[0,0].set_ylabel('Average Price ($)')
-    axes[0,0].set_yscale('log')
-    axes[0,0].grid(axis='y', alpha=0.3)
-    
-    for i, v in enumerate(exchange_stats['price_per_token']):
-        axes[0,0].text(i, v * 1.1, f'${v:,.2f}', ha='center', va='bottom', fontweight='bold')
+```
+arbitrage_analysis/
+├── README.md                           # This report
+├── chart_images/                       # All visualization files
+│   ├── 01_data_overview.png
+│   ├── 02_arbitrage_opportunities.png
+│   ├── 03_correlation_analysis.png
+│   ├── 04_exchange_comparison.png
+│   ├── 05_volume_analysis.png
+│   ├── 06_correlation_heatmap.png
+│   └── 07_risk_reward_analysis.png
+├── db_arbitrage.csv                    # Source data
+└── generate_analysis.py                # Analysis script
+```
 
-    # 4.2 Output Amount Comparison
-    bars = axes[0,1].bar(exchange_stats.index, exchange_stats['output_amount_formatted'], 
-                        color=['#e74c3c', '#27ae60'], alpha=0.8)
-    axes[0,1].set_title('Average Output Amount by Exchange', fontweight='bold')
-    axes[0,1].set_ylabel('Average Output Amount')
-    axes[0,1].set_yscale('log')
-    axes[0,1].grid(axis='y', alpha=0.3)
-    
-    for i, v in enumerate(exchange_stats['output_amount_formatted']):
-        axes[0,1].text(i, v * 1.1, f'{v:,.0f}', ha='center', va='bottom', fontweight='bold')
+### Dependencies
 
-    # 4.3 Slippage Comparison
-    bars = axes[1,0].bar(exchange_stats.index, exchange_stats['slippage_limit_percent'], 
-                        color=['#f39c12', '#9b59b6'], alpha=0.8)
-    axes[1,0].set_title('Average Slippage by Exchange', fontweight='bold')
-    axes[1,0].set_ylabel('Slippage Limit (%)')
-    axes[1,0].grid(axis='y', alpha=0.3)
-    
-    for i, v in enumerate(exchange_stats['slippage_limit_percent']):
-        axes[1,0].text(i, v + 0.01, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
+```python
+pandas>=1.5.0
+numpy>=1.21.0
+matplotlib>=3.5.0
+seaborn>=0.11.0
+```
 
-    # 4.4 Price Spread Between Exchanges
-    tokens = df['symbol'].unique()
-    price_spreads = []
-    for token in tokens:
-        token_data = df[df['symbol'] == token]
-        kyber_avg = token_data[token_data['exchange_name'] == 'KyberSwap']['price_per_token'].mean()
-        universal_avg = token_data[token_data['exchange_name'] == 'Universal Assets']['price_per_token'].mean()
-        
-        if not np.isnan(kyber_avg) and not np.isnan(universal_avg):
-            spread = abs(kyber_avg - universal_avg) / min(kyber_avg, universal_avg) * 100
-            price_spreads.append({'token': token, 'spread': spread})
+---
+
+""")
 
-    spread_df = pd.DataFrame(price_spreads)
-    colors = ['#e74c3c' if x > 10 else '#f39c12' if x > 2 else '#27ae60' 
-              for x in spread_df['spread']]
-    bars = axes[1,1].bar(spread_df['token'], spread_df['spread'], color=colors, alpha=0.8)
-    axes[1,1].set_title('Price Spread Between Exchanges', fontweight='bold')
-    axes[1,1].set_ylabel('Price Difference (%)')
-    axes[1,1].set_xlabel('Token')
-    axes[1,1].grid(axis='y', alpha=0.3)
-    
-    for i, v in enumerate(spread_df['spread']):
-        axes[1,1].text(i, v + 0.2, f'{v:.2f}%', ha='center', va='bottom', fontweight='bold')
+# ==============================================================================
+# 11. CONCLUSIONS
+# ==============================================================================
 
-    plt.tight_layout()
-    plt.savefig('chart_images/04_exchange_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    return exchange_stats, spread_df
+CONCLUSIONS_SECTION = compile_template("""## 🔍 Conclusions
 
-exchange_stats, spread_df = save_exchange_comparison()
+### Executive Summary
 
-# Create exchange comparison tables
-exchange_table = """| Exchange | Average Price ($) | Average Output Amount | Average Slippage (%) | Quote Count |
-|----------|-------------------|----------------------|---------------------|-------------|
-"""
+The analysis of ${record_count} arbitrage quotes from Base L2 chain reveals a **well-structured arbitrage ecosystem** with clear opportunities and defined risk profiles.
 
-quote_counts = df['exchange_name'].value_counts()
-for exchange in exchange_stats.index:
-    stats = exchange_stats.loc[exchange]
-    count = quote_counts[exchange]
-    exchange_table += f"| **{exchange}** | ${stats['price_per_token']:,.2f} | {stats['output_amount_formatted']:,.0f} | {stats['slippage_limit_percent']:.1f}% | {count} |\n"
+### Key Findings
 
-spread_table = """| Token | KyberSwap (Avg) | Universal Assets (Avg) | Price Difference |
-|-------|-----------------|------------------------|------------------|
-"""
+**🎯 Primary Opportunity:** ${top_token} presents a ${top_spread}% arbitrage spread, representing the highest profit potential in the dataset.
 
-for _, row in spread_df.iterrows():
-    token = row['token']
-    token_data = df[df['symbol'] == token]
-    kyber_avg = token_data[token_data['exchange_name'] == 'KyberSwap']['price_per_token'].mean()
-    universal_avg = token_data[token_data['exchange_name'] == 'Universal Assets']['price_per_token'].mean()
-    spread_table += f"| **{token}** | ${kyber_avg:.8f} | ${universal_avg:.8f} | **{row['spread']:.2f}%** |\n"
+**📊 Market Structure:** ${market_structure} (${market_roles}).
 
-markdown_content += f"""## 🏢 Exchange Comparison
+**💡 Strategic Insight:** The consistent price differentials suggest sustainable arbitrage opportunities, particularly for automated trading systems.
 
-![Exchange Comparison](chart_images/04_exchange_comparison.png)
+### Bottom Line Up Front (BLUF)
 
-### Exchange Profile Comparison
+**Immediate Action:** Focus on ${high_spread_tokens} for highest returns
+**Risk Management:** Monitor liquidity depth and gas costs
+**Long-term Strategy:** Develop automated monitoring for sustainable profits
 
-{exchange_table}
+### Future Considerations
 
-### Market Role Analysis
+**Market Evolution:** 
+- Expected compression of spreads as market matures
+- Potential for new tokens to create additional opportunities
+- Possible changes in exchange dynamics
 
-**KyberSwap Profile**
-- **Total Quotes:** 250 (exclusively SELL orders)
-- **Market Role:** Sell-side exchange (lower prices)
-- **Characteristics:** Higher slippage tolerance (0.5%), lower liquidity
+**Technical Development:**
+- Real-time API integration for live monitoring
+- Machine learning models for spread prediction
+- Cross-chain arbitrage expansion
 
-**Universal Assets Profile**  
-- **Total Quotes:** 250 (exclusively BUY orders)
-- **Market Role:** Buy-side exchange (higher prices)
-- **Characteristics:** Lower slippage tolerance (0.2%), higher liquidity
+**Risk Monitoring:**
+- Regulatory changes affecting DeFi operations
+- Smart contract risks on Base L2
+- Liquidity provider behavior changes
 
-### Inter-Exchange Price Spreads
+---
 
-{spread_table}
+*Analysis completed on ${timestamp} UTC*
+*Dataset: ${record_count} latest quotes (${quotes_per_side} per token, exchange and side) from Base L2 chain*
+*Methodology: Statistical correlation analysis with visual data exploration*
 
 ---
 
-"""
+## 📈 Quick Reference
+
+| Metric | Value |
+|--------|-------|
+| **Best Opportunity** | ${top_token} (${top_spread}% spread) |
+| **Safest Bet** | ${safest_bet} |
+| **Market Structure** | ${market_structure_short} (${market_roles}) |
+| **Total Opportunities** | ${opportunity_count} tokens with positive spreads |
+| **Recommended Threshold** | >1% spread for execution |
+| **Risk Level** | Low to Moderate (established exchanges) |
+
+""")
+
+# The most liquid token that still has a positive spread
+safest = risk_scores[risk_scores['reward'] > 0].dropna(subset=['risk_proxy']).nsmallest(1, 'risk_proxy')
+report.add_template(CONCLUSIONS_SECTION, timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    record_count=f"{len(df):,}", quotes_per_side=quotes_per_side,
+                    opportunity_count=opportunity_count, top_token=top_opportunity['token'],
+                    top_spread=f"{top_opportunity['spread_percent']:.2f}",
+                    high_spread_tokens=' and '.join(positive_spreads['token'].iloc[:2]) or 'no token',
+                    safest_bet=', '.join(spread_items(safest)).replace('**', '') or 'n/a',
+                    market_structure=('Each exchange quotes one side only' if segregated_market
+                                      else 'Exchanges quote both sides'),
+                    market_structure_short='Segregated' if segregated_market else 'Mixed',
+                    market_roles=market_roles)
 
 # ==============================================================================
-# 5. VOLUME AND LIQUIDITY ANALYSIS
+# 12. SAVE MARKDOWN FILE
 # ==============================================================================
 
-def save_volume_analysis():
-    fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-    fig.suptitle('Volume and Liquidity Analysis', fontsize=16, fontweight='bold')
-
-    # 5.1 Output Amount Distribution by Token
-    tokens = df['symbol'].unique()
-    token_data = [df[df['symbol'] == token]['output_amount_formatted'].values for token in tokens]
-    
-    box_plot = axes[0].boxplot(token_data, labels=tokens, patch_artist=True)
-    colors = plt.cm.Set3(np.linspace(0, 1, len(tokens)))
-    for patch, color in zip(box_plot['boxes'], colors):
-        patch.set_facecolor(color)
-        patch.set_alpha(0.7)
-    
-    axes[0].set_title('Output Amount Distribution by Token', fontweight='bold')
-    axes[0].set_ylabel('Output Amount (Log Scale)')
-    axes[0].set_yscale('log')
-    axes[0].set_xlabel('Token')
-    axes[0].grid(axis='y', alpha=0.3)
-    axes[0].tick_params(axis='x', rotation=45)
+# Save the main markdown file
+writer = ReportWriter()
+writer.write('README.md', report.render())
 
-    # 5.2 Quote Type Distribution by Exchange
-    quote_distribution = pd.crosstab(df['exchange_name'], df['quote_type'])
-    quote_distribution.plot(kind='bar', ax=axes[1], color=['#3498db', '#e74c3c'], alpha=0.8)
-    axes[1].set_title('Quote Type Distribution by Exchange', fontweight='bold')
-    axes[1].set_ylabel('Number of Quotes')
-    axes[1].set_xlabel('Exchange')
-    axes[1].legend(title='Quote Type')
-    axes[1].tick_params(axis='x', rotation=0)
-    axes[1].grid(axis='y', alpha=0.3)
-    
-    # Add value labels on bars
-    for container in axes[1].containers:
-        axes[1].bar_label(container, fontweight='bold')
+# Create additional analysis files
+def create_quick_start_guide():
+    top_three = '\n'.join(
+        f"{rank}. **{row.token}**: {row.spread_percent:.2f}% spread - Buy {row.buy_exchange}, Sell {row.sell_exchange}"
+        for rank, row in enumerate(positive_spreads.head(3).itertuples(), start=1)) or "No token has a positive spread."
+    alerts = '\n'.join(f"- **{token}**: Alert if spread > {alert_threshold(spread):g}%"
+                       for token, spread in zip(positive_spreads['token'].iloc[:2],
+                                                positive_spreads['spread_percent'].iloc[:2]))
+    quick_start = f"""# Quick Start Guide - Base L2 Arbitrage
 
-    plt.tight_layout()
-    plt.savefig('chart_images/05_volume_analysis.png', dpi=300, bbox_inches='tight')
-    plt.close()
+## 🚀 Immediate Actions
 
-save_volume_analysis()
+### Top 3 Opportunities (Execute Now)
+{top_three}
 
-markdown_content += """## 📈 Volume and Liquidity Analysis
+### Pre-Execution Checklist
+- [ ] Check current gas prices on Base L2
+- [ ] Verify liquidity depth on both exchanges
+- [ ] Confirm wallet balances for execution
+- [ ] Set up slippage tolerance (0.2-0.5%)
+- [ ] Monitor price movement for 30 seconds before execution
 
-![Volume and Liquidity Analysis](chart_images/05_volume_analysis.png)
+### Risk Limits
+- **Maximum Position Size**: 10% of visible liquidity
+- **Stop Loss**: Close if spread drops below 0.5%
+- **Gas Budget**: Max 0.1% of trade value
 
-### Key Observations
+## 📊 Monitoring Dashboard
 
-**Liquidity Distribution:**
-- **High Liquidity Tokens:** uSHIB shows exceptional output amounts
-- **Moderate Liquidity:** uDOGE and other tokens show balanced liquidity
-- **Exchange Specialization:** Clear separation between buy-side and sell-side operations
+### Key Metrics to Track
+- Real-time spread percentages
+- Liquidity depth on both exchanges
+- Gas price trends
+- Transaction success rates
 
-**Market Structure:**
-- **KyberSwap:** Exclusively handles SELL orders (250 quotes)
-- **Universal Assets:** Exclusively handles BUY orders (250 quotes)
-- **Perfect Segregation:** 100% separation of market roles
+### Alert Thresholds
+{alerts}
+- **Others**: Alert if spread > 1%
 
 ---
-
+*Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
 """
+    
+    writer.write('QUICK_START.md', quick_start)
 
-# ==============================================================================
-# 6. CORRELATION HEATMAP
-# ==============================================================================
+def create_technical_details():
+    technical = """# Technical Implementation Details
 
-def save_correlation_heatmap():
-    # Create correlation heatmap
-    numeric_cols = ['price_per_token', 'output_amount_formatted', 'slippage_limit_percent']
-    correlation_matrix = df[numeric_cols].corr()
+## Data Processing Pipeline
 
-    plt.figure(figsize=(10, 8))
-    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
-    heatmap = sns.heatmap(correlation_matrix, annot=True, cmap='RdYlBu_r', center=0, 
-                         square=True, fmt='.3f', cbar_kws={'shrink': 0.8},
-                         linewidths=0.5, mask=mask)
-    plt.title('Correlation Heatmap - Numeric Variables', fontsize=14, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('chart_images/06_correlation_heatmap.png', dpi=300, bbox_inches='tight')
-    plt.close()
+### 1. Data Ingestion
+The latest N priced quotes of every token, exchange and side (`python download_to_csv.py --per-side N`):
+```sql
+-- Loose index scan over (token_id, exchange, side), then the newest N rows of each
+-- read from the quotes_latest_per_side_idx index
+SELECT t.symbol, t.name, e.name AS exchange_name, ... FROM sides CROSS JOIN LATERAL (
+    SELECT * FROM quotes q
+    WHERE q.price_per_token <> 0 AND (q.token_id, q.exchange_id, q.quote_type) = sides
+    ORDER BY q.quoted_at DESC LIMIT N
+) AS latest
+JOIN tokens t ON t.id = latest.token_id
+JOIN exchanges e ON e.id = latest.exchange_id
+```
 
-save_correlation_heatmap()
+### 2. Arbitrage Detection Algorithm
+```python
+def detect_arbitrage(token_data):
+    buy_orders = token_data[token_data['quote_type'] == 'BUY']
+    sell_orders = token_data[token_data['quote_type'] == 'SELL']
+    
+    if len(buy_orders) > 0 and len(sell_orders) > 0:
+        highest_buy = buy_orders['price_per_token'].max()
+        lowest_sell = sell_orders['price_per_token'].min()
+        
+        spread = (highest_buy - lowest_sell) / lowest_sell * 100
+        return spread
+    return 0
+```
 
-markdown_content += """## 🔥 Correlation Heatmap
+### 3. Risk Assessment Framework
+```python
+def calculate_risk_score(token, liquidity, spread):
+    liquidity_risk = 1 / log10(liquidity + 1)
+    spread_reward = spread / 100
+    
+    risk_score = liquidity_risk / spread_reward
+    return risk_score
+```
 
-![Correlation Heatmap](chart_images/06_correlation_heatmap.png)
+## Exchange Integration
 
-### Correlation Insights
+### KyberSwap API Integration
+```python
+kyber_endpoint = "https://aggregator-api.kyberswap.com/base/api/v1/routes"
+```
 
-**Strong Relationships:**
-- **Price vs Amount:** Weak negative correlation (-0.136)
-- **Price vs Slippage:** No correlation (-0.001)
-- **Amount vs Slippage:** Weak positive correlation (0.068)
+### Universal Assets API Integration
+```python
+universal_endpoint = "https://api.universal.assets/v1/quotes"
+```
 
-**Interpretation:**
-- Price levels are largely independent of slippage settings
-- Higher prices tend to slightly reduce output amounts
-- Slippage tolerance shows minimal relationship with other factors
+## Execution Strategy
 
----
+### Optimal Trade Size Calculation
+```python
+def calculate_optimal_size(available_liquidity, target_spread):
+    # Conservative approach: 5-10% of available liquidity
+    max_size = available_liquidity * 0.1
+    min_profitable_size = 100  # $100 minimum
+    
+    return max(min_profitable_size, min(max_size, 1000))
+```
 
+---
+*Technical Documentation v1.0*
 """
+    
+    writer.write('TECHNICAL_DETAILS.md', technical)
 
-# ==============================================================================
-# 7. RISK-REWARD ANALYSIS
-# ==============================================================================
-
-def save_risk_reward_analysis():
-    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+# Generate additional files
+create_quick_start_guide()
+create_technical_details()
+manifest_file = writer.save_manifest()
 
-    # Pre-compute token liquidity data to avoid repeated calculations
-    token_liquidity_map = {}
-    for token in arb_df['token'].unique():
-        token_data = df[df['symbol'] == token]
-        avg_liquidity = token_data['output_amount_formatted'].mean()
-        token_liquidity_map[token] = 1 / np.log10(avg_liquidity + 1)  # Higher liquidity = lower risk
-    
-    # Create color map once
-    colors = plt.cm.viridis(np.linspace(0, 1, len(arb_df)))
-    
-    # Vectorized approach to avoid explicit loop when possible
-    for i, (_, row) in enumerate(arb_df.iterrows()):
-        token = row['token']
-        risk_proxy = token_liquidity_map[token]
-        reward = row['spread_percent']
-        
-        ax.scatter(risk_proxy, reward, s=200, alpha=0.7, 
-                  color=colors[i], edgecolors='black', linewidth=1)
-        
-        # Text annotations still need to be done individually
-        ax.annotate(token, (risk_proxy, reward), 
-                   xytext=(10, 10), textcoords='offset points', 
-                   fontsize=12, fontweight='bold',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor=colors[i], alpha=0.3))
+print("✅ ANALYSIS COMPLETE!")
+print("\n📁 Generated Files:")
+print("├── README.md (Main analysis report)")
+print("├── QUICK_START.md (Immediate action guide)")
+print("├── TECHNICAL_DETAILS.md (Implementation details)")
+print(f"├── {manifest_file} (Which reports changed in this run)")
+print("└── chart_images/ (All visualization files)")
+print("    ├── 01_data_overview.png")
+print("    ├── 02_arbitrage_opportunities.png")
+print("    ├── 03_correlation_analysis.png")
+print("    ├── 04_exchange_comparison.png")
+print("    ├── 05_volume_analysis.png")
+print("    ├── 06_correlation_heatmap.png")
+print("    └── 07_risk_reward_analysis.png")
 
-    # Style settings
-    ax.set_xlabel('Risk Proxy (Inverse Liquidity)', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Arbitrage Spread (%)', fontsize=12, fontweight='bold')
-    ax.set_title('Risk-Reward Analysis: Arbitrage Opportunities', fontsize=14, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    
-    # Add quadrant lines
-    ax.axhline(y=5, color='red', linestyle='--', alpha=0.5, label='High Reward Threshold (5%)')
-    ax.axvline(x=0.15, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk Threshold')
-    ax.legend()
+print("\n🚀 Next Steps:")
+print("1. Upload all files to GitHub repository")
+print("2. Review README.md for complete analysis")
+print("3. Use QUICK_START.md for immediate trading actions")
+print("4. Reference TECHNICAL_DETAILS.md for implementation")
 
-    plt.tight_layout()
-    plt.show()
+print(f"\n📊 Analysis Summary:")
+print(f"• Best Opportunity: {arb_df.iloc[0]['token']} ({arb_df.iloc[0]['spread_percent']:.2f}% spread)")
+print(f"• Total Opportunities: {opportunity_count} tokens with positive spreads")
+print(f"• Market Structure: {'Segregated' if segregated_market else 'Mixed'} exchange roles")
+print(f"• Risk Level: Low to Moderate")
 
-save_risk_reward_analysis()
\ No newline at end of file
+print(f"\n🎯 Key Insight: exchange sides are {market_roles},")
+print(f"with positive spreads on {opportunity_count} of the {len(tokens)} tokens analyzed.")
@@ -0,0 +1,103 @@
+"""Apply the SQL files in migrations/ to the quotes database, in order and once each."""
+import argparse
+import glob
+import logging
+import os
+import re
+import typing as typ
+
+import psycopg2
+
+from download_to_csv import database_parameters
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# A migration whose first line is this marker runs in autocommit mode, for
+# statements such as CREATE INDEX CONCURRENTLY that cannot run in a transaction.
+NO_TRANSACTION = '-- migrate: no-transaction'
+
+CREATE_HISTORY_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name       text        PRIMARY KEY,
+    applied_at timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+
+def split_statements(sql: str) -> typ.List[str]:
+    """Split a migration into statements at semicolons that end a line."""
+    statements = re.split(r';[ \t]*$', sql, flags=re.MULTILINE)
+    return [statement.strip() for statement in statements
+            if any(line.strip() and not line.strip().startswith('--') for line in statement.splitlines())]
+
+
+def migration_files(folder: str = MIGRATIONS_FOLDER) -> typ.List[str]:
+    """Return the migration files, ordered by their numeric prefix."""
+    return sorted(glob.glob(os.path.join(folder, '*.sql')))
+
+
+def applied_migrations(conn) -> typ.Set[str]:
+    with conn.cursor() as cur:
+        cur.execute(CREATE_HISTORY_TABLE)
+        cur.execute("SELECT name FROM schema_migrations;")
+        applied = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return applied
+
+
+def apply_migration(conn, path: str):
+    """Run one migration file and record it in schema_migrations."""
+    name = os.path.basename(path)
+    with open(path, encoding='utf-8') as f:
+        sql = f.read()
+
+    if sql.startswith(NO_TRANSACTION):
+        # One statement per call: several statements in one query string would
+        # share an implicit transaction.
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                for statement in split_statements(sql):
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (name) VALUES (%s);", (name,))
+        finally:
+            conn.autocommit = False
+    else:
+        with conn, conn.cursor() as cur:
+            cur.execute(sql)
+            cur.execute("INSERT INTO schema_migrations (name) VALUES (%s);", (name,))
+
+
+def migrate(db_params: dict = database_parameters, folder: str = MIGRATIONS_FOLDER,
+            dry_run: bool = False) -> typ.List[str]:
+    """
+    Apply every pending migration.
+
+    Returns:
+        list: Names of the migrations applied (or pending, with `dry_run`).
+    """
+    conn = psycopg2.connect(**db_params)
+    try:
+        applied = applied_migrations(conn)
+        pending = [path for path in migration_files(folder) if os.path.basename(path) not in applied]
+        for path in pending:
+            print(f"{'Pending' if dry_run else 'Applying'} migration: {os.path.basename(path)}")
+            if not dry_run:
+                apply_migration(conn, path)
+        return [os.path.basename(path) for path in pending]
+    finally:
+        conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations to the quotes database.")
+    parser.add_argument('--dry-run', action='store_true', help="list pending migrations without applying them")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    names = migrate(dry_run=args.dry_run)
+    print(f"✅ {len(names)} migration(s) {'pending' if args.dry_run else 'applied'}")
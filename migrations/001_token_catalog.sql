@@ -0,0 +1,31 @@
+-- migrate: no-transaction
+-- Token catalog: one row per output token with its quote count and first/last
+-- quote, so report runs can list tokens without scanning the quotes table.
+--
+-- Runs outside a transaction so the index can be built CONCURRENTLY without
+-- blocking quote inserts; every statement is idempotent, so a failed run can
+-- simply be repeated.
+
+-- Serves the loose index scan over symbols, the catalog's last-seen lookups
+-- and the per-token 24-hour download query.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS quotes_output_token_symbol_quoted_at_idx
+    ON quotes (output_token_symbol, quoted_at);
+
+CREATE TABLE IF NOT EXISTS token_catalog (
+    symbol       text        PRIMARY KEY,
+    quote_count  bigint      NOT NULL,
+    first_seen   timestamptz,
+    last_seen    timestamptz,
+    -- Highest quotes.id folded into quote_count; refreshes only read rows above it.
+    last_id      bigint      NOT NULL,
+    refreshed_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Initial population: the one full pass over quotes. Later refreshes are
+-- incremental (see token_catalog.REFRESH_QUERY).
+INSERT INTO token_catalog (symbol, quote_count, first_seen, last_seen, last_id)
+SELECT output_token_symbol, count(*), min(quoted_at), max(quoted_at), max(id)
+FROM quotes
+WHERE output_token_symbol IS NOT NULL
+GROUP BY output_token_symbol
+ON CONFLICT (symbol) DO NOTHING;
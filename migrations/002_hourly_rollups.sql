@@ -0,0 +1,38 @@
+-- Hourly rollups of quotes per token, exchange and quote type, maintained
+-- incrementally from the last processed quotes.id (see rollups.py). Keyed on
+-- token_id: SELL quotes carry USDC as output_token_symbol, so the symbol would
+-- file them under USDC. Readers join tokens for the symbol.
+
+CREATE TABLE IF NOT EXISTS quote_rollups_hourly (
+    token_id     integer     NOT NULL,
+    exchange_id  integer     NOT NULL,
+    quote_type   text        NOT NULL,
+    hour         timestamptz NOT NULL,
+    -- OHLC of price_per_token; open/close are the earliest/latest quote in the hour.
+    open         numeric     NOT NULL,
+    high         numeric     NOT NULL,
+    low          numeric     NOT NULL,
+    close        numeric     NOT NULL,
+    open_at      timestamptz NOT NULL,
+    close_at     timestamptz NOT NULL,
+    quotes       bigint      NOT NULL,
+    price_sum    numeric     NOT NULL,
+    -- Sums of output_amount_formatted, so means and variances of any window
+    -- are exact sums of rows.
+    output_sum   numeric     NOT NULL,
+    output_sumsq numeric     NOT NULL,
+    last_id      bigint      NOT NULL,
+    PRIMARY KEY (token_id, exchange_id, quote_type, hour)
+);
+
+CREATE INDEX IF NOT EXISTS quote_rollups_hourly_hour_idx ON quote_rollups_hourly (hour);
+
+-- Highest quotes.id folded into each rollup table.
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name         text        PRIMARY KEY,
+    last_id      bigint      NOT NULL,
+    refreshed_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO rollup_watermarks (name, last_id) VALUES ('quote_rollups_hourly', 0)
+ON CONFLICT (name) DO NOTHING;
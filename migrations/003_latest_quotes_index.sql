@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Serves the db_arbitrage.csv snapshot (download_to_csv.snapshot_query): the
+-- loose index scan over (token_id, exchange, side) and the latest-N lookup of
+-- each side both walk this index, so the snapshot costs a few index probes
+-- per token however large quotes grows. Partial, because zero-price quotes
+-- are never part of the snapshot.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS quotes_latest_per_side_idx
+    ON quotes (token_id, exchange_id, quote_type, quoted_at DESC)
+    WHERE price_per_token <> 0;
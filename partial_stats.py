@@ -0,0 +1,384 @@
+"""
+Mergeable per-day statistics of each token's quotes, for reports over multi-day windows.
+
+Every statistic a token report shows (count, mean, standard deviation,
+min/max with their times, quartiles and the token-amount/USDC-return
+correlation) is kept per UTC day as a small partial: means and centred sums
+of squares in Welford/Chan form, the cross-moment for the correlation, a
+t-digest per series for the quartiles, and the data-quality counts of the
+day's raw quotes. Partials of disjoint days merge into
+the statistics of their union, so a weekly report reads seven records per
+token from stats_<token>.json instead of rescanning a week of raw quotes.
+A long quotes CSV can be folded in chunk by chunk, in bounded memory:
+
+    python partial_stats.py uBTC --backfill quotes_uBTC.csv
+    python partial_stats.py uBTC uSEI --days 7
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import typing as typ
+
+import numpy as np
+import pandas as pd
+
+from data_quality import CHECKS, apply_quality
+from quantile_sketch import COMPRESSION, TDigest
+from regression import RELATIVE_TOLERANCE
+
+logger = logging.getLogger(__name__)
+
+# Report prefix -> column of the frame returned by md.basic_charts.
+SERIES = {'token': 'input_amount_readable', 'usdc': 'output_amount_formatted'}
+QUARTILES = (0.25, 0.5, 0.75)
+# Rows per chunk when backfilling from a quotes CSV.
+CHUNK_ROWS = 100_000
+# Data-quality counts kept per day, as returned by `data_quality.apply_quality`.
+QUALITY_COUNTS = ('rows', *CHECKS, 'dropped', 'clipped')
+
+
+def stats_path(token: str, folder: str = '.') -> str:
+    """Return the partials file of `token`, stored alongside its quotes_<token>.csv."""
+    return os.path.join(folder, f"stats_{token}.json")
+
+
+class Moments:
+    """Count, mean, centred sum of squares, extremes and quantile sketch of one series."""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 min: float = math.inf, max: float = -math.inf,
+                 min_at: pd.Timestamp | None = None, max_at: pd.Timestamp | None = None,
+                 sketch: TDigest | None = None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+        self.min_at = min_at
+        self.max_at = max_at
+        self.sketch = sketch if sketch is not None else TDigest()
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation, like `pd.Series.std`."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    @property
+    def constant(self) -> bool:
+        return self.m2 <= self.count * (RELATIVE_TOLERANCE * abs(self.mean)) ** 2
+
+    def merge(self, other: 'Moments') -> 'Moments':
+        """Chan's parallel update: combine the moments of two disjoint partitions."""
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        lowest = self if self.min <= other.min else other
+        highest = self if self.max >= other.max else other
+        return Moments(count=count, mean=self.mean + delta * other.count / count,
+                       m2=self.m2 + other.m2 + delta * delta * self.count * other.count / count,
+                       min=lowest.min, min_at=lowest.min_at, max=highest.max, max_at=highest.max_at,
+                       sketch=self.sketch.merge(other.sketch))
+
+    def describe(self) -> pd.Series:
+        """The statistics in `pd.Series.describe()` order."""
+        quartiles = self.sketch.quantile(QUARTILES) if self.count else [math.nan] * len(QUARTILES)
+        return pd.Series([self.count, self.mean if self.count else math.nan, self.std,
+                          self.min if self.count else math.nan, *quartiles,
+                          self.max if self.count else math.nan],
+                         index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], dtype=float)
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max,
+                'min_at': self.min_at.isoformat() if self.min_at is not None else None,
+                'max_at': self.max_at.isoformat() if self.max_at is not None else None,
+                'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Moments':
+        return cls(count=data['count'], mean=data['mean'], m2=data['m2'], min=data['min'], max=data['max'],
+                   min_at=pd.Timestamp(data['min_at']) if data['min_at'] else None,
+                   max_at=pd.Timestamp(data['max_at']) if data['max_at'] else None,
+                   sketch=TDigest.from_dict(data['sketch']))
+
+
+class PartialStats:
+    """
+    The report statistics of one partition of a token's quotes (one UTC day).
+
+    Holds one `Moments` per SERIES plus the centred cross-product of the two,
+    which merges like m2 and gives the correlation of any merged window, and
+    the data-quality counts of the partition's raw quotes, which merge by sum.
+    """
+
+    def __init__(self, series: typ.Dict[str, Moments] | None = None, comoment: float = 0.0,
+                 first_at: pd.Timestamp | None = None, last_at: pd.Timestamp | None = None,
+                 last_id: int | None = None, quality: typ.Dict[str, int] | None = None):
+        self.series = series if series is not None else {prefix: Moments() for prefix in SERIES}
+        self.comoment = comoment
+        self.first_at = first_at
+        self.last_at = last_at
+        self.last_id = last_id
+        self.quality = quality if quality is not None else dict.fromkeys(QUALITY_COUNTS, 0)
+
+    @property
+    def count(self) -> int:
+        return self.series['token'].count
+
+    @property
+    def correlation(self) -> float:
+        """Pearson correlation of the two series; NaN when either is constant, as in `regression.fit_line`."""
+        token, usdc = self.series['token'], self.series['usdc']
+        if self.count < 2 or token.constant or usdc.constant:
+            return math.nan
+        return float(np.clip(self.comoment / math.sqrt(token.m2 * usdc.m2), -1.0, 1.0))
+
+    def merge(self, other: 'PartialStats') -> 'PartialStats':
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        token, usdc = self.series['token'], self.series['usdc']
+        count = self.count + other.count
+        comoment = (self.comoment + other.comoment + (other.series['token'].mean - token.mean)
+                    * (other.series['usdc'].mean - usdc.mean) * self.count * other.count / count)
+        return PartialStats(series={prefix: moments.merge(other.series[prefix])
+                                    for prefix, moments in self.series.items()},
+                            comoment=comoment, first_at=min(self.first_at, other.first_at),
+                            last_at=max(self.last_at, other.last_at), last_id=max(self.last_id, other.last_id),
+                            quality={key: self.quality[key] + other.quality[key] for key in QUALITY_COUNTS})
+
+    def to_dict(self) -> dict:
+        return {'series': {prefix: moments.to_dict() for prefix, moments in self.series.items()},
+                'comoment': self.comoment, 'first_at': self.first_at.isoformat(),
+                'last_at': self.last_at.isoformat(), 'last_id': self.last_id, 'quality': self.quality}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PartialStats':
+        # Files written before quality counts were kept count none
+        quality = {key: data.get('quality', {}).get(key, 0) for key in QUALITY_COUNTS}
+        return cls(series={prefix: Moments.from_dict(moments) for prefix, moments in data['series'].items()},
+                   comoment=data['comoment'], first_at=pd.Timestamp(data['first_at']),
+                   last_at=pd.Timestamp(data['last_at']), last_id=data['last_id'], quality=quality)
+
+
+def merge_partials(partials: typ.Iterable[PartialStats]) -> PartialStats:
+    merged = PartialStats()
+    for partial in partials:
+        merged = merged.merge(partial)
+    return merged
+
+
+def _quote_ids(df: pd.DataFrame, times: pd.Series) -> pd.Series:
+    return df['id'].astype('int64') if 'id' in df.columns else times.dt.as_unit('ns').astype('int64')
+
+
+def _flagged_rows(df: pd.DataFrame, watermark: int | None = None) -> pd.DataFrame:
+    """The rows `apply_quality` flagged for `df` (see its 'flagged' attrs), above `watermark`, with a day column."""
+    flagged = pd.DataFrame(df.attrs.get('flagged') or {'quoted_at': []})
+    times = pd.to_datetime(flagged['quoted_at'], utc=True, format='ISO8601')
+    if watermark is not None:
+        newer = (_quote_ids(flagged, times) > watermark).to_numpy()
+        flagged, times = flagged[newer], times[newer]
+    return flagged.assign(day=times.dt.floor('D'))
+
+
+def _day_quality(times: pd.Series, flagged: pd.DataFrame) -> pd.DataFrame:
+    """Data-quality counts per day: rows kept in `times` plus dropped rows, and each flag of `flagged`."""
+    flags = [column for column in QUALITY_COUNTS if column != 'rows']
+    counts = flagged.groupby('day')[flags].sum() if len(flagged) else pd.DataFrame(columns=flags)
+    kept = times.groupby(times.dt.floor('D')).size()
+    counts = counts.reindex(kept.index.union(counts.index), fill_value=0).astype(int)
+    counts.insert(0, 'rows', kept.reindex(counts.index, fill_value=0) + counts['dropped'])
+    return counts
+
+
+def day_partials(df: pd.DataFrame, compression: float = COMPRESSION,
+                 watermark: int | None = None) -> typ.Dict[str, PartialStats]:
+    """
+    Build the partial statistics of every UTC day in `df` (md.basic_charts output).
+
+    Means, extremes and centred second moments come from one grouped pass;
+    only the t-digests are built day by day. The quality counts add the rows
+    `apply_quality` dropped from `df` back in, keeping those above `watermark`.
+
+    Returns:
+        dict: PartialStats keyed by ISO day, e.g. '2025-06-15'.
+    """
+    times = pd.to_datetime(df['quoted_at'], utc=True, format='ISO8601')
+    quality = _day_quality(times, _flagged_rows(df, watermark))
+    frame = pd.DataFrame({prefix: df[column].astype(float) for prefix, column in SERIES.items()})
+    frame['time'] = times
+    frame['id'] = _quote_ids(df, times)
+    frame = frame.dropna(subset=list(SERIES))
+    if frame.empty:
+        return {}
+    days = frame['time'].dt.floor('D')
+    grouped = frame.groupby(days, sort=True)
+    means = grouped[list(SERIES)].transform('mean')
+    deviations = frame[list(SERIES)] - means
+    frame['comoment'] = deviations['token'] * deviations['usdc']
+    for prefix in SERIES:
+        frame[f'{prefix}_sq'] = deviations[prefix] ** 2
+    sums = frame.groupby(days, sort=True)[['comoment'] + [f'{prefix}_sq' for prefix in SERIES]].sum()
+    summary = grouped.agg(count=('id', 'size'), first_at=('time', 'min'), last_at=('time', 'max'),
+                          last_id=('id', 'max'))
+
+    partials = {}
+    for day, rows in grouped:
+        series = {}
+        for prefix in SERIES:
+            values = rows[prefix]
+            series[prefix] = Moments(
+                count=int(summary.at[day, 'count']), mean=float(values.mean()),
+                m2=float(sums.at[day, f'{prefix}_sq']),
+                min=float(values.min()), max=float(values.max()),
+                min_at=rows.at[values.idxmin(), 'time'], max_at=rows.at[values.idxmax(), 'time'],
+                sketch=TDigest.from_values(values.to_numpy(), compression))
+        partials[day.strftime('%Y-%m-%d')] = PartialStats(
+            series=series, comoment=float(sums.at[day, 'comoment']),
+            first_at=summary.at[day, 'first_at'], last_at=summary.at[day, 'last_at'],
+            last_id=int(summary.at[day, 'last_id']),
+            quality={key: int(value) for key, value in quality.loc[day].items()})
+    return partials
+
+
+def load_partials(path: str) -> typ.Dict[str, PartialStats]:
+    """Load a stored partials file; empty when it does not exist yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return {day: PartialStats.from_dict(data) for day, data in json.load(f)['days'].items()}
+
+
+def save_partials(partials: typ.Dict[str, PartialStats], path: str):
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'days': {day: partials[day].to_dict() for day in sorted(partials)}}, f)
+    os.replace(tmp_file, path)
+
+
+def _watermark(partials: typ.Dict[str, PartialStats]) -> int | None:
+    return max((partial.last_id for partial in partials.values()), default=None)
+
+
+def fold_partials(stored: typ.Dict[str, PartialStats], df: pd.DataFrame, watermark: int | None,
+                  compression: float = COMPRESSION) -> int:
+    """Merge the day partials of the quotes in `df` above `watermark` into `stored`; returns the days touched."""
+    if watermark is not None:
+        df = df[_quote_ids(df, pd.to_datetime(df['quoted_at'], utc=True, format='ISO8601')) > watermark]
+    fresh = day_partials(df, compression, watermark=watermark)
+    for day, partial in fresh.items():
+        stored[day] = stored[day].merge(partial) if day in stored else partial
+    return len(fresh)
+
+
+def update_partials(token: str, df: pd.DataFrame, path: str | None = None,
+                    compression: float = COMPRESSION) -> typ.Dict[str, PartialStats]:
+    """
+    Fold the quotes of `df` that are newer than the stored partials into the token's file.
+
+    As with `ohlc.update_bars`, the highest stored quote id is the watermark,
+    so re-running on an overlapping download does not double count.
+
+    Returns:
+        dict: All stored partials of the token after the update, keyed by day.
+    """
+    path = path or stats_path(token)
+    stored = load_partials(path)
+    if fold_partials(stored, df, _watermark(stored), compression):
+        save_partials(stored, path)
+        logger.info(f"Folded {len(df)} quotes into the daily partials of {path}")
+    return stored
+
+
+def _prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Derive the report series and apply the quality checks, as md.basic_charts does for a whole file."""
+    chunk['quoted_at'] = pd.to_datetime(chunk['quoted_at'], format='ISO8601')
+    chunk['input_amount_readable'] = chunk['input_amount'].astype(float) / 1e18
+    chunk, _ = apply_quality(chunk.sort_values('quoted_at'), scaled_columns=())
+    return chunk
+
+
+def backfill_partials(token: str, csv_path: str, path: str | None = None, chunksize: int = CHUNK_ROWS,
+                      compression: float = COMPRESSION) -> typ.Dict[str, PartialStats]:
+    """
+    Fold a quotes CSV of any length into the token's partials, `chunksize` rows at a time.
+
+    Memory is bounded by one chunk plus the partials, which hold a fixed
+    number of t-digest centroids per day. The quality checks run per chunk,
+    so their rolling windows restart at chunk boundaries. Quotes at or below
+    the watermark stored before the backfill are skipped.
+    """
+    path = path or stats_path(token)
+    stored = load_partials(path)
+    watermark = _watermark(stored)
+    columns = ['id', 'exchange_id', 'input_amount', 'output_amount', 'output_amount_formatted',
+               'quoted_at', 'expires_at', 'is_valid']
+    rows = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=lambda column: column in columns):
+        fold_partials(stored, _prepare_chunk(chunk), watermark, compression)
+        rows += len(chunk)
+    save_partials(stored, path)
+    logger.info(f"Backfilled {rows} quotes from {csv_path} into {path}")
+    return stored
+
+
+def window_stats(partials: typ.Dict[str, PartialStats], days: float,
+                 end: pd.Timestamp | None = None) -> pd.Series:
+    """
+    Merge the partials of the `days` UTC days ending at `end` (default: today, the run date).
+
+    Days after `end` are left out, and so is a stale file's old data: a token
+    that stopped quoting gets no statistics rather than those of its last week.
+
+    Returns:
+        pd.Series: The same fields as a row of `report_stats.fetch_token_stats`
+            (quotes, first_at/last_at, <series>_mean/_std/_min/_25%/_50%/_75%/_max,
+            usdc_min_at/usdc_max_at, correlation), plus the number of days merged
+            and the summed data-quality counts of their raw quotes.
+    """
+    end = (pd.Timestamp.now(tz='UTC') if end is None else pd.Timestamp(end)).floor('D')
+    last_day = end.strftime('%Y-%m-%d')
+    first_day = (end - pd.Timedelta(days=math.ceil(days) - 1)).strftime('%Y-%m-%d')
+    selected = [day for day in sorted(partials) if first_day <= day <= last_day]
+    if not selected:
+        raise ValueError(f"No partial statistics stored from {first_day} to {last_day}")
+    merged = merge_partials(partials[day] for day in selected)
+
+    stats = {'quotes': merged.count, 'days': len(selected), 'first_at': merged.first_at, 'last_at': merged.last_at}
+    for prefix, moments in merged.series.items():
+        for label, value in moments.describe().drop('count').items():
+            stats[f'{prefix}_{label}'] = value
+    stats['usdc_min_at'] = merged.series['usdc'].min_at
+    stats['usdc_max_at'] = merged.series['usdc'].max_at
+    stats['correlation'] = merged.correlation
+    stats['quality'] = merged.quality if merged.quality['rows'] else None
+    return pd.Series(stats, dtype=object)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Print report statistics merged from stored daily partials.")
+    parser.add_argument('tokens', nargs='+', help="tokens with a stats_<token>.json file")
+    parser.add_argument('--days', type=float, default=7, help="window in days (default: %(default)s)")
+    parser.add_argument('--backfill', metavar='CSV', help="first fold this quotes CSV into the (single) token's partials")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS,
+                        help="rows read at a time when backfilling (default: %(default)s)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.backfill:
+        if len(args.tokens) != 1:
+            raise SystemExit("--backfill takes exactly one token")
+        partials = backfill_partials(args.tokens[0], args.backfill, chunksize=args.chunksize)
+        print(f"📥 {args.tokens[0]}: {len(partials)} daily partials in {stats_path(args.tokens[0])}")
+    rows = {token: window_stats(load_partials(stats_path(token)), args.days) for token in args.tokens}
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(pd.DataFrame(rows).T[['days', 'quotes', 'usdc_mean', 'usdc_std', 'usdc_min', 'usdc_50%',
+                                    'usdc_max', 'correlation']])
@@ -1,212 +1,76 @@
 """Original version from https://github.com/Chonlakant/MetaQuote/blob/main/plot_uLINK.ipynb"""
+import argparse
+import io
 import logging
-import matplotlib.dates as mdates
+import os
+import re
+import time
+import typing as typ
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
-import numpy as np
-import numpy.linalg
-import pandas as pd
+import pymupdf
+from markdown_it import MarkdownIt
 from markdown_pdf import MarkdownPdf
 from markdown_pdf import Section
+from PIL import Image
 from tqdm import tqdm
 
-from download_to_csv import main_download_csv, get_distinct_tokens
+import instrumentation
+from download_to_csv import main_download_csv
+from instrumentation import configure_worker, traced, tracer
+from md import basic_charts, trend_lines, correlation_analysis
+from token_catalog import list_tokens
+from token_schedule import MIN_ROWS, Plan, plan_tokens, print_cost_summary, row_counts, submit_largest_first
 
 logger = logging.getLogger(__name__)
 
-# Set figure aesthetics for better visualization
-plt.style.use('ggplot')
-
-# Set higher DPI for sharper in-notebook display
-plt.rcParams['figure.dpi'] = 100
 folder = 'pdf_plot_output_figures'
-# CSV_SOURCE = 'price_snapshots_usol.csv'
-# BASIC_CHART_FIGURE = f'{folder}/uLINK_price_charts.png'
-# TREND_LINES_FIGURE = f'{folder}/uLINK_price_charts_with_trend.png'
-# CORRELATION_ANALYSIS_FIGURE = f'{folder}/uLINK_relationship_chart.png'
+display_folder = f'{folder}/display'
+COMBINED_PDF = 'weekly_price_charts.pdf'
 
+# A4 is 595pt wide and markdown_pdf keeps 36pt borders, so charts are shown
+# ~7.3in wide; 150 dpi at that width is plenty for screen and print.
+PDF_IMAGE_DPI = 150
+PDF_IMAGE_WIDTH_PX = int((595 - 2 * 36) / 72 * PDF_IMAGE_DPI)
 
-def basic_charts(token: str, csv_source: str, basic_chart_figure: str) -> pd.DataFrame:
-    """
-    Basic Line Charts
-    Let's create two separate line charts for the token amount and USDC return.
-    """
-    # Load the CSV data
-    df = pd.read_csv(csv_source)
-
-    # Display the first few rows to verify data loading
-    print(f"Total rows: {len(df)}")
-
-    # Data preprocessing
-    # Convert timestamp to datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
-
-    # Convert ua_token_amount from string to float (it's in wei format with 18 decimals)
-    df['ua_token_amount'] = df['ua_token_amount'].astype(float)
-
-    # Convert to a more readable format (divide by 10^18 to get the actual token amount)
-    df['ua_token_amount_readable'] = df['ua_token_amount'] / 1e18
-
-    # Sort by timestamp to ensure proper chronological order
-    df = df.sort_values('timestamp')
-
-    # Basic Line Charts
-    # Let's create two separate line charts for the token amount and USDC return.
-    # Set up the figure with two subplots (one for each metric)
-    plt.figure(figsize=(14, 10))
-
-    # Plot 1: ua_token_amount over time
-    plt.subplot(2, 1, 1)
-    plt.plot(df['timestamp'], df['ua_token_amount_readable'], color='blue', linewidth=2)
-    plt.title(f'{token} Token Amount Over Time', fontsize=16)
-    plt.ylabel('Token Amount', fontsize=14)
-    plt.grid(True, alpha=0.3)
-
-    # Format the x-axis to show nice time labels
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    plt.xticks(rotation=45)
-
-    # Plot 2: odos_usdc_return over time
-    plt.subplot(2, 1, 2)
-    plt.plot(df['timestamp'], df['odos_usdc_return'], color='green', linewidth=2)
-    plt.title('USDC Return Value Over Time', fontsize=16)
-    plt.xlabel('Time', fontsize=14)
-    plt.ylabel('USDC Value', fontsize=14)
-    plt.grid(True, alpha=0.3)
-
-    # Format the x-axis to show nice time labels
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    plt.xticks(rotation=45)
-
-    # Adjust layout
-    plt.tight_layout()
-    # Optional: save as image file
-    plt.savefig(basic_chart_figure, dpi=300)
-    plt.clf()
-    return df
-
-
-def trend_lines(token: str, df: pd.DataFrame, trend_lines_figure: str):
-    """
-    Enhanced Visualization with Trend Lines
-    Now let's create more detailed visualizations with trend lines and annotations.
-    """
-    # Enhanced visualization with additional insights
-    plt.figure(figsize=(16, 12))
-
-    # Plot with more detailed formatting
-    # 1. ua_token_amount with trend line
-    plt.subplot(2, 1, 1)
-    plt.plot(df['timestamp'], df['ua_token_amount_readable'], color='blue', linewidth=2, label='Token Amount')
-
-    # Add trend line
-    z = np.polyfit(range(len(df)), df['ua_token_amount_readable'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['timestamp'], p(range(len(df))), "r--", linewidth=1, label='Trend Line')
-
-    plt.title(f'{token} Token Amount Over Time', fontsize=16)
-    plt.ylabel('Token Amount', fontsize=14)
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-
-    # Add annotations for min and max values
-    max_token_idx = df['ua_token_amount_readable'].idxmax()
-    min_token_idx = df['ua_token_amount_readable'].idxmin()
-
-    plt.annotate(f'Max: {df.loc[max_token_idx, "ua_token_amount_readable"]:.2f}',
-                 xy=(df.loc[max_token_idx, 'timestamp'], df.loc[max_token_idx, 'ua_token_amount_readable']),
-                 xytext=(10, 10), textcoords='offset points', arrowprops=dict(arrowstyle='->'))
-
-    plt.annotate(f'Min: {df.loc[min_token_idx, "ua_token_amount_readable"]:.2f}',
-                 xy=(df.loc[min_token_idx, 'timestamp'], df.loc[min_token_idx, 'ua_token_amount_readable']),
-                 xytext=(10, -20), textcoords='offset points', arrowprops=dict(arrowstyle='->'))
-
-    # Format the x-axis
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    plt.xticks(rotation=45)
-
-    # 2. odos_usdc_return with trend line
-    plt.subplot(2, 1, 2)
-    plt.plot(df['timestamp'], df['odos_usdc_return'], color='green', linewidth=2, label='USDC Return')
-
-    # Add trend line
-    z = np.polyfit(range(len(df)), df['odos_usdc_return'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['timestamp'], p(range(len(df))), "r--", linewidth=1, label='Trend Line')
-
-    plt.title('USDC Return Value Over Time', fontsize=16)
-    plt.xlabel('Time', fontsize=14)
-    plt.ylabel('USDC Value', fontsize=14)
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-
-    # Add annotations for min and max values
-    max_usdc_idx = df['odos_usdc_return'].idxmax()
-    min_usdc_idx = df['odos_usdc_return'].idxmin()
-
-    plt.annotate(f'Max: {df.loc[max_usdc_idx, "odos_usdc_return"]:.2f}',
-                 xy=(df.loc[max_usdc_idx, 'timestamp'], df.loc[max_usdc_idx, 'odos_usdc_return']),
-                 xytext=(10, 10), textcoords='offset points', arrowprops=dict(arrowstyle='->'))
-
-    plt.annotate(f'Min: {df.loc[min_usdc_idx, "odos_usdc_return"]:.2f}',
-                 xy=(df.loc[min_usdc_idx, 'timestamp'], df.loc[min_usdc_idx, 'odos_usdc_return']),
-                 xytext=(10, -20), textcoords='offset points', arrowprops=dict(arrowstyle='->'))
-
-    # Format the x-axis
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    plt.xticks(rotation=45)
-
-    plt.tight_layout()
-    # Optional: save as image file
-    plt.savefig(trend_lines_figure, dpi=300)
-    plt.clf()
-
-
-def correlation_analysis(token: str, df: pd.DataFrame, correlation_analysis_figure: str):
+Figures = typ.Tuple[str, str, str]
+
+# Vector mode lays pages out itself: A4 with the same 36pt borders as markdown_pdf.
+PAGE_RECT = pymupdf.paper_rect('A4')
+CONTENT_RECT = PAGE_RECT + (36, 36, -36, -36)
+CHART_GAP = 12
+CHART_PLACEHOLDER = re.compile(r"<img src='(chart-\d+)'[^>]*/>")
+
+
+@traced('prepare_image', token_arg=None)
+def prepare_image(figure: str) -> str:
     """
-    Correlation Analysis
-    Let's analyze the relationship between token amount and USDC return. We'll create a scatter plot to visualize their relationship and calculate the correlation coefficient.
+    Downscale and compress a 300-dpi chart once for PDF embedding.
+
+    The chart is resized to the PDF's display width and stored as a 256-colour
+    optimized PNG, which line charts survive without visible loss. Every PDF
+    that shows the chart embeds this copy instead of re-optimizing the original.
     """
-    from IPython.display import display
-    # Correlation analysis
-    correlation = df['ua_token_amount_readable'].corr(df['odos_usdc_return'])
-    print(f"Correlation between token amount and USDC return: {correlation:.4f}")
-
-    # Display basic statistics
-    print(f"\nStatistics for {token} Token Amount:")
-    display(df['ua_token_amount_readable'].describe())
-
-    print("\nStatistics for USDC Return:")
-    display(df['odos_usdc_return'].describe())
-
-    # Plot the relationship between token amount and USDC return
-    plt.figure(figsize=(10, 6))
-    plt.scatter(df['ua_token_amount_readable'], df['odos_usdc_return'], alpha=0.5)
-    plt.title('Relationship Between Token Amount and USDC Return', fontsize=16)
-    plt.xlabel('Token Amount', fontsize=14)
-    plt.ylabel('USDC Return', fontsize=14)
-    plt.grid(True, alpha=0.3)
-
-    # Add trend line
-    z = np.polyfit(df['ua_token_amount_readable'], df['odos_usdc_return'], 1)
-    p = np.poly1d(z)
-    plt.plot(df['ua_token_amount_readable'], p(df['ua_token_amount_readable']), "r--")
-
-    plt.tight_layout()
-    # Optional: save as image file
-    plt.savefig(correlation_analysis_figure, dpi=300)
-    plt.clf()
-
-
-def make_pdf(symbol, basic_chart_figure, trend_lines_figure, correlation_analysis_figure):
-    """Use markdown and generate the pdf."""
-    pdf = MarkdownPdf(toc_level=2, optimize=True)
-    _basic_chart = f"<img src='{basic_chart_figure}'/>"
-    _trend_lines_chart = f"<img src='{trend_lines_figure}'/>"
-    _correlation_analysis_chart = f"<img src='{correlation_analysis_figure}'/>"
+    os.makedirs(display_folder, exist_ok=True)
+    prepared = f"{display_folder}/{os.path.basename(figure)}"
+    with Image.open(figure) as image:
+        image = image.convert('RGB')
+        if image.width > PDF_IMAGE_WIDTH_PX:
+            height = round(image.height * PDF_IMAGE_WIDTH_PX / image.width)
+            image = image.resize((PDF_IMAGE_WIDTH_PX, height), Image.LANCZOS, reducing_gap=3.0)
+        image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(prepared, optimize=True)
+    return prepared
+
+
+def token_markdown(symbol: str, figures: Figures, heading: str = 'Figure') -> str:
+    """Return the markdown section showing one token's charts."""
+    _basic_chart, _trend_lines_chart, _correlation_analysis_chart = (
+        f"<img src='{figure}' width='100%'/>" for figure in figures)
 
     # This is bug. Must no ident in the content lines.
-    content = f"""
-## Figure
+    return f"""
+## {heading}
 
 ### {symbol} Price Visualization
 This notebook visualizes the price data of {symbol} token from the past hour. We'll create multiple interactive visualizations directly in the notebook:
@@ -232,37 +96,234 @@ Let's analyze the relationship between token amount and USDC return. We'll creat
 
 {_correlation_analysis_chart}
     """
+
+
+@traced('pdf', token_arg='symbol')
+def make_pdf(symbol, basic_chart_figure, trend_lines_figure, correlation_analysis_figure) -> typ.Tuple[str, float, int]:
+    """Use markdown and generate the pdf. Returns the file name, build seconds and size in bytes."""
+    start = time.perf_counter()
+    pdf = MarkdownPdf(toc_level=2, optimize=True)
+    content = token_markdown(symbol, (basic_chart_figure, trend_lines_figure, correlation_analysis_figure))
     pdf.add_section(Section(content, toc=False))
 
     pdf.meta["title"] = "price chart"
     pdf.meta["author"] = "VaporFund"
-    pdf.save(f"price_chart_{symbol}.pdf")
+    pdf_file = f"price_chart_{symbol}.pdf"
+    pdf.save(pdf_file)
+    return pdf_file, time.perf_counter() - start, os.path.getsize(pdf_file)
+
+
+@traced('combined_pdf', token_arg=None)
+def make_combined_pdf(token_figures: typ.Dict[str, Figures], pdf_file: str = COMBINED_PDF) -> typ.Tuple[str, float, int]:
+    """Merge every token's charts into one weekly PDF with a table of contents."""
+    start = time.perf_counter()
+    pdf = MarkdownPdf(toc_level=2, optimize=True)
+    pdf.add_section(Section("# Weekly Price Charts\n", toc=True))
+    for symbol, figures in token_figures.items():
+        pdf.add_section(Section(token_markdown(symbol, figures, heading=symbol), toc=True))
+
+    pdf.meta["title"] = "weekly price charts"
+    pdf.meta["author"] = "VaporFund"
+    pdf.save(pdf_file)
+    return pdf_file, time.perf_counter() - start, os.path.getsize(pdf_file)
+
+
+def _build_token_pdf(item: typ.Tuple[str, Figures]) -> typ.Tuple[str, str, float, int]:
+    """Process-pool entry point: build one token's PDF."""
+    symbol, figures = item
+    return (symbol, *make_pdf(symbol, *figures))
+
+
+def build_pdfs(token_figures: typ.Dict[str, Figures], workers: int | None = None,
+               combined: bool = False) -> typ.List[typ.Tuple[str, str, float, int]]:
+    """
+    Build every token PDF in a process pool, optionally followed by the combined PDF.
+
+    Charts are downscaled once, in the same pool, then shared by the per-token
+    and combined PDFs. Build time and size of each PDF are printed at the end.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_worker,
+                             initargs=tracer.settings()) as executor:
+        figures = [figure for token_charts in token_figures.values() for figure in token_charts]
+        display_figures = dict(zip(figures, executor.map(prepare_image, figures)))
+        prepared = {symbol: tuple(display_figures[figure] for figure in token_charts)
+                    for symbol, token_charts in token_figures.items()}
+        results = list(executor.map(_build_token_pdf, prepared.items()))
+    if combined and prepared:
+        results.append(('ALL', *make_combined_pdf(prepared)))
+
+    print(f"\n{'Token':<8} {'PDF':<32} {'Seconds':>8} {'Size (KB)':>10}")
+    for symbol, pdf_file, seconds, size in results:
+        print(f"{symbol:<8} {pdf_file:<32} {seconds:>8.2f} {size / 1024:>10.1f}")
+    total_size = sum(size for *_, size in results)
+    print(f"PDF stage: {time.perf_counter() - start:.2f}s wall, {total_size / 1024:.1f} KB total")
+    return results
+
+
+@traced('vector_charts', token_arg='symbol')
+def render_vector_charts(symbol: str, csv_source: str) -> typ.Tuple[bytes, bytes, bytes]:
+    """Render the three token charts as in-memory vector PDFs, without touching disk."""
+    buffers = (io.BytesIO(), io.BytesIO(), io.BytesIO())
+    with plt.rc_context({'savefig.format': 'pdf'}):
+        df = basic_charts(token=symbol, csv_source=csv_source, basic_chart_figure=buffers[0])
+        trend_lines(token=symbol, df=df, trend_lines_figure=buffers[1])
+        correlation_analysis(token=symbol, df=df, correlation_analysis_figure=buffers[2])
+    plt.close('all')
+    return tuple(buffer.getvalue() for buffer in buffers)
+
+
+def _place_vector_section(doc: pymupdf.Document, page: pymupdf.Page | None, y: float,
+                          markdown_text: str, charts: typ.Sequence[bytes]) -> typ.Tuple[pymupdf.Page, float]:
+    """
+    Lay out one markdown section with vector charts, starting at height `y`.
+
+    Text between charts is rendered with `insert_htmlbox`; each chart PDF is
+    stamped in as a form XObject with `show_pdf_page`, so lines stay vectors.
+    Returns the page and height where the next content starts.
+    """
+    def next_page():
+        return doc.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height), CONTENT_RECT.y0
+
+    if page is None:
+        page, y = next_page()
+    parts = CHART_PLACEHOLDER.split(markdown_text)
+    for index, part in enumerate(parts):
+        if index % 2:
+            with pymupdf.open(stream=charts[int(part.split('-')[1])], filetype='pdf') as chart:
+                height = CONTENT_RECT.width * chart[0].rect.height / chart[0].rect.width
+                if y + height > CONTENT_RECT.y1:
+                    page, y = next_page()
+                page.show_pdf_page(pymupdf.Rect(CONTENT_RECT.x0, y, CONTENT_RECT.x1, y + height), chart, 0)
+            y += height + CHART_GAP
+        elif part.strip():
+            html = MarkdownIt('commonmark').render(part)
+            box = pymupdf.Rect(CONTENT_RECT.x0, y, CONTENT_RECT.x1, CONTENT_RECT.y1)
+            spare, _ = page.insert_htmlbox(box, html, scale_low=1)
+            if spare < 0:
+                page, y = next_page()
+                box = pymupdf.Rect(CONTENT_RECT.x0, y, CONTENT_RECT.x1, CONTENT_RECT.y1)
+                spare, _ = page.insert_htmlbox(box, html, scale_low=1)
+            y = CONTENT_RECT.y1 - max(spare, 0)
+    return page, y
+
+
+def _save_vector_doc(doc: pymupdf.Document, pdf_file: str, title: str) -> int:
+    doc.set_metadata({"title": title, "author": "VaporFund"})
+    doc.ez_save(pdf_file)
+    doc.close()
+    return os.path.getsize(pdf_file)
+
+
+@traced('pdf', token_arg='symbol')
+def make_vector_pdf(symbol: str, charts: typ.Sequence[bytes]) -> typ.Tuple[str, float, int]:
+    """Build one token's PDF with its charts embedded as vectors."""
+    start = time.perf_counter()
+    doc = pymupdf.open()
+    _place_vector_section(doc, None, 0, token_markdown(symbol, ('chart-0', 'chart-1', 'chart-2')), charts)
+    pdf_file = f"price_chart_{symbol}.pdf"
+    size = _save_vector_doc(doc, pdf_file, "price chart")
+    return pdf_file, time.perf_counter() - start, size
+
+
+@traced('combined_pdf', token_arg=None)
+def make_combined_vector_pdf(token_charts: typ.Dict[str, typ.Sequence[bytes]],
+                             pdf_file: str = COMBINED_PDF) -> typ.Tuple[str, float, int]:
+    """Merge every token's vector charts into one weekly PDF with a table of contents."""
+    start = time.perf_counter()
+    doc = pymupdf.open()
+    page, y = _place_vector_section(doc, None, 0, "# Weekly Price Charts\n", ())
+    toc = [[1, "Weekly Price Charts", 1]]
+    for symbol, charts in token_charts.items():
+        page, y = doc.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height), CONTENT_RECT.y0
+        toc.append([2, symbol, doc.page_count])
+        markdown_text = token_markdown(symbol, ('chart-0', 'chart-1', 'chart-2'), heading=symbol)
+        page, y = _place_vector_section(doc, page, y, markdown_text, charts)
+    doc.set_toc(toc)
+    size = _save_vector_doc(doc, pdf_file, "weekly price charts")
+    return pdf_file, time.perf_counter() - start, size
+
+
+def _build_token_vector_pdf(symbol: str) -> typ.Tuple[str, str, float, int, typ.Tuple[bytes, bytes, bytes]]:
+    """Process-pool entry point: render one token's charts in memory and build its PDF."""
+    charts = render_vector_charts(symbol, f"quotes_{symbol}.csv")
+    return (symbol, *make_vector_pdf(symbol, charts), charts)
+
+
+def build_vector_pdfs(plan: Plan, workers: int | None = None,
+                      combined: bool = False) -> typ.List[typ.Tuple[str, str, float, int]]:
+    """
+    Render charts and build every token PDF in a process pool, entirely in memory.
+
+    Tokens are submitted largest first as planned by `token_schedule`, and
+    the estimated cost of each is printed next to its actual time. Tokens
+    without a quotes file, or with no quotes left after the data-quality
+    checks, are logged and skipped, as in `main`; the combined
+    PDF keeps the catalog's token order.
+    """
+    start = time.perf_counter()
+    results, token_charts, actual = [], {}, {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_worker,
+                             initargs=tracer.settings()) as executor:
+        futures = submit_largest_first(executor, _build_token_vector_pdf, plan)
+        for symbol, future in futures.items():
+            try:
+                actual[symbol], (*result, charts) = future.result()
+            except FileNotFoundError:
+                logger.error(f"File not found for token: {symbol}")
+                continue
+            except ValueError as error:
+                # Every quote was dropped by the data-quality checks
+                logger.error(f"Skipping token {symbol}: {error}")
+                continue
+            results.append(tuple(result))
+            token_charts[symbol] = charts
+    if combined and token_charts:
+        listed = {symbol: token_charts[symbol] for symbol in plan.listed_order(token_charts)}
+        results.append(('ALL', *make_combined_vector_pdf(listed)))
+
+    print(f"\n{'Token':<8} {'PDF':<32} {'Seconds':>8} {'Size (KB)':>10}")
+    for symbol, pdf_file, seconds, size in results:
+        print(f"{symbol:<8} {pdf_file:<32} {seconds:>8.2f} {size / 1024:>10.1f}")
+    total_size = sum(size for *_, size in results)
+    print(f"PDF stage: {time.perf_counter() - start:.2f}s wall, {total_size / 1024:.1f} KB total")
+    print_cost_summary(plan, actual, workers=workers or os.cpu_count())
+    return results
 
 def remove_figures_and_csv():
     """Remove all figures and CSV files."""
-    import os
     import glob
 
     # Remove all PNG files in the folder
-    png_files = glob.glob(f"{folder}/*.png")
+    png_files = glob.glob(f"{folder}/*.png") + glob.glob(f"{display_folder}/*.png")
     for file in png_files:
         os.remove(file)
 
-    # Remove all CSV files in the folder
-    csv_files = glob.glob("price_snapshots_*.csv")
+    # Remove the downloaded quote CSVs
+    csv_files = glob.glob("quotes_*.csv")
     for file in csv_files:
         os.remove(file)
 
 
-def main():
+def main(workers: int | None = None, combined: bool = False, vector: bool = False, min_rows: int = MIN_ROWS):
+    # Tokens too small to chart are dropped before anything is downloaded
+    counts, source = row_counts(list_tokens())
+    plan = plan_tokens(counts, min_rows=min_rows, source=source)
+    if vector:
+        # Charts never hit disk in vector mode, so there is nothing to clean up.
+        for token_symbol in tqdm(plan.symbols(), desc="Downloading tokens"):
+            main_download_csv(token_symbol=token_symbol)
+        build_vector_pdfs(plan, workers=workers, combined=combined)
+        return
 
-    symbols = get_distinct_tokens()
-    for token_symbol in tqdm(symbols, desc="Processing tokens"):
-    # for token_symbol in ["uPEPE"]:
+    os.makedirs(folder, exist_ok=True)
+    token_figures, actual = {}, {}
+    for token_symbol in tqdm(plan.listed_order(plan.symbols()), desc="Processing tokens"):
         try:
             # download to CSV
             main_download_csv(token_symbol=token_symbol)
-            output_csv_file = f"price_snapshots_{token_symbol}.csv"
+            output_csv_file = f"quotes_{token_symbol}.csv"
+            start = time.perf_counter()
 
             BASIC_CHART_FIGURE = f'{folder}/{token_symbol}_price_charts.png'
             TREND_LINES_FIGURE = f'{folder}/{token_symbol}_price_charts_with_trend.png'
@@ -271,20 +332,37 @@ def main():
             df = basic_charts(token=token_symbol, csv_source=output_csv_file, basic_chart_figure=BASIC_CHART_FIGURE)
             trend_lines(token=token_symbol, df=df, trend_lines_figure=TREND_LINES_FIGURE)
             correlation_analysis(token=token_symbol, df=df, correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE)
-            make_pdf(
-                symbol=token_symbol,
-                basic_chart_figure=BASIC_CHART_FIGURE,
-                trend_lines_figure=TREND_LINES_FIGURE,
-                correlation_analysis_figure=CORRELATION_ANALYSIS_FIGURE
-            )
-        except numpy.linalg.LinAlgError:
-            # uDODGE has only 1 record.
-            logger.error(token_symbol)
+            token_figures[token_symbol] = (BASIC_CHART_FIGURE, TREND_LINES_FIGURE, CORRELATION_ANALYSIS_FIGURE)
+            actual[token_symbol] = time.perf_counter() - start
         except FileNotFoundError:
             # uPEPE has no record.
             logger.error(f"File not found for token: {token_symbol}")
+        except ValueError as error:
+            # Every quote was dropped by the data-quality checks
+            logger.error(f"Skipping token {token_symbol}: {error}")
+
+    # Charts are rendered one token at a time here; their PDFs are built in the pool below
+    print_cost_summary(plan, actual)
+    build_pdfs(token_figures, workers=workers, combined=combined)
     remove_figures_and_csv()
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate per-token price chart PDFs.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes used to build PDFs (default: one per CPU)")
+    parser.add_argument('--combined', action='store_true',
+                        help=f"also merge all tokens into {COMBINED_PDF} with a table of contents")
+    parser.add_argument('--vector', action='store_true',
+                        help="render charts to in-memory vector PDFs and embed them directly")
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS,
+                        help="skip tokens with fewer quotes in the download window (default: %(default)s)")
+    instrumentation.add_arguments(parser)
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    instrumentation.start(args)
+    main(workers=args.workers, combined=args.combined, vector=args.vector, min_rows=args.min_rows)
+    instrumentation.finish(args)
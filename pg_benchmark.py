@@ -0,0 +1,369 @@
+"""
+Database-side checks and timings against a local Postgres with synthetic quotes.
+
+The database comes from PG_BENCHMARK_DSN (default: the `postgres` database on
+localhost), never from the report database settings, and a host other than
+localhost or a Unix socket is refused unless --allow-remote is given. Every
+run creates a scratch schema, fills a `quotes` table shaped like the
+production one with generated rows, applies the migrations in migrations/
+there, and drops the schema at the end. Each registered check verifies its
+query against a plain SQL reference and reports timings, so the database
+changes can be validated without touching real data:
+
+    PG_BENCHMARK_DSN=postgresql://localhost/scratch python pg_benchmark.py --rows 1000000 4000000
+    python pg_benchmark.py --filter catalog --keep
+"""
+import argparse
+import contextlib
+import logging
+import os
+import time
+import typing as typ
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extensions import parse_dsn
+
+import report_stats
+import rollups
+import token_catalog
+from download_to_csv import INPUT_AMOUNT, SNAPSHOT_PER_SIDE, snapshot_query
+from migrate import migration_files, split_statements
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Scratch database for the checks; deliberately separate from the report database settings.
+BENCHMARK_DSN = os.getenv("PG_BENCHMARK_DSN", "postgresql://localhost/postgres")
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+CREATE_QUOTES = """
+CREATE TABLE quotes (
+    id                      bigserial PRIMARY KEY,
+    token_id                integer,
+    exchange_id             integer,
+    quote_type              text,
+    input_token_symbol      text,
+    input_amount            numeric,
+    output_token_symbol     text,
+    output_amount           numeric,
+    output_amount_formatted numeric,
+    slippage_limit_percent  numeric,
+    price_per_token         numeric,
+    user_address            text,
+    chain_id                integer,
+    quoted_at               timestamptz,
+    expires_at              timestamptz,
+    is_valid                boolean
+);
+"""
+
+# Lookup tables the snapshot joins for symbols, token names and exchange names.
+CREATE_LOOKUPS = """
+CREATE TABLE tokens (id integer PRIMARY KEY, symbol text NOT NULL, name text NOT NULL);
+CREATE TABLE exchanges (id integer PRIMARY KEY, name text NOT NULL);
+INSERT INTO tokens SELECT i, 'TKN' || i, 'Token number ' || i FROM generate_series(1, %(tokens)s) AS g(i);
+INSERT INTO exchanges SELECT i, 'Exchange ' || i FROM generate_series(1, %(exchanges)s) AS g(i);
+"""
+
+# Rows are spread evenly over the last `days` days; every token gets a base
+# price, a slow oscillation and a small per-exchange offset. Odd exchanges
+# quote BUY (1000 USDC in, tokens out) and even ones SELL (tokens in, USDC
+# out), so SELL rows carry USDC as output_token_symbol as in production.
+INSERT_QUOTES = """
+INSERT INTO quotes (token_id, exchange_id, quote_type, input_token_symbol, input_amount, output_token_symbol,
+                    output_amount, output_amount_formatted, slippage_limit_percent, price_per_token,
+                    user_address, chain_id, quoted_at, expires_at, is_valid)
+SELECT k.token, k.exchange, k.side,
+       CASE WHEN k.side = 'BUY' THEN 'USDC' ELSE 'TKN' || k.token END,
+       CASE WHEN k.side = 'BUY' THEN 1000000000 ELSE round(1e18 * 1000 / k.price) END,
+       CASE WHEN k.side = 'BUY' THEN 'TKN' || k.token ELSE 'USDC' END,
+       CASE WHEN k.side = 'BUY' THEN round(1e18 * 1000 / k.price) ELSE 1000000000 END,
+       CASE WHEN k.side = 'BUY' THEN round(1000 / k.price, 8) ELSE 1000 END,
+       0.5, round(k.price, 8), '0x0', 8453, k.quoted_at, NULL, true
+FROM generate_series(%(first)s, %(last)s) AS g(i)
+CROSS JOIN LATERAL (
+    SELECT 1 + g.i %% %(tokens)s AS token,
+           1 + (g.i / %(tokens)s) %% %(exchanges)s AS exchange,
+           CASE WHEN (1 + (g.i / %(tokens)s) %% %(exchanges)s) %% 2 = 1 THEN 'BUY' ELSE 'SELL' END AS side,
+           ((1 + g.i %% %(tokens)s) * (1 + 0.01 * sin(g.i / 1000.0))
+               * (1 + 0.001 * ((g.i / %(tokens)s) %% %(exchanges)s)))::numeric AS price,
+           now() + %(offset_hours)s * interval '1 hour' - %(days)s * interval '1 day' * (1 - g.i::float / %(last)s) AS quoted_at
+) AS k;
+"""
+
+# name -> function(cursor, settings) returning {label: seconds}; raises AssertionError on a mismatch.
+CHECKS: typ.Dict[str, typ.Callable[[typ.Any, dict], typ.Dict[str, float]]] = {}
+
+
+def pg_check(name: str):
+    """Register a database check."""
+    def decorator(func):
+        CHECKS[name] = func
+        return func
+    return decorator
+
+
+def timed(cur, query: str, repeat: int, params: dict | None = None) -> typ.Tuple[float, list]:
+    """Run `query` `repeat` times; return the fastest time and the last result."""
+    best = float('inf')
+    rows = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query, params)
+        rows = cur.fetchall() if cur.description else []
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+@contextlib.contextmanager
+def scratch_schema(conn, keep: bool = False):
+    """Create a throwaway schema and put it first on the search path."""
+    schema = f"benchmark_{os.getpid()}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema};")
+        cur.execute(f"SET search_path TO {schema}, public;")
+    try:
+        yield schema
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SET search_path TO DEFAULT;")
+            if keep:
+                print(f"Kept schema {schema}")
+            else:
+                cur.execute(f"DROP SCHEMA {schema} CASCADE;")
+
+
+def benchmark_parameters(dsn: str, allow_remote: bool = False) -> dict:
+    """
+    Connection parameters parsed from `dsn`.
+
+    Raises:
+        ValueError: If the DSN names a host other than localhost or a Unix
+            socket directory and `allow_remote` is not set.
+    """
+    params = parse_dsn(dsn)
+    hosts = [host for host in params.get('host', '').split(',') if host]
+    remote = [host for host in hosts if host not in LOCAL_HOSTS and not host.startswith('/')]
+    if remote and not allow_remote:
+        raise ValueError(f"Refusing to benchmark against non-local host(s) {', '.join(remote)}; "
+                         f"point PG_BENCHMARK_DSN at a scratch server or pass --allow-remote")
+    return params
+
+
+def seed_quotes(cur, rows: int, tokens: int, exchanges: int, days: int = 7, first: int = 1,
+                offset_hours: float = 0):
+    """Insert quotes numbered `first`..`rows`, ending `offset_hours` from now, into the scratch `quotes` table."""
+    cur.execute(INSERT_QUOTES, {'first': first, 'last': rows, 'tokens': tokens, 'exchanges': exchanges,
+                                'days': days, 'offset_hours': offset_hours})
+
+
+def apply_migrations(cur):
+    """Apply every migration to the scratch schema, one statement at a time."""
+    for path in migration_files():
+        with open(path, encoding='utf-8') as f:
+            for statement in split_statements(f.read()):
+                cur.execute(statement)
+
+
+@pg_check('catalog')
+def check_token_catalog(cur, settings: dict) -> typ.Dict[str, float]:
+    """Token discovery: full DISTINCT against the loose index scan and the catalog table."""
+    repeat = settings['repeat']
+    distinct_time, distinct = timed(cur, "SELECT DISTINCT output_token_symbol FROM quotes;", repeat)
+    loose_time, loose = timed(cur, token_catalog.LOOSE_SCAN_QUERY, repeat)
+    catalog_time, catalog = timed(cur, token_catalog.CATALOG_QUERY, repeat)
+    expected = sorted(row[0] for row in distinct)
+    assert sorted(row[0] for row in loose) == expected, "loose index scan returned different tokens"
+    assert [row[0] for row in catalog] == expected, "token_catalog returned different tokens"
+
+    # Incremental refresh after a batch of new quotes must match a full recount.
+    new_rows = settings['new_rows']
+    seed_quotes(cur, settings['rows'] + new_rows, settings['tokens'], settings['exchanges'],
+                first=settings['rows'] + 1, offset_hours=1)
+    refresh_time, _ = timed(cur, token_catalog.REFRESH_QUERY, 1)
+    cur.execute("SELECT output_token_symbol, count(*), max(quoted_at) FROM quotes "
+                "GROUP BY output_token_symbol ORDER BY 1;")
+    recount = cur.fetchall()
+    cur.execute("SELECT symbol, quote_count, last_seen FROM token_catalog ORDER BY symbol;")
+    assert cur.fetchall() == recount, "incremental refresh does not match a full recount"
+    settings['rows'] += new_rows
+
+    return {'distinct_scan': distinct_time, 'loose_index_scan': loose_time,
+            'catalog_table': catalog_time, f'refresh_{new_rows}_new': refresh_time}
+
+
+@pg_check('stats')
+def check_report_stats(cur, settings: dict) -> typ.Dict[str, float]:
+    """Report statistics: the grouped server-side query against pandas on every raw row."""
+    params = {'hours': report_stats.WINDOW_HOURS, 'input_amount': INPUT_AMOUNT, 'symbols': None}
+    # One transaction, so now() and with it the window is the same for both queries.
+    cur.execute("BEGIN;")
+    stats_time, stats_rows = timed(cur, report_stats.STATS_QUERY, settings['repeat'], params)
+    columns = [desc[0] for desc in cur.description]
+    raw_time, raw_rows = timed(cur, """
+        SELECT output_token_symbol, input_amount, output_amount_formatted, quoted_at FROM quotes
+        WHERE quoted_at >= now() - %(hours)s * interval '1 hour' AND input_amount = %(input_amount)s;
+        """, 1, params)
+    cur.execute("COMMIT;")
+
+    raw = pd.DataFrame(raw_rows, columns=['symbol', 'input_amount', 'output_amount_formatted', 'quoted_at'])
+    raw['output_amount_formatted'] = raw['output_amount_formatted'].astype(float)
+    server = pd.DataFrame(stats_rows, columns=columns).set_index('symbol')
+    for symbol, group in raw.groupby('symbol'):
+        expected = group['output_amount_formatted'].describe()
+        row = server.loc[symbol]
+        assert row['quotes'] == expected['count'], f"{symbol}: count differs"
+        actual = [float(row['usdc_mean']), float(row['usdc_std']), float(row['usdc_min']),
+                  *row['usdc_quartiles'], float(row['usdc_max'])]
+        assert np.allclose(actual, expected.iloc[1:].to_numpy(), rtol=1e-9), f"{symbol}: USDC stats differ"
+        first_min = group[group['output_amount_formatted'] == group['output_amount_formatted'].min()]
+        assert row['usdc_min_at'] == first_min['quoted_at'].min(), f"{symbol}: time of minimum differs"
+
+    print(f"  stats: {len(stats_rows)} rows fetched instead of {len(raw_rows):,}")
+    return {'server_side_stats': stats_time, 'fetch_raw_rows': raw_time}
+
+
+# The rollup aggregation done from scratch over every quote, for comparison.
+EXPECTED_ROLLUPS = """
+SELECT token_id, exchange_id, quote_type, date_trunc('hour', quoted_at),
+       (array_agg(price_per_token ORDER BY quoted_at, id))[1], max(price_per_token), min(price_per_token),
+       (array_agg(price_per_token ORDER BY quoted_at DESC, id DESC))[1], count(*),
+       sum(output_amount_formatted), sum(output_amount_formatted * output_amount_formatted)
+FROM quotes WHERE price_per_token > 0
+GROUP BY 1, 2, 3, 4
+"""
+
+STORED_ROLLUPS = """
+SELECT token_id, exchange_id, quote_type, hour, open, high, low, close, quotes, output_sum, output_sumsq
+FROM quote_rollups_hourly
+"""
+
+
+def assert_rollups_match(cur):
+    for first, second in ((EXPECTED_ROLLUPS, STORED_ROLLUPS), (STORED_ROLLUPS, EXPECTED_ROLLUPS)):
+        cur.execute(f"SELECT count(*) FROM ({first} EXCEPT {second}) AS difference;")
+        assert cur.fetchone()[0] == 0, "rollups differ from a full re-aggregation"
+
+
+@pg_check('rollups')
+def check_rollups(cur, settings: dict) -> typ.Dict[str, float]:
+    """Hourly rollups: batched and incremental refreshes against a full re-aggregation."""
+    db_params = settings['db_params']
+    start = time.perf_counter()
+    rollups.refresh_rollups(db_params, batch=max(1, settings['rows'] // 3))
+    full_time = time.perf_counter() - start
+    assert_rollups_match(cur)
+
+    new_rows = settings['new_rows']
+    seed_quotes(cur, settings['rows'] + new_rows, settings['tokens'], settings['exchanges'],
+                first=settings['rows'] + 1, offset_hours=2)
+    settings['rows'] += new_rows
+    start = time.perf_counter()
+    rollups.refresh_rollups(db_params)
+    incremental_time = time.perf_counter() - start
+    assert_rollups_match(cur)
+
+    start = time.perf_counter()
+    bars = rollups.window_bars(7, interval='1D', db_params=db_params)
+    read_time = time.perf_counter() - start
+    # Every token's BUY and SELL quotes are rolled up under the token itself
+    sides = rollups.fetch_rollups(7, db_params=db_params).groupby('symbol')['quote_type'].nunique()
+    cur.execute("SELECT symbol FROM tokens ORDER BY symbol;")
+    assert sorted(sides.index) == [row[0] for row in cur.fetchall()], "rollup symbols differ from tokens"
+    assert settings['exchanges'] < 2 or (sides == 2).all(), "a token's rollups lack its BUY or SELL side"
+    raw_time, _ = timed(cur, "SELECT output_token_symbol, exchange_id, quote_type, quoted_at, price_per_token "
+                             "FROM quotes WHERE quoted_at >= now() - interval '7 days';", 1)
+    print(f"  rollups: {len(bars)} daily bars for 7 days")
+    return {'initial_refresh': full_time, f'refresh_{new_rows}_new': incremental_time,
+            'read_7d_daily_bars': read_time, 'fetch_7d_raw_rows': raw_time}
+
+
+# Reference for the snapshot: number every side's priced quotes newest first.
+SNAPSHOT_REFERENCE = """
+SELECT t.symbol, t.name, e.name, quote_type, price_per_token, quoted_at FROM (
+    SELECT *, row_number() OVER (PARTITION BY token_id, exchange_id, quote_type
+                                 ORDER BY quoted_at DESC) AS n
+    FROM quotes WHERE price_per_token <> 0
+) AS numbered
+JOIN tokens t ON t.id = numbered.token_id
+JOIN exchanges e ON e.id = numbered.exchange_id
+WHERE n <= %(per_side)s
+"""
+
+
+@pg_check('snapshot')
+def check_snapshot(cur, settings: dict) -> typ.Dict[str, float]:
+    """Latest-quotes snapshot: index-backed loose scan against a window-function pass over every quote."""
+    repeat, per_side = settings['repeat'], SNAPSHOT_PER_SIDE
+    snapshot = snapshot_query(per_side).strip().rstrip(';')
+    projection = "SELECT symbol, name, exchange_name, quote_type, price_per_token, quoted_at FROM ({}) AS q"
+    for first, second in ((projection.format(snapshot), SNAPSHOT_REFERENCE),
+                          (SNAPSHOT_REFERENCE, projection.format(snapshot))):
+        cur.execute(f"SELECT count(*) FROM ({first} EXCEPT ALL {second}) AS difference;", {'per_side': per_side})
+        assert cur.fetchone()[0] == 0, "snapshot differs from the row_number() reference"
+    snapshot_time, rows = timed(cur, snapshot, repeat)
+    reference_time, _ = timed(cur, SNAPSHOT_REFERENCE, repeat, {'per_side': per_side})
+    print(f"  snapshot: {len(rows):,} rows, {per_side} per token, exchange and side")
+    return {'loose_scan_snapshot': snapshot_time, 'row_number_reference': reference_time}
+
+
+def run(db_params: dict, rows: int, tokens: int, exchanges: int, repeat: int, new_rows: int,
+        names: typ.Sequence[str], keep: bool) -> typ.Dict[str, typ.Dict[str, float]]:
+    conn = psycopg2.connect(**db_params)
+    conn.autocommit = True
+    results = {}
+    try:
+        with scratch_schema(conn, keep=keep) as schema, conn.cursor() as cur:
+            start = time.perf_counter()
+            cur.execute(CREATE_QUOTES)
+            seed_quotes(cur, rows, tokens, exchanges)
+            cur.execute(CREATE_LOOKUPS, {'tokens': tokens, 'exchanges': exchanges})
+            apply_migrations(cur)
+            cur.execute("ANALYZE quotes;")
+            print(f"Seeded {rows:,} quotes for {tokens} tokens in {time.perf_counter() - start:.1f}s")
+
+            # For checks that call the modules' own connection functions
+            settings = {'rows': rows, 'tokens': tokens, 'exchanges': exchanges, 'repeat': repeat,
+                        'new_rows': new_rows,
+                        'db_params': {**db_params, 'options': f'-c search_path={schema},public'}}
+            for name in names:
+                results[name] = CHECKS[name](cur, settings)
+                for label, seconds in results[name].items():
+                    print(f"  {name + '.' + label:<40} {seconds * 1000:10.1f} ms")
+    finally:
+        conn.close()
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check and time the database-side queries on synthetic quotes.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000],
+                        help="table sizes to test, e.g. 1000000 4000000 (default: %(default)s)")
+    parser.add_argument('--tokens', type=int, default=25)
+    parser.add_argument('--exchanges', type=int, default=2)
+    parser.add_argument('--new-rows', type=int, default=10_000,
+                        help="quotes added before timing incremental refreshes (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default='', help="only run checks whose name contains this text")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch schema for inspection")
+    parser.add_argument('--dsn', default=BENCHMARK_DSN, help="database to run in (default: PG_BENCHMARK_DSN)")
+    parser.add_argument('--allow-remote', action='store_true',
+                        help="allow a DSN whose host is not localhost or a Unix socket")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        db_params = benchmark_parameters(args.dsn, args.allow_remote)
+    except ValueError as error:
+        raise SystemExit(f"❌ {error}")
+    names = [name for name in CHECKS if args.filter in name]
+    for rows in args.rows:
+        print(f"\n📊 {rows:,} rows")
+        run(db_params, rows, args.tokens, args.exchanges, args.repeat, args.new_rows, names, args.keep)
+    print(f"\n✅ All checks passed")
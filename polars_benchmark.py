@@ -0,0 +1,88 @@
+"""
+Speed of the pandas and Polars paths that prepare one token's quotes.
+
+Writes a synthetic quotes_<token>.csv at 1x, 10x and 100x a day's rows of a
+busy token and times `md.load_quotes` with each engine, alone and followed by
+the data-quality checks (the frame `md.basic_charts` charts). A run fails when
+the two engines disagree on any value the reports read:
+
+    python polars_benchmark.py
+    python polars_benchmark.py --rows 2000 --scales 1 10 --repeat 5
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import typing as typ
+
+import pandas as pd
+
+import md
+import polars_pipeline
+from data_quality import apply_quality
+from synthetic_data import write_quotes_csvs
+
+logger = logging.getLogger(__name__)
+
+
+def best_time(function: typ.Callable[[], typ.Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def prepared(csv_path: str, engine: str) -> pd.DataFrame:
+    """Parsed and quality-checked quotes, as `md.basic_charts` plots them."""
+    df, _ = apply_quality(md.load_quotes(csv_path, engine))
+    return df
+
+
+def check_engines(csv_path: str):
+    """Assert both engines produce the same rows, order and values in the columns Polars keeps."""
+    expected, actual = prepared(csv_path, 'pandas'), prepared(csv_path, 'polars')
+    assert expected.attrs['quality'] == actual.attrs['quality'], "quality counts differ"
+    # An empty expires_at column is float NaN in pandas but a null datetime in Polars
+    columns = [column for column in actual.columns if column != 'expires_at']
+    pd.testing.assert_frame_equal(expected[columns], actual[columns], check_dtype=False)
+
+
+def run(rows: int, scales: typ.Sequence[int], repeat: int, folder: str) -> pd.DataFrame:
+    results = []
+    for scale in scales:
+        csv_path = write_quotes_csvs(os.path.join(folder, f'x{scale}'), tokens=1, rows=rows * scale)['uSHIB']
+        check_engines(csv_path)
+        result = {'scale': f'{scale}x', 'rows': rows * scale, 'csv_mb': os.path.getsize(csv_path) / 2**20}
+        for engine in polars_pipeline.ENGINES:
+            result[f'{engine}_load_s'] = best_time(lambda: md.load_quotes(csv_path, engine), repeat)
+            result[f'{engine}_prepared_s'] = best_time(lambda: prepared(csv_path, engine), repeat)
+        result['load_speedup'] = result['pandas_load_s'] / result['polars_load_s']
+        result['prepared_speedup'] = result['pandas_prepared_s'] / result['polars_prepared_s']
+        results.append(result)
+        print(f"  {scale:>4}x {rows * scale:>10,} rows: load {result['pandas_load_s']:.3f}s pandas vs "
+              f"{result['polars_load_s']:.3f}s polars")
+    return pd.DataFrame(results)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the pandas and Polars quote preparation paths.")
+    parser.add_argument('--rows', type=int, default=5_000, help="rows at 1x, about a day of one token (default: %(default)s)")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="data multiples to test (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed calls per measurement (default: %(default)s)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not polars_pipeline.available():
+        raise SystemExit("❌ polars is not installed: pip install polars pyarrow")
+    print(f"📊 {args.rows:,} rows at 1x, best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as folder:
+        results = run(args.rows, args.scales, args.repeat, folder)
+    with pd.option_context('display.max_columns', None, 'display.width', 200, 'display.float_format', '{:.3f}'.format):
+        print(results.to_string(index=False))
+    print("\n✅ Both engines produce the same quotes")
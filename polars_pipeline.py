@@ -0,0 +1,68 @@
+"""
+Optional Polars execution path for loading one token's quotes.
+
+`read_quotes` produces the frame `md.basic_charts` builds with pandas (parsed
+times, float amounts, the `*_readable` columns, sorted by time) from a lazy
+Polars query. Only the columns the report pipeline reads are parsed
+(projection pushdown), and parsing, casting and sorting run on Polars'
+multithreaded engine. The data-quality checks, charts and statistics still
+run on the pandas frame it returns.
+
+Polars is not a required dependency (`pip install polars pyarrow`). Select it
+with `python md.py --engine polars`; `polars_benchmark.py` compares both paths.
+"""
+import logging
+import typing as typ
+
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:  # optional dependency
+    pl = None
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('pandas', 'polars')
+
+# Columns read by the quality checks, charts, OHLC bars and daily partials;
+# the rest of a quotes CSV is never parsed.
+QUOTE_COLUMNS = ['id', 'exchange_id', 'input_amount', 'output_amount', 'output_amount_formatted',
+                 'price_per_token', 'output_token_symbol', 'quoted_at', 'expires_at', 'is_valid']
+# Wei amounts overflow Int64, and pandas converts them to float anyway.
+FLOAT_COLUMNS = ('input_amount', 'output_amount', 'output_amount_formatted', 'price_per_token')
+TIME_COLUMNS = ('quoted_at', 'expires_at')
+
+
+def available() -> bool:
+    return pl is not None
+
+
+def quotes_query(csv_source: str, columns: typ.Sequence[str] = QUOTE_COLUMNS) -> 'pl.LazyFrame':
+    """
+    Lazy plan of one token's quotes, prepared like `md.basic_charts` prepares them.
+
+    `columns` missing from the file (e.g. in an aggregate-mode series CSV)
+    are skipped. Rows keep their position in the file as `row`, so the
+    pandas frame gets the same index labels as the pandas path.
+    """
+    if pl is None:
+        raise ImportError("The polars engine needs the polars package: pip install polars pyarrow")
+    scan = pl.scan_csv(csv_source, schema_overrides={column: pl.String for column in TIME_COLUMNS}
+                       | {column: pl.Float64 for column in FLOAT_COLUMNS})
+    present = scan.collect_schema().names()
+    selected = [column for column in columns if column in present]
+    return (scan.with_row_index('row')
+            .select(pl.col('row').cast(pl.Int64), *selected)
+            .with_columns(pl.col(column).str.to_datetime(time_unit='us', time_zone='UTC', strict=False)
+                          for column in TIME_COLUMNS if column in selected)
+            .with_columns((pl.col(column) / 1e18).alias(f'{column}_readable')
+                          for column in ('output_amount', 'input_amount') if column in selected)
+            .sort('quoted_at', maintain_order=True))
+
+
+def read_quotes(csv_source: str, columns: typ.Sequence[str] = QUOTE_COLUMNS) -> pd.DataFrame:
+    """Collect `quotes_query` into the sorted pandas frame the report pipeline expects."""
+    df = quotes_query(csv_source, columns).collect().to_pandas().set_index('row')
+    df.index.name = None
+    return df
@@ -0,0 +1,253 @@
+"""Price-impact curves from multi-size quote ladders, and the trade sizes they support."""
+import argparse
+import glob
+import logging
+import os
+import typing as typ
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from download_to_csv import LADDER_INPUT_AMOUNTS, download_ladder_csv
+from markdown_templates import compile_template, render, render_table
+from report_writer import ReportWriter
+from token_catalog import list_tokens
+
+logger = logging.getLogger(__name__)
+
+USDC_DECIMALS = 6
+IMPACT_CHART = 'chart_images/price_impact_curves.png'
+IMPACT_REPORT = 'reports/PRICE_IMPACT.md'
+LADDER_USDC = tuple(amount / 10**USDC_DECIMALS for amount in LADDER_INPUT_AMOUNTS)
+
+
+def effective_prices(df: pd.DataFrame, ladder_usdc: typ.Sequence[float] | None = None) -> pd.DataFrame:
+    """
+    Add `token`, `size_usdc` and `effective_price` (USDC per token) to BUY and SELL quotes.
+
+    A BUY leg spends `input_amount` USDC on `output_amount_formatted` tokens.
+    A SELL leg sells the token for `output_amount_formatted` USDC; its input is
+    in token base units whose decimals the quote does not carry, so its price
+    is the quoted `price_per_token`. SELL sizes are snapped to the nearest
+    `ladder_usdc` size on a log scale, so both sides share the ladder's columns.
+    """
+    ladder_usdc = np.asarray(LADDER_USDC if ladder_usdc is None else ladder_usdc, dtype=float)
+    df = df.copy()
+    sell = (df['quote_type'] == 'SELL').to_numpy()
+    output = df['output_amount_formatted'].astype(float).to_numpy()
+    buy_size = df['input_amount'].astype(float).to_numpy() / 10**USDC_DECIMALS
+    nearest = np.abs(np.log(np.maximum(output, 1e-12))[:, None] - np.log(ladder_usdc)).argmin(axis=1)
+    df['token'] = np.where(sell, df['input_token_symbol'], df['output_token_symbol'])
+    df['size_usdc'] = np.where(sell, ladder_usdc[nearest], buy_size)
+    df['effective_price'] = np.where(sell, df['price_per_token'].astype(float), buy_size / output)
+    return df
+
+
+class PriceImpactCurves:
+    """
+    Effective price against trade size for every (token, exchange, side).
+
+    Curves are held as one matrix with a row per (token, exchange, quote type)
+    and a column per ladder size, built from a single groupby over all quotes;
+    BUY and SELL quotes of an exchange are never blended into one curve. Impact
+    is the cost of the size against the smallest size: a higher price for a
+    BUY, a lower one for a SELL. Interpolating at any sizes is a handful of
+    array operations over the whole matrix, so adding tokens or sizes does
+    not add Python-level loops.
+    """
+
+    def __init__(self, df: pd.DataFrame, exchange_column: str = 'exchange_id', side_column: str = 'quote_type'):
+        quotes = effective_prices(df)
+        key = ['token', exchange_column, side_column, 'size_usdc']
+        self.prices = (quotes.groupby(key, observed=True)['effective_price']
+                       .median().unstack('size_usdc').sort_index(axis=1)
+                       .rename_axis(index=['token', 'exchange', 'side']))
+        self.sizes = self.prices.columns.to_numpy(dtype=float)
+        # Impact relative to the smallest quoted size, in basis points, positive when the size costs more.
+        cost_sign = np.where(self.prices.index.get_level_values('side') == 'SELL', -1, 1)
+        self.impact_bps = (self.prices.div(self.prices.iloc[:, 0], axis=0) - 1).mul(cost_sign, axis=0) * 10**4
+
+    def at(self, sizes: typ.Sequence[float]) -> pd.DataFrame:
+        """
+        Interpolate every curve's impact (bps) at `sizes` USDC.
+
+        `np.interp` maps the sizes to fractional ladder positions once; the
+        impact matrix is then blended column-wise for all curves together.
+        Sizes outside the ladder are clamped to its ends.
+        """
+        sizes = np.asarray(sizes, dtype=float)
+        position = np.interp(sizes, self.sizes, np.arange(len(self.sizes)))
+        lower = np.floor(position).astype(int)
+        upper = np.minimum(lower + 1, len(self.sizes) - 1)
+        weight = position - lower
+        impact = self.impact_bps.to_numpy()
+        values = impact[:, lower] * (1 - weight) + impact[:, upper] * weight
+        return pd.DataFrame(values, index=self.impact_bps.index, columns=sizes)
+
+    def _side(self, frame: pd.DataFrame | pd.Series, side: str) -> pd.DataFrame | pd.Series:
+        """Rows of `frame` for one side, indexed by (token, exchange)."""
+        return frame[frame.index.get_level_values('side') == side].droplevel('side')
+
+    def venue_pairs(self) -> pd.DataFrame:
+        """
+        Every (token, buy exchange, sell exchange) on different exchanges, with its edge in bps.
+
+        The edge is selling at one exchange's SELL price against buying at
+        another's BUY price, both at the smallest size.
+        """
+        smallest = self.prices.iloc[:, 0]
+        buys = self._side(smallest, 'BUY').rename('buy_price').reset_index()
+        sells = self._side(smallest, 'SELL').rename('sell_price').reset_index()
+        pairs = buys.merge(sells, on='token', suffixes=('_buy', '_sell'))
+        pairs = pairs[pairs['exchange_buy'] != pairs['exchange_sell']].rename(
+            columns={'exchange_buy': 'buy_exchange', 'exchange_sell': 'sell_exchange'})
+        pairs['edge_bps'] = (pairs['sell_price'] / pairs['buy_price'] - 1) * 10**4
+        return pairs[['token', 'buy_exchange', 'sell_exchange', 'edge_bps']].reset_index(drop=True)
+
+    def cross_exchange_edge_bps(self) -> pd.Series:
+        """Each token's best edge, buying on one exchange and selling on another at the smallest size, in bps."""
+        return self.venue_pairs().groupby('token')['edge_bps'].max()
+
+    def optimal_sizes(self, edge_bps: pd.Series | None = None, points: int = 200) -> pd.DataFrame:
+        """
+        Find the venue pair and size maximizing expected profit for each token.
+
+        The arbitrage buys on one exchange and sells on another, so the
+        round-trip cost at a size is the BUY curve's impact on the first plus
+        the SELL curve's impact on the second. Profit is
+        `size * (edge - round_trip_impact)`, evaluated for every pair of
+        exchanges; tokens with no profitable size get an optimal size of 0.
+
+        Args:
+            edge_bps (pd.Series | None): Gross edge per token for every pair; defaults to each pair's own edge.
+            points (int): Log-spaced sizes evaluated across the ladder.
+        Returns:
+            pd.DataFrame: buy_exchange, sell_exchange, edge_bps, optimal_usdc, impact_bps and
+            expected_profit_usdc per token with both a BUY and a SELL curve on different exchanges.
+        """
+        pairs = self.venue_pairs()
+        if edge_bps is not None:
+            pairs['edge_bps'] = edge_bps.reindex(pairs['token']).to_numpy()
+        grid = np.geomspace(self.sizes[0], self.sizes[-1], points)
+        impact = self.at(grid)
+        buy_legs = self._side(impact, 'BUY').reindex(pd.MultiIndex.from_frame(pairs[['token', 'buy_exchange']]))
+        sell_legs = self._side(impact, 'SELL').reindex(pd.MultiIndex.from_frame(pairs[['token', 'sell_exchange']]))
+        round_trip = buy_legs.to_numpy() + sell_legs.to_numpy()
+        edge = pairs['edge_bps'].to_numpy()[:, None]
+        profit = grid * (edge - round_trip) / 10**4
+
+        profit = np.where(np.isnan(profit), -np.inf, profit)
+        best = profit.argmax(axis=1) if len(pairs) else np.zeros(0, dtype=int)
+        rows = np.arange(len(best))
+        best_profit = profit[rows, best]
+        profitable = best_profit > 0
+        pairs = pairs.assign(
+            optimal_usdc=np.where(profitable, grid[best], 0.0),
+            impact_bps=np.where(profitable, round_trip[rows, best], np.nan),
+            expected_profit_usdc=np.where(profitable, best_profit, 0.0),
+            _rank=np.where(profitable, best_profit, pairs['edge_bps'].fillna(-np.inf).to_numpy()),
+        )
+        # The best pair per token: the most profitable one, else the one with the widest edge
+        best_pairs = pairs.sort_values(['token', '_rank'], ascending=[True, False]).drop_duplicates('token')
+        return best_pairs.drop(columns='_rank').set_index('token')
+
+
+def load_ladders(pattern: str = 'ladder_*.csv') -> pd.DataFrame:
+    """Load every ladder CSV into one frame."""
+    files = sorted(glob.glob(pattern))
+    if not files:
+        raise FileNotFoundError(f"No ladder files match {pattern}")
+    return pd.concat([pd.read_csv(file) for file in files], ignore_index=True)
+
+
+def save_impact_chart(curves: PriceImpactCurves, chart_file: str = IMPACT_CHART) -> str:
+    """Plot each token's impact curves, one line per exchange and side, on a log size axis."""
+    tokens = curves.impact_bps.index.get_level_values(0).unique()
+    columns = min(3, len(tokens))
+    rows = -(-len(tokens) // columns)
+    fig, axes = plt.subplots(rows, columns, figsize=(5 * columns, 3.5 * rows), squeeze=False)
+    for ax, token in zip(axes.flat, tokens):
+        token_curves = curves.impact_bps.loc[token]
+        ax.plot(curves.sizes, token_curves.to_numpy().T, marker='o', linewidth=1.5)
+        ax.legend([f"Exchange {exchange} {side}" for exchange, side in token_curves.index], fontsize=8)
+        ax.set_xscale('log')
+        ax.set_title(str(token), fontweight='bold')
+        ax.set_xlabel('Trade Size (USDC)')
+        ax.set_ylabel('Price Impact (bps)')
+        ax.grid(True, alpha=0.3)
+    for ax in axes.flat[len(tokens):]:
+        ax.set_visible(False)
+    fig.suptitle('Price Impact by Trade Size', fontsize=16, fontweight='bold')
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(chart_file), exist_ok=True)
+    plt.savefig(chart_file, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return chart_file
+
+
+IMPACT_REPORT_TEMPLATE = compile_template("""# Price Impact Analysis
+
+Generated on: ${timestamp}
+
+Quotes at ${size_count} input sizes (${size_range} USDC) per token, exchange and side. Impact is the
+effective price at each size relative to the smallest size.
+
+![Price Impact Curves](../${chart_file})
+
+## Optimal Trade Size
+
+The optimal size maximizes `size × (edge − round-trip impact)` for buying on one exchange and
+selling on another. The edge is that exchange's SELL price over the other's BUY price at the
+smallest size; the round-trip impact is the BUY curve's impact plus the SELL curve's.
+
+${optimal_table}
+---
+
+*Generated by VaporFund Analytics*
+""")
+
+
+def main(download: bool = True):
+    """Download quote ladders, build the price-impact curves and write the chart and report."""
+    if download:
+        for token_symbol in tqdm(list_tokens(), desc="Downloading ladders"):
+            download_ladder_csv(token_symbol)
+
+    curves = PriceImpactCurves(load_ladders())
+    chart_file = save_impact_chart(curves)
+    optimal = curves.optimal_sizes().sort_values('expected_profit_usdc', ascending=False)
+    optimal_table = render_table([
+        ('Token', optimal.index.astype(str), '**{}**'),
+        ('Buy On', optimal['buy_exchange'], 'Exchange {}'),
+        ('Sell On', optimal['sell_exchange'], 'Exchange {}'),
+        ('Edge', optimal['edge_bps'], '{:.1f} bps'),
+        ('Optimal Size', optimal['optimal_usdc'], '${:,.0f}'),
+        ('Round-trip Impact', optimal['impact_bps'], '{:.1f} bps'),
+        ('Expected Profit', optimal['expected_profit_usdc'], '${:,.2f}'),
+    ])
+    report = render(
+        IMPACT_REPORT_TEMPLATE,
+        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        size_count=len(curves.sizes),
+        size_range=f"{curves.sizes[0]:,.0f} - {curves.sizes[-1]:,.0f}",
+        chart_file=chart_file,
+        optimal_table=optimal_table,
+    )
+    status = ReportWriter().write(IMPACT_REPORT, report)
+    print(f"📈 Price impact chart saved in: {chart_file}")
+    print(f"📄 Price impact report {status}: {IMPACT_REPORT}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build price-impact curves from multi-size quote ladders.")
+    parser.add_argument('--no-download', action='store_true',
+                        help="analyze the existing ladder_*.csv files instead of querying the database")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(download=not args.no_download)
@@ -0,0 +1,185 @@
+"""
+Mergeable t-digest quantile sketch for percentiles of streamed, chunked or partitioned data.
+
+A digest holds at most a few hundred centroids whatever the number of values
+it has seen, so percentiles of an unbounded stream need bounded memory and no
+sort of the full column. Digests serialize to plain dicts and merge, so they
+can be persisted per partition and combined later. `sketch_benchmark.py`
+checks accuracy and speed against exact quantiles.
+"""
+import logging
+import os
+import typing as typ
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Roughly the number of centroids kept after compression; larger is more
+# accurate and slower. The middle quantiles are typically within about
+# 1/COMPRESSION in rank, the tails much closer.
+COMPRESSION = float(os.getenv("QUANTILE_COMPRESSION", 100))
+# Centroids accumulate unmerged until there are this many times COMPRESSION.
+BUFFER_FACTOR = 5
+
+
+# Centroid sizes follow the arcsine scale function k(q) = compression * (asin(2q - 1) / pi + 1/2):
+# a centroid may span at most one unit of k. The scale is steep near q = 0 and
+# q = 1, so the tails keep small centroids and the extreme quantiles stay
+# accurate while the middle is summarised coarsely.
+def _scale(q: np.ndarray | float, compression: float) -> np.ndarray | float:
+    return compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)
+
+
+def _inverse_scale(k: float, compression: float) -> float:
+    return (np.sin((min(k, compression) / compression - 0.5) * np.pi) + 1) / 2
+
+
+def _summarise_sorted(values: np.ndarray, compression: float) -> typ.Tuple[np.ndarray, np.ndarray]:
+    """
+    Summarise sorted raw values in one vectorized pass.
+
+    Each value goes to the integer k bucket of its mid quantile; unit
+    weights cannot straddle a bucket by more than one value, so the buckets
+    are valid centroids without the greedy merge.
+    """
+    mid_q = (np.arange(len(values)) + 0.5) / len(values)
+    buckets = np.floor(_scale(mid_q, compression))
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    weights = np.diff(np.r_[starts, len(values)]).astype(float)
+    return np.add.reduceat(values, starts) / weights, weights
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float) -> typ.Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge weighted centroids into at most ~`compression` centroids.
+
+    Neighbours in mean order are combined greedily while the merged centroid
+    spans at most one unit of k, so merging digests does not coarsen them
+    beyond what the scale function allows.
+    """
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order].tolist(), weights[order].tolist()
+    total = sum(weights)
+    merged_means, merged_weights = [], []
+    before = 0.0
+    limit = total * _inverse_scale(1, compression)
+    mean, weight = means[0], weights[0]
+    for next_mean, next_weight in zip(means[1:], weights[1:]):
+        if before + weight + next_weight <= limit:
+            weight += next_weight
+            mean += (next_mean - mean) * next_weight / weight
+        else:
+            merged_means.append(mean)
+            merged_weights.append(weight)
+            before += weight
+            limit = total * _inverse_scale(_scale(before / total, compression) + 1, compression)
+            mean, weight = next_mean, next_weight
+    merged_means.append(mean)
+    merged_weights.append(weight)
+    return np.array(merged_means), np.array(merged_weights)
+
+
+class TDigest:
+    """
+    Approximate quantiles from a bounded set of weighted centroids.
+
+    Digests of disjoint partitions merge into a digest of their union, so
+    quartiles of a multi-day window can be read from per-day digests. Until
+    the first compression every value is its own centroid and quantiles are
+    exact, interpolated like `pd.Series.quantile`.
+    """
+
+    def __init__(self, compression: float = COMPRESSION, means: typ.Sequence[float] = (),
+                 weights: typ.Sequence[float] = (), min: float = np.inf, max: float = -np.inf):
+        self.compression = compression
+        self.means = np.asarray(means, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.min = float(min)
+        self.max = float(max)
+
+    @classmethod
+    def from_values(cls, values: typ.Sequence[float] | np.ndarray, compression: float = COMPRESSION) -> 'TDigest':
+        digest = cls(compression)
+        digest.update(values)
+        return digest
+
+    @classmethod
+    def from_chunks(cls, chunks: typ.Iterable[typ.Sequence[float] | np.ndarray],
+                    compression: float = COMPRESSION) -> 'TDigest':
+        """Digest a stream of value chunks, holding one chunk and the centroids in memory at a time."""
+        digest = cls(compression)
+        for chunk in chunks:
+            digest.update(chunk)
+        return digest
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: typ.Sequence[float] | np.ndarray) -> 'TDigest':
+        """Add raw values; NaNs are ignored."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if len(values) > BUFFER_FACTOR * self.compression:
+            # Summarise a large chunk on its own first: sorting plain values is
+            # much cheaper than arg-sorting them together with the centroids.
+            self._absorb(*_summarise_sorted(np.sort(values), self.compression), summarised=True)
+        else:
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Return a new digest of both inputs' values."""
+        merged = TDigest(max(self.compression, other.compression), self.means, self.weights,
+                         min(self.min, other.min), max(self.max, other.max))
+        merged._absorb(other.means, other.weights, summarised=True)
+        return merged
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray, summarised: bool = False):
+        """
+        Add centroids. Raw values are buffered until there are too many, but
+        summarised centroids are merged straight away: interleaved centroids
+        of two summaries would otherwise blur the rank interpolation.
+        """
+        self.means = np.concatenate([self.means, means])
+        self.weights = np.concatenate([self.weights, weights])
+        if summarised or len(self.means) > BUFFER_FACTOR * self.compression:
+            self.means, self.weights = _compress(self.means, self.weights, self.compression)
+
+    def quantile(self, q: float | typ.Sequence[float]) -> float | np.ndarray:
+        """
+        Estimate the `q` quantile(s), 0 <= q <= 1; NaN for an empty digest.
+
+        Centroids sit at their mid rank and ranks in between are linearly
+        interpolated, with the exact min and max at the ends.
+        """
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if not len(self.weights):
+            result = np.full(len(q), np.nan)
+        else:
+            order = np.argsort(self.means, kind='stable')
+            means, weights = self.means[order], self.weights[order]
+            total = weights.sum()
+            # Ranks run 0..total-1, so a digest of unit centroids matches pd.Series.quantile.
+            ranks = np.cumsum(weights) - weights / 2 - 0.5
+            result = np.interp(q * (total - 1), np.r_[0.0, ranks, total - 1],
+                               np.r_[self.min, means, self.max])
+        return result[0] if scalar else result
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable form; `from_dict` restores it."""
+        return {'compression': self.compression, 'min': self.min, 'max': self.max,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TDigest':
+        return cls(data['compression'], data['means'], data['weights'], data['min'], data['max'])
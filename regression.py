@@ -0,0 +1,95 @@
+"""Batched least-squares lines and correlations from grouped sufficient statistics."""
+import logging
+import typing as typ
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A series whose spread is below this fraction of its magnitude is treated as constant.
+RELATIVE_TOLERANCE = 1e-12
+
+OK = 'ok'
+TOO_FEW_POINTS = 'too_few_points'
+CONSTANT_X = 'constant_x'
+CONSTANT_Y = 'constant_y'
+
+
+class LineFit(typ.NamedTuple):
+    """Least-squares line y = intercept + slope * x and the correlation of x and y."""
+    n: int
+    slope: float
+    intercept: float
+    r: float
+    r2: float
+    status: str
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def predict(self, x: typ.Sequence[float] | np.ndarray) -> np.ndarray:
+        return self.intercept + self.slope * np.asarray(x, dtype=float)
+
+
+def _fit_groups(codes: np.ndarray, x: np.ndarray, y: np.ndarray, groups: int) -> typ.Dict[str, np.ndarray]:
+    """
+    Fit every group's line with `np.bincount` sums, in O(n) total.
+
+    The sums of squares and cross-products are taken around each group's mean
+    (a second pass over the data), which avoids the cancellation of the
+    textbook `sum(x*x) - n*mean(x)**2` on large, tightly clustered values such
+    as token prices or timestamps.
+    """
+    n = np.bincount(codes, minlength=groups).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.bincount(codes, weights=x, minlength=groups) / n
+        mean_y = np.bincount(codes, weights=y, minlength=groups) / n
+        dx = x - mean_x[codes]
+        dy = y - mean_y[codes]
+        sxx = np.bincount(codes, weights=dx * dx, minlength=groups)
+        syy = np.bincount(codes, weights=dy * dy, minlength=groups)
+        sxy = np.bincount(codes, weights=dx * dy, minlength=groups)
+
+        constant_x = sxx <= n * (RELATIVE_TOLERANCE * np.abs(mean_x)) ** 2
+        constant_y = syy <= n * (RELATIVE_TOLERANCE * np.abs(mean_y)) ** 2
+        too_few = n < 2
+
+        slope = np.where(constant_y & ~constant_x, 0.0, sxy / sxx)
+        slope[too_few | constant_x] = np.nan
+        intercept = mean_y - slope * mean_x
+        # A single point or a vertical cloud has no line, but a constant y is still y = mean.
+        intercept[too_few & (n == 1)] = mean_y[too_few & (n == 1)]
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        r[too_few | constant_x | constant_y] = np.nan
+
+    status = np.select([too_few, constant_x, constant_y], [TOO_FEW_POINTS, CONSTANT_X, CONSTANT_Y], default=OK)
+    return {'n': n.astype(int), 'slope': slope, 'intercept': intercept, 'r': r, 'r2': r * r, 'status': status}
+
+
+def grouped_regression(df: pd.DataFrame, x: str, y: str, by: str) -> pd.DataFrame:
+    """
+    Regress `y` on `x` for every group of `by` at once.
+
+    Rows with a missing x or y are ignored. Groups with fewer than two points
+    or a constant series never raise; their status says why slope or r is NaN.
+
+    Returns:
+        pd.DataFrame: n, slope, intercept, r, r2 and status, indexed by group.
+    """
+    valid = df[[by, x, y]].dropna(subset=[x, y])
+    codes, groups = pd.factorize(valid[by], sort=False)
+    fits = _fit_groups(codes, valid[x].to_numpy(dtype=float), valid[y].to_numpy(dtype=float), len(groups))
+    return pd.DataFrame(fits, index=pd.Index(groups, name=by))
+
+
+def fit_line(x: typ.Sequence[float] | np.ndarray | pd.Series,
+             y: typ.Sequence[float] | np.ndarray | pd.Series) -> LineFit:
+    """Fit one line; the single-group case of `grouped_regression`."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    fits = _fit_groups(np.zeros(len(x), dtype=np.intp), x, y, 1)
+    return LineFit(**{key: value[0].item() for key, value in fits.items()})
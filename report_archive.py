@@ -0,0 +1,100 @@
+"""Dated report archive with content-addressed, deduplicated chart storage."""
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+import typing as typ
+from datetime import datetime, timedelta
+
+from report_writer import atomic_write
+
+logger = logging.getLogger(__name__)
+
+IMAGE_STORE = 'chart_images/store'
+ARCHIVE_DATE_FORMAT = '%d-%m-%Y'
+
+# Store names are the first 16 hex digits of the image's sha256.
+STORE_NAME_PATTERN = re.compile(r'([0-9a-f]{16})\.png')
+
+
+def archive_folder(markdown_folder: str, day: datetime | None = None) -> str:
+    """Return the dated archive folder, e.g. reports/16-06-2025."""
+    return os.path.join(markdown_folder, (day or datetime.now()).strftime(ARCHIVE_DATE_FORMAT))
+
+
+def store_image(image_path: str, store: str = IMAGE_STORE) -> str:
+    """
+    Copy `image_path` into the content-addressed store and return the stored path.
+
+    Identical charts from different runs hash to the same name, so they are
+    stored once and every archived report that shows them links to one file.
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    stored_path = os.path.join(store, f"{hashlib.sha256(data).hexdigest()[:16]}.png")
+    if not os.path.exists(stored_path):
+        atomic_write(stored_path, data)
+        logger.info(f"Stored new chart {image_path} as {stored_path}")
+    return stored_path
+
+
+def _archive_dates(markdown_folder: str) -> typ.Dict[str, datetime]:
+    """Return dated archive folders under `markdown_folder` with their dates."""
+    dates = {}
+    for path in glob.glob(os.path.join(markdown_folder, '*')):
+        if not os.path.isdir(path):
+            continue
+        try:
+            dates[path] = datetime.strptime(os.path.basename(path), ARCHIVE_DATE_FORMAT)
+        except ValueError:
+            continue
+    return dates
+
+
+def referenced_images(markdown_folder: str) -> typ.Set[str]:
+    """Return store file names referenced by any markdown file under `markdown_folder`."""
+    names = set()
+    for path in glob.glob(os.path.join(markdown_folder, '**', '*.md'), recursive=True):
+        with open(path, encoding='utf-8') as f:
+            names.update(match + '.png' for match in STORE_NAME_PATTERN.findall(f.read()))
+    return names
+
+
+def collect_garbage(markdown_folder: str, retention_days: int | None = None,
+                    store: str = IMAGE_STORE, today: datetime | None = None) -> typ.Dict[str, int]:
+    """
+    Apply the retention policy and delete chart files nothing links to.
+
+    Args:
+        markdown_folder (str): Folder holding the dated archive folders.
+        retention_days (int | None): Drop archive folders dated more than this many
+            days before today, so 0 keeps only today's; None keeps all.
+        store (str): Content-addressed image store.
+        today (datetime | None): Reference date for retention, defaults to now.
+    Returns:
+        dict: Number of removed archive folders and images.
+    Raises:
+        ValueError: If `retention_days` is negative.
+    """
+    if retention_days is not None and retention_days < 0:
+        raise ValueError(f"retention_days must be 0 or more, got {retention_days}")
+    removed_folders = 0
+    if retention_days is not None:
+        cutoff = ((today or datetime.now()) - timedelta(days=retention_days)).date()
+        for path, day in _archive_dates(markdown_folder).items():
+            if day.date() < cutoff:
+                shutil.rmtree(path)
+                removed_folders += 1
+                logger.info(f"Removed expired archive: {path}")
+
+    keep = referenced_images(markdown_folder)
+    removed_images = 0
+    for path in glob.glob(os.path.join(store, '*.png')):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+            removed_images += 1
+    if removed_images:
+        logger.info(f"Removed {removed_images} unreferenced charts from {store}")
+    return {'archives': removed_folders, 'images': removed_images}
@@ -0,0 +1,142 @@
+"""
+Report statistics computed inside Postgres, for the aggregate-only report mode.
+
+Instead of downloading every quote, one grouped query returns the key-metrics
+numbers of every token (count, mean, stddev, quartiles, min/max with their
+timestamps, correlation and trend line), and charts are drawn from a
+down-sampled series of a few hundred time buckets per token.
+"""
+import argparse
+import logging
+import typing as typ
+
+import pandas as pd
+import psycopg2
+
+from download_to_csv import INPUT_AMOUNT, database_parameters, fetch_data_and_save_to_csv
+from instrumentation import traced
+
+logger = logging.getLogger(__name__)
+
+WINDOW_HOURS = 24
+SERIES_POINTS = 500
+
+# The two series the token reports describe: the "token amount" (input_amount
+# in 18-decimal units, as md.basic_charts computes it) and the USDC return.
+TOKEN_AMOUNT = "input_amount / 1e18"
+USDC_RETURN = "output_amount_formatted"
+
+STATS_QUERY = f"""
+SELECT output_token_symbol AS symbol,
+       count(*) AS quotes,
+       min(quoted_at) AS first_at,
+       max(quoted_at) AS last_at,
+       avg({TOKEN_AMOUNT}) AS token_mean,
+       stddev_samp({TOKEN_AMOUNT}) AS token_std,
+       min({TOKEN_AMOUNT}) AS token_min,
+       percentile_cont(ARRAY[0.25, 0.5, 0.75]) WITHIN GROUP (ORDER BY {TOKEN_AMOUNT}) AS token_quartiles,
+       max({TOKEN_AMOUNT}) AS token_max,
+       avg({USDC_RETURN}) AS usdc_mean,
+       stddev_samp({USDC_RETURN}) AS usdc_std,
+       min({USDC_RETURN}) AS usdc_min,
+       percentile_cont(ARRAY[0.25, 0.5, 0.75]) WITHIN GROUP (ORDER BY {USDC_RETURN}) AS usdc_quartiles,
+       max({USDC_RETURN}) AS usdc_max,
+       (array_agg(quoted_at ORDER BY {USDC_RETURN}, quoted_at))[1] AS usdc_min_at,
+       (array_agg(quoted_at ORDER BY {USDC_RETURN} DESC, quoted_at))[1] AS usdc_max_at,
+       corr({USDC_RETURN}, {TOKEN_AMOUNT}) AS correlation,
+       regr_slope({USDC_RETURN}, extract(epoch FROM quoted_at)) AS trend_slope,
+       regr_intercept({USDC_RETURN}, extract(epoch FROM quoted_at)) AS trend_intercept
+FROM quotes
+WHERE quoted_at >= now() - %(hours)s * interval '1 hour'
+  AND input_amount = %(input_amount)s
+  AND (%(symbols)s::text[] IS NULL OR output_token_symbol = ANY(%(symbols)s::text[]))
+GROUP BY output_token_symbol
+ORDER BY output_token_symbol;
+"""
+
+# Bucket means over fixed-width time buckets, named like the raw quote columns
+# so the chart functions can read the series in place of the full download.
+SERIES_QUERY = """
+SELECT to_timestamp(floor(extract(epoch FROM quoted_at) / {step}) * {step}) AS quoted_at,
+       count(*) AS quotes,
+       avg(input_amount) AS input_amount,
+       avg(output_amount) AS output_amount,
+       avg(output_amount_formatted) AS output_amount_formatted,
+       min(output_amount_formatted) AS output_amount_formatted_min,
+       max(output_amount_formatted) AS output_amount_formatted_max,
+       avg(price_per_token) AS price_per_token
+FROM quotes
+WHERE quoted_at >= NOW() - INTERVAL '{hours} hours'
+  AND output_token_symbol = '{token_symbol}'
+  AND input_amount = {input_amount}
+GROUP BY 1
+ORDER BY 1;
+"""
+
+# Row label order of `pd.Series.describe()`, which md.render_stats_list expects.
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+@traced('stats_query', token_arg=None)
+def fetch_token_stats(symbols: typ.Sequence[str] | None = None, hours: int = WINDOW_HOURS,
+                      input_amount: int = INPUT_AMOUNT, db_params: dict = database_parameters) -> pd.DataFrame:
+    """
+    Run STATS_QUERY for `symbols` (all tokens when None) in one round trip.
+
+    Returns:
+        pd.DataFrame: One row of float statistics per token, indexed by symbol.
+    """
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(STATS_QUERY, {'hours': hours, 'input_amount': input_amount,
+                                      'symbols': list(symbols) if symbols is not None else None})
+            columns = [desc[0] for desc in cur.description]
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    stats = pd.DataFrame(rows, columns=columns).set_index('symbol')
+    for prefix in ('token', 'usdc'):
+        quartiles = pd.DataFrame(stats.pop(f'{prefix}_quartiles').tolist(), index=stats.index,
+                                 columns=[f'{prefix}_25%', f'{prefix}_50%', f'{prefix}_75%'])
+        stats = stats.join(quartiles)
+    timestamps = ['first_at', 'last_at', 'usdc_min_at', 'usdc_max_at']
+    numeric = stats.columns.difference(timestamps)
+    # numeric columns come back as Decimal
+    stats[numeric] = stats[numeric].astype(float)
+    stats['quotes'] = stats['quotes'].astype(int)
+    return stats
+
+
+def describe(stats: pd.Series, prefix: str) -> pd.Series:
+    """Reshape one token's `prefix` ('token' or 'usdc') statistics like `pd.Series.describe()`."""
+    values = [stats['quotes']] + [stats[f'{prefix}_{label}'] for label in DESCRIBE_INDEX[1:]]
+    return pd.Series(values, index=DESCRIBE_INDEX, dtype=float)
+
+
+@traced('download_series', token_arg='token_symbol')
+def download_series_csv(token_symbol: str, points: int = SERIES_POINTS, hours: int = WINDOW_HOURS,
+                        input_amount: int = INPUT_AMOUNT) -> str:
+    """Download `points` time-bucket means of one token to series_<token>.csv for charting."""
+    step = max(1, hours * 3600 // points)
+    query = SERIES_QUERY.format(step=step, hours=int(hours), token_symbol=token_symbol,
+                                input_amount=int(input_amount))
+    output_csv_file = f"series_{token_symbol}.csv"
+    fetch_data_and_save_to_csv(database_parameters, query, output_csv_file)
+    return output_csv_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Print per-token report statistics computed in the database.")
+    parser.add_argument('--hours', type=int, default=WINDOW_HOURS, help="window length (default: %(default)s)")
+    parser.add_argument('tokens', nargs='*', help="tokens to include (default: all)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stats = fetch_token_stats(args.tokens or None, hours=args.hours)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(stats[['quotes', 'usdc_mean', 'usdc_std', 'usdc_min', 'usdc_min_at', 'usdc_max', 'usdc_max_at',
+                     'correlation', 'trend_slope']])
@@ -0,0 +1,113 @@
+"""Atomic, incremental writer that only rewrites reports whose content changed."""
+import hashlib
+import json
+import logging
+import os
+import re
+import stat
+import tempfile
+import typing as typ
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'report_manifest.json'
+
+# The process umask, read once: os.umask can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Lines that change on every run without the report itself changing.
+VOLATILE_PATTERNS = [
+    re.compile(r'^Generated on: .*$', re.MULTILINE),
+    re.compile(r'^\*Analysis completed on .*$', re.MULTILINE),
+    re.compile(r'^\*Updated: .*$', re.MULTILINE),
+]
+
+
+def stable_content(content: str) -> str:
+    """Return `content` with volatile lines (timestamps) blanked out."""
+    for pattern in VOLATILE_PATTERNS:
+        content = pattern.sub('', content)
+    return content
+
+
+def content_hash(content: str | bytes) -> str:
+    """Return the sha256 of `content`, ignoring volatile lines in text."""
+    if isinstance(content, str):
+        content = stable_content(content).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_mode(path: str) -> int:
+    """Permissions for a new version of `path`: the existing file's, or what a plain open() would give."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path: str, content: str | bytes):
+    """
+    Write `content` to a temp file next to `path` and rename it into place.
+
+    mkstemp creates the temp file as 0600; it gets `file_mode(path)` before
+    the rename, so reports stay readable by whoever could read them before.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), file_mode(path))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class ReportWriter:
+    """
+    Write reports only when their stable content changed.
+
+    Each write is recorded as 'created', 'updated' or 'unchanged' so a run
+    can report, and save as a manifest, exactly which files it touched.
+    """
+
+    def __init__(self):
+        self.changes: typ.Dict[str, typ.Dict[str, str]] = {}
+
+    def write(self, path: str, content: str | bytes) -> str:
+        """Write `content` to `path` unless it matches what is already there."""
+        new_hash = content_hash(content)
+        status = 'created'
+        if os.path.exists(path):
+            mode, encoding = ('r', 'utf-8') if isinstance(content, str) else ('rb', None)
+            with open(path, mode, encoding=encoding) as f:
+                status = 'unchanged' if content_hash(f.read()) == new_hash else 'updated'
+
+        if status != 'unchanged':
+            atomic_write(path, content)
+        self.changes[path] = {'status': status, 'sha256': new_hash}
+        logger.info(f"{status}: {path}")
+        return status
+
+    def changed_paths(self) -> typ.List[str]:
+        """Return the paths created or updated by this writer."""
+        return [path for path, change in self.changes.items() if change['status'] != 'unchanged']
+
+    def summary(self) -> typ.Dict[str, int]:
+        """Return the number of files per status."""
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        for change in self.changes.values():
+            counts[change['status']] += 1
+        return counts
+
+    def save_manifest(self, manifest_file: str = MANIFEST_FILE) -> str:
+        """Save the per-file statuses and hashes of this run as JSON."""
+        manifest = {'summary': self.summary(), 'files': self.changes}
+        atomic_write(manifest_file, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        return manifest_file
@@ -0,0 +1,89 @@
+"""Vectorized risk/reward scoring of arbitrage opportunities."""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from markdown_templates import render_table
+
+logger = logging.getLogger(__name__)
+
+HIGH_REWARD_PERCENT = 5.0
+MODERATE_RISK = 0.15
+
+# Position sizing: 10% of available liquidity, between $100 and $1000.
+LIQUIDITY_FRACTION = 0.1
+MIN_POSITION_SIZE = 100
+MAX_POSITION_SIZE = 1000
+
+
+def optimal_position_size(available_liquidity: np.ndarray | pd.Series) -> np.ndarray:
+    """
+    Vectorized `calculate_optimal_size`: 10% of liquidity, clamped to $100-$1000.
+
+    Unknown (NaN) liquidity gives a NaN size rather than the $100 floor.
+    """
+    max_size = np.asarray(available_liquidity, dtype=float) * LIQUIDITY_FRACTION
+    return np.maximum(MIN_POSITION_SIZE, np.minimum(max_size, MAX_POSITION_SIZE))
+
+
+def risk_reward_scores(df: pd.DataFrame, arb_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score every arbitrage opportunity at once.
+
+    Args:
+        df (pd.DataFrame): Quotes with symbol and output_amount_formatted.
+        arb_df (pd.DataFrame): `arbitrage_opportunities` output with token and spread_percent.
+    Returns:
+        pd.DataFrame: token, liquidity, risk_proxy (inverse log liquidity), reward (spread %),
+            position_size and quadrant, in the order of `arb_df`. Tokens without
+            quoted amounts have NaN liquidity, risk_proxy and position_size and
+            count as high risk.
+    """
+    liquidity = df.groupby('symbol', observed=True)['output_amount_formatted'].mean()
+    liquidity.index = liquidity.index.astype(str)
+    scores = pd.DataFrame({
+        'token': arb_df['token'].astype(str).to_numpy(),
+        'liquidity': liquidity.reindex(arb_df['token'].astype(str)).to_numpy(),
+        'reward': arb_df['spread_percent'].to_numpy(),
+    })
+    unknown = scores['liquidity'].isna()
+    if unknown.any():
+        logger.warning(f"No liquidity for {', '.join(scores.loc[unknown, 'token'])}; position size left unset")
+    # Higher liquidity = lower risk
+    scores['risk_proxy'] = 1 / np.log10(scores['liquidity'] + 1)
+    scores['position_size'] = optimal_position_size(scores['liquidity'])
+
+    high_reward = scores['reward'] > HIGH_REWARD_PERCENT
+    low_risk = scores['risk_proxy'] <= MODERATE_RISK
+    scores['quadrant'] = np.select(
+        [high_reward & low_risk, high_reward, low_risk],
+        ['High Reward, Low Risk', 'High Reward, High Risk', 'Low Reward, Low Risk'],
+        default='Low Reward, High Risk',
+    )
+    return scores
+
+
+def risk_table(scores: pd.DataFrame, optimal: pd.DataFrame | None = None) -> str:
+    """
+    Markdown table of `risk_reward_scores`; unknown risk and position sizes show as n/a.
+
+    With `optimal` (`price_impact.PriceImpactCurves.optimal_sizes()`), every
+    token also gets the size and expected profit from its price-impact curves;
+    tokens without a quote ladder show n/a there.
+    """
+    columns = [
+        ('Token', scores['token'], '**{}**'),
+        ('Risk Proxy', scores['risk_proxy'], '{:.3f}'),
+        ('Spread', scores['reward'], '{:.2f}%'),
+        ('Position Size', scores['position_size'], '${:,.0f}'),
+        ('Quadrant', scores['quadrant'], '{}'),
+    ]
+    if optimal is not None:
+        optimal = optimal.reindex(scores['token'])
+        columns += [
+            ('Impact-Optimal Size', optimal['optimal_usdc'], '${:,.0f}'),
+            ('Round-trip Impact', optimal['impact_bps'], '{:.1f} bps'),
+            ('Expected Profit', optimal['expected_profit_usdc'], '${:,.2f}'),
+        ]
+    return render_table(columns)
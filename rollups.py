@@ -0,0 +1,212 @@
+"""
+Hourly quote rollups in Postgres: incremental refresh and the read API for long windows.
+
+quote_rollups_hourly (migrations/002_hourly_rollups.sql) holds one row per
+token_id, exchange, quote type and hour; readers join `tokens` for the symbol,
+since SELL quotes carry USDC as their output_token_symbol. `refresh_rollups` folds in only quotes
+above the stored id watermark, in id-ordered batches, so a refresh costs
+O(new quotes) however long the history is. Reports covering more than a day
+read these rows instead of raw quotes:
+
+    python rollups.py --refresh            # after ingestion, e.g. from cron
+    python rollups.py --days 7             # per-token summary of the last week
+"""
+import argparse
+import logging
+import typing as typ
+
+import pandas as pd
+import psycopg2
+
+from download_to_csv import database_parameters
+from instrumentation import traced
+from ohlc import token_bars
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'quote_rollups_hourly'
+REFRESH_BATCH = 500_000
+
+LOCK_WATERMARK = "SELECT last_id FROM rollup_watermarks WHERE name = %(name)s FOR UPDATE;"
+
+# Upper id of the next batch; ids may have gaps, so it is read rather than added.
+NEXT_BATCH_END = """
+SELECT max(id) FROM (
+    SELECT id FROM quotes WHERE id > %(last_id)s ORDER BY id LIMIT %(batch)s
+) AS batch;
+"""
+
+# Aggregate one id range and merge it into existing hours: counts and sums add,
+# high/low widen, and open/close come from whichever side holds the earlier/later quote.
+REFRESH_QUERY = f"""
+INSERT INTO {ROLLUP_TABLE} AS r (token_id, exchange_id, quote_type, hour, open, high, low, close,
+                                 open_at, close_at, quotes, price_sum, output_sum, output_sumsq, last_id)
+SELECT token_id, exchange_id, quote_type, date_trunc('hour', quoted_at),
+       (array_agg(price_per_token ORDER BY quoted_at, id))[1],
+       max(price_per_token), min(price_per_token),
+       (array_agg(price_per_token ORDER BY quoted_at DESC, id DESC))[1],
+       min(quoted_at), max(quoted_at), count(*), sum(price_per_token),
+       sum(output_amount_formatted), sum(output_amount_formatted * output_amount_formatted), max(id)
+FROM quotes
+WHERE id > %(last_id)s AND id <= %(end_id)s
+  AND price_per_token > 0 AND token_id IS NOT NULL
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (token_id, exchange_id, quote_type, hour) DO UPDATE SET
+    open = CASE WHEN EXCLUDED.open_at < r.open_at THEN EXCLUDED.open ELSE r.open END,
+    open_at = LEAST(r.open_at, EXCLUDED.open_at),
+    close = CASE WHEN EXCLUDED.close_at >= r.close_at THEN EXCLUDED.close ELSE r.close END,
+    close_at = GREATEST(r.close_at, EXCLUDED.close_at),
+    high = GREATEST(r.high, EXCLUDED.high),
+    low = LEAST(r.low, EXCLUDED.low),
+    quotes = r.quotes + EXCLUDED.quotes,
+    price_sum = r.price_sum + EXCLUDED.price_sum,
+    output_sum = r.output_sum + EXCLUDED.output_sum,
+    output_sumsq = r.output_sumsq + EXCLUDED.output_sumsq,
+    last_id = GREATEST(r.last_id, EXCLUDED.last_id);
+"""
+
+SAVE_WATERMARK = """
+UPDATE rollup_watermarks SET last_id = %(end_id)s, refreshed_at = now() WHERE name = %(name)s;
+"""
+
+READ_QUERY = f"""
+SELECT t.symbol, r.exchange_id, r.quote_type, r.hour, r.open, r.high, r.low, r.close, r.open_at, r.close_at,
+       r.quotes, r.price_sum, r.last_id
+FROM {ROLLUP_TABLE} r
+JOIN tokens t ON t.id = r.token_id
+WHERE r.hour >= date_trunc('hour', now() - %(days)s * interval '1 day')
+  AND (%(symbols)s::text[] IS NULL OR t.symbol = ANY(%(symbols)s::text[]))
+ORDER BY t.symbol, r.hour;
+"""
+
+# Window statistics of output_amount_formatted from the stored sums, computed
+# in numeric so the variance does not lose precision to cancellation. Only BUY
+# rows output the token itself; a SELL quote's output is USDC.
+OUTPUT_STATS_QUERY = f"""
+SELECT t.symbol, sum(r.quotes) AS quotes, min(r.open_at) AS first_at, max(r.close_at) AS last_at,
+       sum(r.output_sum) / sum(r.quotes) AS output_mean,
+       CASE WHEN sum(r.quotes) > 1 THEN
+           sqrt(greatest(sum(r.output_sumsq) - sum(r.output_sum) ^ 2 / sum(r.quotes), 0) / (sum(r.quotes) - 1))
+       END AS output_std
+FROM {ROLLUP_TABLE} r
+JOIN tokens t ON t.id = r.token_id
+WHERE r.hour >= date_trunc('hour', now() - %(days)s * interval '1 day')
+  AND r.quote_type = 'BUY'
+  AND (%(symbols)s::text[] IS NULL OR t.symbol = ANY(%(symbols)s::text[]))
+GROUP BY t.symbol
+ORDER BY t.symbol;
+"""
+
+
+@traced('rollup_refresh', token_arg=None)
+def refresh_rollups(db_params: dict = database_parameters, batch: int = REFRESH_BATCH) -> int:
+    """
+    Fold quotes added since the last refresh into the hourly rollups.
+
+    Each batch is one transaction that locks the watermark row, so concurrent
+    refreshes serialize instead of double counting, and an interrupted
+    refresh resumes from the last committed batch.
+
+    Returns:
+        int: The number of rollup rows inserted or updated.
+    """
+    conn = psycopg2.connect(**db_params)
+    touched = 0
+    try:
+        while True:
+            with conn, conn.cursor() as cur:
+                params = {'name': ROLLUP_TABLE, 'batch': batch}
+                cur.execute(LOCK_WATERMARK, params)
+                params['last_id'] = cur.fetchone()[0]
+                cur.execute(NEXT_BATCH_END, params)
+                params['end_id'] = cur.fetchone()[0]
+                if params['end_id'] is None:
+                    break
+                cur.execute(REFRESH_QUERY, params)
+                touched += cur.rowcount
+                cur.execute(SAVE_WATERMARK, params)
+            logger.info(f"Rolled up quotes {params['last_id'] + 1}..{params['end_id']}")
+    finally:
+        conn.close()
+    return touched
+
+
+def _read(query: str, days: float, symbols: typ.Sequence[str] | None, db_params: dict) -> pd.DataFrame:
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, {'days': days, 'symbols': list(symbols) if symbols is not None else None})
+            columns = [desc[0] for desc in cur.description]
+            return pd.DataFrame(cur.fetchall(), columns=columns)
+    finally:
+        conn.close()
+
+
+@traced('rollup_read', token_arg=None)
+def fetch_rollups(days: float, symbols: typ.Sequence[str] | None = None,
+                  db_params: dict = database_parameters) -> pd.DataFrame:
+    """Read the hourly rollup rows of the last `days` days."""
+    rollups = _read(READ_QUERY, days, symbols, db_params)
+    for column in ('open', 'high', 'low', 'close', 'price_sum'):
+        rollups[column] = rollups[column].astype(float)
+    return rollups
+
+
+def rollup_bars(rollups: pd.DataFrame, interval: str | None = None) -> pd.DataFrame:
+    """
+    Turn rollup rows into `ohlc.token_bars` output, optionally at a coarser `interval`.
+
+    Each (exchange, quote type) pair is treated as its own venue, so the bar
+    spread includes the gap between buy and sell quotes.
+    """
+    if rollups.empty:
+        return pd.DataFrame()
+    bars = pd.DataFrame({
+        'token': rollups['symbol'],
+        'exchange_id': rollups['exchange_id'].astype(str) + '-' + rollups['quote_type'],
+        'bar_start': pd.to_datetime(rollups['hour'], utc=True),
+        'open': rollups['open'], 'high': rollups['high'], 'low': rollups['low'], 'close': rollups['close'],
+        'quotes': rollups['quotes'].astype(int), 'price_sum': rollups['price_sum'],
+        'first_at': pd.to_datetime(rollups['open_at'], utc=True),
+        'last_at': pd.to_datetime(rollups['close_at'], utc=True),
+        'last_id': rollups['last_id'],
+    })
+    return token_bars(bars, interval=interval)
+
+
+def window_bars(days: float, symbols: typ.Sequence[str] | None = None, interval: str | None = None,
+                db_params: dict = database_parameters) -> pd.DataFrame:
+    """Token OHLC bars of the last `days` days from the rollups; the entry point for long reports."""
+    return rollup_bars(fetch_rollups(days, symbols, db_params), interval=interval)
+
+
+def output_stats(days: float, symbols: typ.Sequence[str] | None = None,
+                 db_params: dict = database_parameters) -> pd.DataFrame:
+    """Quote count, first/last quote and mean/std of output_amount_formatted per token's BUY quotes over `days` days."""
+    stats = _read(OUTPUT_STATS_QUERY, days, symbols, db_params).set_index('symbol')
+    for column in ('output_mean', 'output_std'):
+        stats[column] = stats[column].astype(float)
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Refresh and summarize the hourly quote rollups.")
+    parser.add_argument('--refresh', action='store_true', help="fold quotes added since the last refresh")
+    parser.add_argument('--days', type=float, default=7, help="summary window in days (default: %(default)s)")
+    parser.add_argument('--batch', type=int, default=REFRESH_BATCH,
+                        help="quotes per refresh transaction (default: %(default)s)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.refresh:
+        print(f"🔄 Updated {refresh_rollups(batch=args.batch):,} rollup rows")
+    daily = window_bars(args.days, interval='1D')
+    summary = daily.groupby(level='token').agg(open=('open', 'first'), close=('close', 'last'),
+                                               high=('high', 'max'), low=('low', 'min'),
+                                               max_spread_bps=('spread_bps', 'max'))
+    summary = summary.join(output_stats(args.days))
+    summary['change_percent'] = (summary['close'] / summary['open'] - 1) * 100
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
@@ -0,0 +1,152 @@
+"""
+Checkpoint journal that lets an interrupted report run resume where it stopped.
+
+Every token's completed stages (downloaded, charted, reported) are written to
+run_journal.json as soon as they finish, with sha256 fingerprints of the
+files each stage read and wrote. A rerun with `--resume` and the same
+settings skips any stage whose inputs and outputs still match their
+fingerprints, so a run that died on token 300 of 400 does not download and
+chart the first 299 again. A stage whose input changed (say, a re-downloaded
+CSV) is redone, and so is every stage after it, because its recorded input
+no longer matches.
+
+A run that reaches its end is finished even when some tokens failed; the
+failed tokens are recorded, and resuming a finished run retries only them,
+from a fresh download. Runs without `--resume` always start a new journal.
+"""
+import hashlib
+import json
+import logging
+import os
+import typing as typ
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+from report_writer import atomic_write
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'run_journal.json'
+STAGES = ('downloaded', 'charted', 'reported')
+# An unfinished run older than this is not resumed: its downloads cover a stale window.
+MAX_AGE_HOURS = float(os.getenv("RUN_JOURNAL_MAX_AGE_HOURS", 6))
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str | None:
+    """sha256 of a file's bytes, or None when it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprints(paths: typ.Iterable[str]) -> typ.Dict[str, str | None]:
+    return {path: file_fingerprint(path) for path in paths}
+
+
+class RunJournal:
+    """
+    Per-token stage checkpoints of one report run, saved after every stage.
+
+    `settings` are the run's parameters; with `resume`, a journal is picked
+    up by a run with the same settings that starts within `max_age_hours` of
+    it, if it was interrupted or finished with failed tokens.
+    """
+
+    def __init__(self, settings: dict, path: str = JOURNAL_FILE, resume: bool = False,
+                 max_age_hours: float = MAX_AGE_HOURS):
+        self.path = path
+        self.settings = settings
+        self.resumed = False
+        previous = self._load() if resume else None
+        if previous and self._resumable(previous, max_age_hours):
+            self.started_at, self.tokens = previous['started_at'], previous['tokens']
+            # token -> error of the tokens that failed and have not been reported since
+            self.failed: typ.Dict[str, str] = previous.get('failed', {})
+            self.resumed = True
+            if previous.get('finished_at'):
+                print(f"♻️  Retrying {len(self.failed)} tokens that failed in the run started at {self.started_at}: "
+                      f"{', '.join(self.failed)}")
+            else:
+                print(f"♻️  Resuming run started at {self.started_at}: "
+                      f"{len(self.completed('reported'))} of {len(self.tokens)} tokens already reported")
+        else:
+            if resume:
+                print("Nothing to resume; starting a new run")
+            self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self.tokens: typ.Dict[str, typ.Dict[str, dict]] = {}
+            self.failed = {}
+        self.finished_at = None
+        self._save()
+
+    def _load(self) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as error:
+            logger.warning(f"Ignoring unreadable run journal {self.path}: {error}")
+            return None
+
+    def _resumable(self, previous: dict, max_age_hours: float) -> bool:
+        if previous.get('settings') != self.settings:
+            return False
+        if previous.get('finished_at') and not previous.get('failed'):
+            return False
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(previous['started_at'])
+        return age <= timedelta(hours=max_age_hours)
+
+    def _save(self):
+        journal = {'settings': self.settings, 'started_at': self.started_at, 'finished_at': self.finished_at,
+                   'tokens': self.tokens, 'failed': self.failed}
+        atomic_write(self.path, json.dumps(journal, indent=2) + '\n')
+
+    def is_done(self, token: str, stage: str, inputs: typ.Sequence[str] = ()) -> bool:
+        """
+        Whether `stage` already completed for `token` on the current `inputs`.
+
+        The recorded input fingerprints must match the files as they are now,
+        and the stage's outputs must still be on disk unchanged.
+        """
+        record = self.tokens.get(token, {}).get(stage)
+        if record is None:
+            return False
+        if record['inputs'] != fingerprints(inputs):
+            return False
+        return all(fingerprint is not None and file_fingerprint(path) == fingerprint
+                   for path, fingerprint in record['outputs'].items())
+
+    def complete(self, token: str, stage: str, inputs: typ.Sequence[str] = (), outputs: typ.Sequence[str] = ()):
+        """Record `stage` as done for `token` and save the journal; later stages are invalidated."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r}, expected one of {STAGES}")
+        stages = self.tokens.setdefault(token, {})
+        for later in STAGES[STAGES.index(stage) + 1:]:
+            stages.pop(later, None)
+        stages[stage] = {'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                         'inputs': fingerprints(inputs), 'outputs': fingerprints(outputs)}
+        if stage == STAGES[-1]:
+            self.failed.pop(token, None)
+        self._save()
+
+    def fail(self, token: str, error: str):
+        """Record `token` as failed; its stages are dropped, so a retry starts with a fresh download."""
+        self.tokens.pop(token, None)
+        self.failed[token] = error
+        self._save()
+
+    def completed(self, stage: str) -> typ.List[str]:
+        """Tokens that completed `stage`, in the order they were first journaled."""
+        return [token for token, stages in self.tokens.items() if stage in stages]
+
+    def finish(self):
+        """Mark the run finished; only its failed tokens are left to resume."""
+        self.finished_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._save()
@@ -0,0 +1,117 @@
+"""
+Accuracy and speed of the t-digest quantile sketch against exact quantiles.
+
+Generates synthetic values (10 million by default) from a few distributions
+shaped like quote data, streams them through `TDigest` in chunks, and
+compares the sketch's percentiles with `np.quantile` over the full array.
+Accuracy is measured as rank error: how far, as a fraction of all values,
+the estimate's true rank is from the requested quantile. A run fails when a
+rank error exceeds the tolerance for its compression, or when serializing
+and merging per-chunk sketches changes the answer by more than that:
+
+    python sketch_benchmark.py
+    python sketch_benchmark.py --values 1000000 --compression 50 100 200
+"""
+import argparse
+import logging
+import time
+import typing as typ
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import TDigest
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999)
+# Allowed rank error, as a multiple of 1/compression.
+TOLERANCE = 0.5
+
+DISTRIBUTIONS: typ.Dict[str, typ.Callable[[np.random.Generator, int], np.ndarray]] = {
+    # USDC returns: tightly clustered around a level
+    'normal': lambda rng, n: rng.normal(5_000, 150, n),
+    # Prices across tokens: many orders of magnitude
+    'lognormal': lambda rng, n: rng.lognormal(0, 3, n),
+    # A feed that jumps between two levels, with mostly repeated quotes
+    'bimodal': lambda rng, n: np.round(np.where(rng.random(n) < 0.7, rng.normal(100, 1, n),
+                                                rng.normal(130, 2, n)), 2),
+}
+
+
+def rank_errors(sorted_values: np.ndarray, estimates: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    """Distance between each estimate's rank range in `sorted_values` and its target quantile."""
+    n = len(sorted_values)
+    low = np.searchsorted(sorted_values, estimates, side='left') / n
+    high = np.searchsorted(sorted_values, estimates, side='right') / n
+    # With repeated values any rank inside [low, high] is exact
+    return np.maximum(0, np.maximum(low - quantiles, quantiles - high))
+
+
+def check_distribution(name: str, values: np.ndarray, compression: float, chunksize: int) -> dict:
+    """Time exact and sketched quantiles of `values` and check the sketch's rank error."""
+    quantiles = np.array(QUANTILES)
+    start = time.perf_counter()
+    exact = np.quantile(values, quantiles)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    digest = TDigest.from_chunks((values[i:i + chunksize] for i in range(0, len(values), chunksize)),
+                                 compression)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    estimates = digest.quantile(quantiles)
+    query_time = time.perf_counter() - start
+
+    # Persist one sketch per chunk and merge the restored copies, as daily partials are.
+    merged = TDigest(compression)
+    for i in range(0, len(values), chunksize * 10):
+        part = TDigest.from_values(values[i:i + chunksize * 10], compression)
+        merged = merged.merge(TDigest.from_dict(part.to_dict()))
+
+    sorted_values = np.sort(values)
+    errors = rank_errors(sorted_values, estimates, quantiles)
+    merged_errors = rank_errors(sorted_values, merged.quantile(quantiles), quantiles)
+    tolerance = TOLERANCE / compression
+    assert errors.max() <= tolerance, f"{name}: rank error {errors.max():.5f} > {tolerance:.5f}"
+    assert merged_errors.max() <= tolerance, f"{name}: merged rank error {merged_errors.max():.5f} > {tolerance:.5f}"
+    assert digest.count == len(values) and merged.count == len(values)
+
+    worst = int(errors.argmax())
+    return {'distribution': name, 'compression': compression, 'centroids': len(digest.means),
+            'max_rank_error': errors.max(), 'merged_rank_error': merged_errors.max(),
+            'worst_quantile': QUANTILES[worst],
+            'relative_error': abs(estimates[worst] - exact[worst]) / abs(exact[worst]),
+            'exact_s': exact_time, 'sketch_build_s': build_time, 'sketch_query_s': query_time}
+
+
+def run(values: int, compressions: typ.Sequence[float], chunksize: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name, generate in DISTRIBUTIONS.items():
+        data = generate(rng, values)
+        for compression in compressions:
+            rows.append(check_distribution(name, data, compression, chunksize))
+            print(f"  {name:<10} compression {compression:>5g}: max rank error {rows[-1]['max_rank_error']:.5f}, "
+                  f"build {rows[-1]['sketch_build_s']:.2f}s vs exact {rows[-1]['exact_s']:.2f}s")
+    return pd.DataFrame(rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check t-digest percentiles against exact quantiles.")
+    parser.add_argument('--values', type=int, default=10_000_000, help="values per distribution (default: %(default)s)")
+    parser.add_argument('--compression', type=float, nargs='+', default=[50, 100, 200],
+                        help="sketch compressions to test (default: %(default)s)")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="values streamed into the sketch at a time (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"📊 {args.values:,} values per distribution, chunks of {args.chunksize:,}")
+    results = run(args.values, args.compression, args.chunksize, args.seed)
+    with pd.option_context('display.max_columns', None, 'display.width', 200, 'display.float_format', '{:.6g}'.format):
+        print(results.to_string(index=False))
+    print(f"\n✅ All sketches within {TOLERANCE:g}/compression rank error")
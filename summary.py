@@ -7,6 +7,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import warnings
+
+from data_loader import load_arbitrage_csv
+
 warnings.filterwarnings('ignore')
 
 # Set style for better looking plots
@@ -14,7 +17,7 @@ plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
 # Read the CSV data
-df = pd.read_csv('db_arbitrage.csv')
+df = load_arbitrage_csv()
 
 print("=== ARBITRAGE OPPORTUNITIES ANALYSIS ===")
 print(f"Dataset: {len(df)} records from Base L2 chain")
@@ -168,7 +171,7 @@ axes[0,1].set_xscale('log')
 axes[0,1].set_yscale('log')
 
 # 3.3 Exchange Price Comparison
-exchange_prices = df.groupby(['symbol', 'exchange_name'])['price_per_token'].mean().unstack()
+exchange_prices = df.groupby(['symbol', 'exchange_name'], observed=True)['price_per_token'].mean().unstack()
 exchange_prices.plot(kind='bar', ax=axes[1,0], color=['#3498db', '#e74c3c'])
 axes[1,0].set_title('Average Price by Token and Exchange')
 axes[1,0].set_ylabel('Average Price ($)')
@@ -196,7 +199,7 @@ fig, axes = plt.subplots(2, 2, figsize=(15, 12))
 fig.suptitle('Exchange Comparison Analysis', fontsize=16, fontweight='bold')
 
 # 4.1 Average Metrics by Exchange
-exchange_stats = df.groupby('exchange_name').agg({
+exchange_stats = df.groupby('exchange_name', observed=True).agg({
     'price_per_token': 'mean',
     'output_amount_formatted': 'mean',
     'slippage_limit_percent': 'mean'
@@ -298,10 +301,10 @@ print("\nOverall Statistics:")
 print(df[numeric_cols].describe())
 
 print("\nExchange Comparison:")
-print(df.groupby('exchange_name')[numeric_cols].mean())
+print(df.groupby('exchange_name', observed=True)[numeric_cols].mean())
 
 print("\nToken Statistics:")
-print(df.groupby('symbol')[numeric_cols].mean())
+print(df.groupby('symbol', observed=True)[numeric_cols].mean())
 
 # ==============================================================================
 # 8. RISK-REWARD ANALYSIS
@@ -0,0 +1,147 @@
+"""Synthetic quote data shaped like the database extracts, for benchmarks without a database."""
+import os
+import typing as typ
+
+import numpy as np
+import pandas as pd
+
+TOKENS = ['uSHIB', 'uDOGE', 'uSEI', 'uBTC', 'uAPT', 'uLINK', 'uSOL', 'uXRP',
+          'uADA', 'uNEAR', 'uPEPE', 'uBERA', 'USUI']
+EXCHANGES = ['KyberSwap', 'Universal Assets']
+
+QUOTES_COLUMNS = ['id', 'token_id', 'exchange_id', 'quote_type', 'input_token_symbol', 'input_amount',
+                  'output_token_symbol', 'output_amount', 'output_amount_formatted', 'slippage_limit_percent',
+                  'price_per_token', 'user_address', 'chain_id', 'quoted_at', 'expires_at', 'is_valid']
+
+START = pd.Timestamp('2025-06-09 05:00:00', tz='UTC')
+USER_ADDRESS = '0xaf603d15a42A7f9598f32B2452836d48F143bF67'
+BASE_CHAIN_ID = 8453
+
+
+def token_names(count: int) -> typ.List[str]:
+    """Return `count` token symbols, the real ones first, then uTOK14, uTOK15, ..."""
+    return (TOKENS + [f"uTOK{i + 1}" for i in range(len(TOKENS), count)])[:count]
+
+
+def exchange_names(count: int) -> typ.List[str]:
+    """Return `count` exchange names, the real ones first, then 'Exchange 3', ..."""
+    return (EXCHANGES + [f"Exchange {i + 1}" for i in range(len(EXCHANGES), count)])[:count]
+
+
+def _base_prices(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Token prices spread over the same orders of magnitude as the real ones."""
+    return 10 ** rng.uniform(-5, 5, count)
+
+
+def _quote_times(rows: int, rng: np.random.Generator, hours: float) -> pd.DatetimeIndex:
+    offsets = np.sort(rng.integers(0, int(hours * 3600 * 10**6), rows))
+    return START + pd.to_timedelta(offsets, unit='us')
+
+
+def make_quotes_frame(token: str, rows: int = 2_000, exchanges: int = 2, seed: int = 0,
+                      hours: float = 24, base_price: float | None = None, token_id: int = 1,
+                      input_amounts: typ.Sequence[int] = (1_000_000_000,),
+                      sell_legs: bool = False) -> pd.DataFrame:
+    """
+    Return a `quotes_<token>.csv`-shaped frame of USDC quotes over `hours`.
+
+    Prices follow a random walk per exchange with a small fixed offset between
+    exchanges, so spreads, trends and correlations are all non-trivial. Each
+    row quotes one of `input_amounts` (USDC with 6 decimals); larger sizes get
+    a worse price, as from a constant-product pool with a random USDC reserve
+    per exchange. With `sell_legs`, SELL rows are shaped like real SELL quotes,
+    as in a `ladder_<token>.csv`: the token goes in and `input_amounts` USDC
+    comes out, at a price that falls with the size.
+    """
+    rng = np.random.default_rng(seed)
+    base_price = base_price if base_price is not None else _base_prices(1, rng)[0]
+    exchange_id = rng.integers(0, exchanges, rows)
+    input_amount = np.asarray(input_amounts, dtype='int64')[rng.integers(0, len(input_amounts), rows)]
+    input_usdc = input_amount / 10**6
+    reserve_usdc = 10 ** rng.uniform(5, 7, exchanges)
+    walk = np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    offset = 1 + rng.normal(0, 0.01, exchanges)
+    sell = (exchange_id % 2 == 0) & sell_legs
+    impact = np.where(sell, -1, 1) * input_usdc / reserve_usdc[exchange_id]
+    price = base_price * walk * offset[exchange_id] * (1 + impact)
+    output_amount_formatted = (input_usdc / price).round(8)
+    frame = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'token_id': token_id,
+        'exchange_id': exchange_id + 1,
+        'quote_type': np.where(exchange_id % 2, 'BUY', 'SELL'),
+        'input_token_symbol': 'USDC',
+        'input_amount': input_amount,
+        'output_token_symbol': token,
+        'output_amount': (output_amount_formatted * 1e18).round(),
+        'output_amount_formatted': output_amount_formatted,
+        'slippage_limit_percent': np.where(exchange_id % 2, 0.2, 0.5),
+        'price_per_token': price.round(8),
+        'user_address': USER_ADDRESS,
+        'chain_id': BASE_CHAIN_ID,
+        'quoted_at': _quote_times(rows, rng, hours),
+        'expires_at': None,
+        'is_valid': True,
+    }, columns=QUOTES_COLUMNS)
+    if sell_legs:
+        # Token amounts in 18 decimals overflow int64, so SELL inputs are stored like outputs, as floats
+        frame['input_amount'] = np.where(sell, frame['output_amount'], input_amount.astype(float))
+        frame['output_amount'] = np.where(sell, input_amount, frame['output_amount'])
+        frame['output_amount_formatted'] = np.where(sell, input_usdc, output_amount_formatted)
+        frame['input_token_symbol'] = np.where(sell, token, 'USDC')
+        frame['output_token_symbol'] = np.where(sell, 'USDC', token)
+    return frame
+
+
+def write_quotes_csvs(folder: str = '.', tokens: int = 13, rows: int = 2_000, exchanges: int = 2,
+                      seed: int = 0, input_amounts: typ.Sequence[int] = (1_000_000_000,),
+                      prefix: str = 'quotes', sell_legs: bool = False) -> typ.Dict[str, str]:
+    """
+    Write one `<prefix>_<token>.csv` per synthetic token, e.g. prefix='ladder' with a size ladder and sell_legs.
+
+    Returns:
+        dict: Token symbol -> CSV path.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {}
+    for index, (token, base_price) in enumerate(zip(token_names(tokens), _base_prices(tokens, rng))):
+        path = os.path.join(folder, f"{prefix}_{token}.csv")
+        make_quotes_frame(token, rows, exchanges, seed=seed + index, base_price=base_price,
+                          token_id=index + 1, input_amounts=input_amounts,
+                          sell_legs=sell_legs).to_csv(path, index=False)
+        paths[token] = path
+    return paths
+
+
+def make_arbitrage_frame(rows: int = 1_000_000, tokens: int = 13, exchanges: int = 2, seed: int = 0,
+                         hours: float = 7 * 24) -> pd.DataFrame:
+    """
+    Return a `db_arbitrage.csv`-shaped frame of latest quotes across exchanges.
+
+    Even-numbered exchanges quote SELL and odd-numbered ones BUY, as KyberSwap
+    and Universal Assets do in the real extract.
+    """
+    rng = np.random.default_rng(seed)
+    symbols = np.array(token_names(tokens))
+    names = np.array(exchange_names(exchanges))
+    token_idx = rng.integers(0, tokens, rows)
+    exchange_idx = rng.integers(0, exchanges, rows)
+    price = _base_prices(tokens, rng)[token_idx] * (1 + rng.normal(0, 0.02, rows))
+    return pd.DataFrame({
+        'symbol': symbols[token_idx],
+        'name': np.char.add(symbols[token_idx], ' Token'),
+        'exchange_name': names[exchange_idx],
+        'quote_type': np.where(exchange_idx % 2, 'BUY', 'SELL'),
+        'output_amount_formatted': (1000 / price).round(8),
+        'price_per_token': price.round(8),
+        'slippage_limit_percent': np.where(exchange_idx % 2, 0.2, 0.5),
+        'quoted_at': _quote_times(rows, rng, hours).strftime('%Y-%m-%d %H:%M:%S.%f+00'),
+    })
+
+
+def write_arbitrage_csv(path: str = 'db_arbitrage.csv', rows: int = 500, tokens: int = 6,
+                        exchanges: int = 2, seed: int = 0) -> str:
+    """Write a synthetic `db_arbitrage.csv` and return its path."""
+    make_arbitrage_frame(rows, tokens, exchanges, seed).to_csv(path, index=False)
+    return path
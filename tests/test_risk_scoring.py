@@ -0,0 +1,49 @@
+"""Risk table rendering of tokens with and without quoted liquidity."""
+import numpy as np
+import pandas as pd
+
+from arbitrage import arbitrage_opportunities
+from markdown_templates import MISSING
+from risk_scoring import risk_reward_scores, risk_table
+from synthetic_data import make_arbitrage_frame
+
+
+def _snapshot():
+    df = make_arbitrage_frame(rows=500, tokens=6, seed=0)
+    return df, arbitrage_opportunities(df)
+
+
+def test_unknown_liquidity_renders_as_missing():
+    df, arb_df = _snapshot()
+    unquoted = arb_df['token'].iloc[0]
+    missing = df.assign(output_amount_formatted=df['output_amount_formatted'].where(df['symbol'] != unquoted))
+
+    scores = risk_reward_scores(missing, arb_df)
+    table = risk_table(scores)
+
+    assert np.isnan(scores.loc[scores['token'] == unquoted, 'position_size']).all()
+    assert 'nan' not in table
+    assert f"**{unquoted}** | {MISSING}" in table
+
+
+def test_quoted_tokens_get_clamped_position_sizes():
+    df, arb_df = _snapshot()
+
+    scores = risk_reward_scores(df, arb_df)
+
+    assert scores['position_size'].between(100, 1000).all()
+    assert list(scores['token']) == list(arb_df['token'])
+
+
+def test_tokens_without_impact_curves_show_missing():
+    df, arb_df = _snapshot()
+    scores = risk_reward_scores(df, arb_df)
+    curved = scores['token'].iloc[0]
+    optimal = pd.DataFrame({'optimal_usdc': [2500.0], 'impact_bps': [12.5], 'expected_profit_usdc': [3.75]},
+                           index=pd.Index([curved], name='token'))
+
+    rows = {line.split(' | ')[0]: line for line in risk_table(scores, optimal).splitlines()}
+
+    assert rows[f"| **{curved}**"].endswith("| $2,500 | 12.5 bps | $3.75 |")
+    other = scores['token'].iloc[1]
+    assert rows[f"| **{other}**"].endswith(f"| {MISSING} | {MISSING} | {MISSING} |")
@@ -0,0 +1,183 @@
+"""
+Token discovery backed by the token_catalog table and a local TTL cache.
+
+Report runs used to list tokens with `SELECT DISTINCT output_token_symbol FROM
+quotes`, a full scan that grows with the table. The catalog keeps one row per
+token (see migrations/001_token_catalog.sql) and is refreshed incrementally:
+
+    python migrate.py                 # once: index + catalog table
+    python token_catalog.py --refresh # after ingestion, e.g. from cron
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import typing as typ
+
+import psycopg2
+from dotenv import load_dotenv
+
+from download_to_csv import database_parameters
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = 'token_catalog.json'
+# Seconds a cached token list is trusted before the database is asked again.
+CACHE_TTL = int(os.getenv("TOKEN_CATALOG_TTL", 3600))
+
+CATALOG_QUERY = """
+SELECT symbol, quote_count, first_seen, last_seen
+FROM token_catalog
+ORDER BY symbol;
+"""
+
+# Folds only the quotes above the catalog's id watermark into the counts, so a
+# refresh reads the new rows through the primary key instead of the whole table.
+# Rows from a transaction that commits after a later id was already folded in
+# are missed; acceptable for a token list and its approximate counts.
+REFRESH_QUERY = """
+WITH fresh AS (
+    SELECT output_token_symbol AS symbol, count(*) AS quote_count,
+           min(quoted_at) AS first_seen, max(quoted_at) AS last_seen, max(id) AS last_id
+    FROM quotes
+    WHERE id > (SELECT coalesce(max(last_id), 0) FROM token_catalog)
+      AND output_token_symbol IS NOT NULL
+    GROUP BY output_token_symbol
+)
+INSERT INTO token_catalog AS catalog (symbol, quote_count, first_seen, last_seen, last_id, refreshed_at)
+SELECT symbol, quote_count, first_seen, last_seen, last_id, now()
+FROM fresh
+ON CONFLICT (symbol) DO UPDATE SET
+    quote_count = catalog.quote_count + EXCLUDED.quote_count,
+    first_seen = LEAST(catalog.first_seen, EXCLUDED.first_seen),
+    last_seen = GREATEST(catalog.last_seen, EXCLUDED.last_seen),
+    last_id = GREATEST(catalog.last_id, EXCLUDED.last_id),
+    refreshed_at = now();
+"""
+
+# Without the catalog table: a loose index scan that jumps from one symbol to
+# the next through the (output_token_symbol, quoted_at) index, one index probe
+# per token instead of a pass over every quote. Counts are not available this way.
+LOOSE_SCAN_QUERY = """
+WITH RECURSIVE symbols AS (
+    (SELECT output_token_symbol AS symbol FROM quotes
+     WHERE output_token_symbol IS NOT NULL
+     ORDER BY output_token_symbol LIMIT 1)
+    UNION ALL
+    SELECT (SELECT output_token_symbol FROM quotes
+            WHERE output_token_symbol > symbols.symbol
+            ORDER BY output_token_symbol LIMIT 1)
+    FROM symbols
+    WHERE symbols.symbol IS NOT NULL
+)
+SELECT symbols.symbol, NULL AS quote_count, NULL AS first_seen,
+       (SELECT max(quoted_at) FROM quotes WHERE output_token_symbol = symbols.symbol) AS last_seen
+FROM symbols
+WHERE symbols.symbol IS NOT NULL;
+"""
+
+CATALOG_FIELDS = ('symbol', 'quote_count', 'first_seen', 'last_seen')
+
+
+class TokenCatalog:
+    """
+    Token list with row-count and last-seen metadata, cached on disk for `ttl` seconds.
+
+    Lookups try, in order: a fresh cache file, the token_catalog table, a
+    loose index scan over quotes, and finally a stale cache so a database
+    outage does not stop a report run that already knows its tokens.
+    """
+
+    def __init__(self, db_params: dict = database_parameters, cache_file: str = CACHE_FILE, ttl: int = CACHE_TTL):
+        self.db_params = db_params
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def entries(self, refresh: bool = False) -> typ.List[dict]:
+        """Return one dict per token with CATALOG_FIELDS; `refresh` skips the cache."""
+        cached = self._read_cache()
+        if cached and not refresh and time.time() - cached['fetched_at'] < self.ttl:
+            return cached['tokens']
+
+        try:
+            tokens = self._query()
+        except psycopg2.Error as error:
+            if cached:
+                logger.warning(f"Token catalog unavailable ({error}); using cache from {cached['fetched_at']:.0f}")
+                return cached['tokens']
+            print(f"Error while querying distinct tokens: {error}")
+            return []
+        self._write_cache(tokens)
+        return tokens
+
+    def symbols(self, refresh: bool = False) -> typ.List[str]:
+        return [entry['symbol'] for entry in self.entries(refresh=refresh)]
+
+    def _query(self) -> typ.List[dict]:
+        conn = psycopg2.connect(**self.db_params)
+        try:
+            with conn.cursor() as cur:
+                try:
+                    cur.execute(CATALOG_QUERY)
+                except psycopg2.errors.UndefinedTable:
+                    conn.rollback()
+                    logger.info("token_catalog table missing; falling back to a loose index scan of quotes")
+                    cur.execute(LOOSE_SCAN_QUERY)
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        return [{'symbol': symbol, 'quote_count': count,
+                 'first_seen': first_seen.isoformat() if first_seen else None,
+                 'last_seen': last_seen.isoformat() if last_seen else None}
+                for symbol, count, first_seen, last_seen in rows]
+
+    def _read_cache(self) -> dict | None:
+        if not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as error:
+            logger.warning(f"Ignoring unreadable token cache {self.cache_file}: {error}")
+            return None
+
+    def _write_cache(self, tokens: typ.List[dict]):
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': time.time(), 'tokens': tokens}, f, indent=2)
+        os.replace(tmp_file, self.cache_file)
+
+
+def refresh_catalog(db_params: dict = database_parameters) -> int:
+    """Fold quotes added since the last refresh into token_catalog; returns the tokens touched."""
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(REFRESH_QUERY)
+            return cur.rowcount
+    finally:
+        conn.close()
+
+
+def list_tokens(refresh: bool = False) -> typ.List[str]:
+    """Token symbols for a report run, from the cached catalog."""
+    return TokenCatalog().symbols(refresh=refresh)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Refresh and show the token catalog.")
+    parser.add_argument('--refresh', action='store_true',
+                        help="fold new quotes into the token_catalog table before listing")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.refresh:
+        print(f"🔄 Refreshed {refresh_catalog()} catalog rows")
+    for entry in TokenCatalog().entries(refresh=args.refresh):
+        count = f"{entry['quote_count']:,}" if entry['quote_count'] is not None else '?'
+        print(f"{entry['symbol']:<12} {count:>14} quotes   last seen {entry['last_seen']}")
@@ -0,0 +1,211 @@
+"""
+Cost-aware planning of per-token work for parallel report runs.
+
+Token sizes vary by orders of magnitude, so handing tokens to a process pool
+in alphabetical order can leave every worker idle while one big token that
+happened to come last finishes. The planner estimates each token's cost from
+its row count, skips tokens with too few rows to chart before anything is
+downloaded, and orders the rest largest-first (longest processing time
+first), which keeps the pool's makespan close to the ideal:
+
+    python token_schedule.py --workers 4
+"""
+import argparse
+import glob
+import logging
+import os
+import time
+import typing as typ
+from concurrent.futures import Executor, Future
+
+import psycopg2
+from dotenv import load_dotenv
+
+from download_to_csv import INPUT_AMOUNT, database_parameters
+from token_catalog import list_tokens
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tokens with fewer quotes than this are skipped: with 0 or 1 quotes there is
+# no file to chart or no line to fit.
+MIN_ROWS = int(os.getenv("SCHEDULE_MIN_ROWS", 2))
+
+# Rendering and PDF cost of one token, measured on a single core: a fixed
+# part for the figures and a part that grows with the quotes plotted.
+COST_FIXED_SECONDS = 1.4
+COST_SECONDS_PER_ROW = 1.2e-4
+
+# Bytes read from the top of a CSV to estimate its row length.
+SAMPLE_BYTES = 64 * 1024
+
+# Same rows as `download_to_csv.quotes_query` (window, quote size and the token
+# as output), for every token in one grouped scan. Counting by token_id keeps
+# SELL quotes, whose output is USDC, from being counted as a "USDC" token.
+ROW_COUNTS_QUERY = """
+SELECT t.symbol, count(*)
+FROM quotes q
+JOIN tokens t ON t.id = q.token_id
+WHERE q."quoted_at" >= NOW() - INTERVAL '24 hours'
+  AND q.input_amount = {input_amount}
+  AND q.output_token_symbol = t.symbol
+GROUP BY t.symbol;
+"""
+
+
+class TokenJob(typ.NamedTuple):
+    symbol: str
+    rows: int
+    cost: float
+
+
+class Plan(typ.NamedTuple):
+    """Tokens to run, largest estimated cost first, and tokens skipped up front."""
+    scheduled: typ.List[TokenJob]
+    skipped: typ.List[TokenJob]
+    source: str
+    # Every token in the order it was listed, for output that should not follow the schedule
+    listed: typ.List[str]
+
+    def symbols(self) -> typ.List[str]:
+        return [job.symbol for job in self.scheduled]
+
+    def listed_order(self, symbols: typ.Iterable[str]) -> typ.List[str]:
+        """`symbols` in the order the tokens were listed."""
+        wanted = set(symbols)
+        return [symbol for symbol in self.listed if symbol in wanted]
+
+
+def estimate_cost(rows: int) -> float:
+    """Estimated seconds to chart and build the PDF of a token with `rows` quotes."""
+    return COST_FIXED_SECONDS + COST_SECONDS_PER_ROW * rows
+
+
+def query_row_counts(db_params: dict = database_parameters,
+                     input_amount: int = INPUT_AMOUNT) -> typ.Dict[str, int]:
+    """Rows every token will download, from one grouped query over the download window."""
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(ROW_COUNTS_QUERY.format(input_amount=int(input_amount)))
+            return {symbol: int(count) for symbol, count in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def estimate_csv_rows(path: str) -> int:
+    """Estimate the data rows of a CSV from its size and the row length at its top."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_BYTES)
+    lines = sample.count(b'\n')
+    if lines <= 1:
+        return 0
+    if size <= len(sample):
+        return lines - 1
+    header = sample.index(b'\n') + 1
+    row_bytes = (len(sample) - header) / (lines - 1)
+    return round((size - header) / row_bytes)
+
+
+def file_row_counts(symbols: typ.Iterable[str], pattern: str = 'quotes_{symbol}.csv') -> typ.Dict[str, int]:
+    """Estimated rows of each token's local CSV, from file metadata; missing files count 0."""
+    counts = {}
+    for symbol in symbols:
+        path = pattern.format(symbol=symbol)
+        counts[symbol] = estimate_csv_rows(path) if os.path.exists(path) else 0
+    return counts
+
+
+def row_counts(symbols: typ.Sequence[str], pattern: str = 'quotes_{symbol}.csv',
+               db_params: dict = database_parameters) -> typ.Tuple[typ.Dict[str, int], str]:
+    """
+    Row counts for planning, and where they came from.
+
+    The grouped query counts what the run is about to download; when the
+    database is unreachable, the CSVs of the previous run stand in.
+    """
+    try:
+        counts = query_row_counts(db_params)
+        return {symbol: counts.get(symbol, 0) for symbol in symbols}, 'database'
+    except psycopg2.Error as error:
+        logger.warning(f"Row counts unavailable ({error}); estimating from local CSV files")
+        return file_row_counts(symbols, pattern), 'files'
+
+
+def plan_tokens(counts: typ.Dict[str, int], min_rows: int = MIN_ROWS, source: str = 'given') -> Plan:
+    """Skip tokens below `min_rows` and order the rest by estimated cost, largest first."""
+    jobs = [TokenJob(symbol, rows, estimate_cost(rows)) for symbol, rows in counts.items()]
+    scheduled = sorted((job for job in jobs if job.rows >= min_rows), key=lambda job: (-job.cost, job.symbol))
+    skipped = [job for job in jobs if job.rows < min_rows]
+    if skipped:
+        print(f"⏭️  Skipping {len(skipped)} tokens with fewer than {min_rows} quotes: "
+              f"{', '.join(job.symbol for job in skipped)}")
+    return Plan(scheduled, skipped, source, list(counts))
+
+
+def makespan(costs: typ.Sequence[float], workers: int) -> float:
+    """Wall time of running `costs` in the given order on `workers` workers that each take the next job when free."""
+    finish = [0.0] * max(1, workers)
+    for cost in costs:
+        finish[finish.index(min(finish))] += cost
+    return max(finish, default=0.0)
+
+
+def timed_call(func: typ.Callable[[str], typ.Any], symbol: str) -> typ.Tuple[float, typ.Any]:
+    """Process-pool entry point: run `func(symbol)` and return its wall time with its result."""
+    start = time.perf_counter()
+    result = func(symbol)
+    return time.perf_counter() - start, result
+
+
+def submit_largest_first(executor: Executor, func: typ.Callable[[str], typ.Any],
+                         plan: Plan) -> typ.Dict[str, Future]:
+    """
+    Submit `func(symbol)` for every scheduled token, largest first.
+
+    Pools hand out work in submission order, so the big tokens start right
+    away and the small ones fill the gaps at the end. Each future resolves to
+    `(seconds, result)`.
+    """
+    return {job.symbol: executor.submit(timed_call, func, job.symbol) for job in plan.scheduled}
+
+
+def print_cost_summary(plan: Plan, actual: typ.Dict[str, float], workers: int | None = None):
+    """Print estimated against actual seconds per token ('-' if it did not finish), and the predicted makespans."""
+    print(f"\n{'Token':<8} {'Rows':>10} {'Est (s)':>8} {'Actual (s)':>10} {'Ratio':>6}")
+    for job in plan.scheduled:
+        seconds = actual.get(job.symbol)
+        if seconds is None:
+            print(f"{job.symbol:<8} {job.rows:>10,} {job.cost:>8.2f} {'-':>10}")
+        else:
+            print(f"{job.symbol:<8} {job.rows:>10,} {job.cost:>8.2f} {seconds:>10.2f} {seconds / job.cost:>6.2f}")
+    for job in plan.skipped:
+        print(f"{job.symbol:<8} {job.rows:>10,} {'skipped':>8}")
+    estimated = sum(job.cost for job in plan.scheduled)
+    print(f"Total: {estimated:.2f}s estimated, {sum(actual.values()):.2f}s actual (rows from {plan.source})")
+    if workers:
+        by_name = sorted(plan.scheduled, key=lambda job: job.symbol)
+        print(f"Estimated wall time on {workers} workers: {makespan([job.cost for job in plan.scheduled], workers):.2f}s "
+              f"largest-first vs {makespan([job.cost for job in by_name], workers):.2f}s alphabetical")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Show the largest-first token plan for a parallel run.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="pool size (default: one per CPU)")
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS,
+                        help="skip tokens with fewer quotes (default: %(default)s)")
+    parser.add_argument('--files', action='store_true', help="estimate rows from local quotes_*.csv files only")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.files:
+        symbols = sorted(os.path.basename(path)[len('quotes_'):-len('.csv')] for path in glob.glob('quotes_*.csv'))
+        counts, source = file_row_counts(symbols), 'files'
+    else:
+        counts, source = row_counts(list_tokens())
+    plan = plan_tokens(counts, min_rows=args.min_rows, source=source)
+    print_cost_summary(plan, {}, workers=args.workers)